@@ -0,0 +1,389 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from formula import ATOMIC_WEIGHTS, parse_formula
+from results import coefficient_array
+from solver import SOLVE_PHASES, SOLVER_BACKENDS, StoichiometrySolver, preflight_error
+
+ELEMENTS = list(ATOMIC_WEIGHTS)
+ELEMENT_INDEX = {element: i for i, element in enumerate(ELEMENTS)}
+REACTANT_SIDE = -1
+PRODUCT_SIDE = 1
+NO_BACKEND = -1
+REPRESENTATIONS = ('dense', 'sparse')
+
+OUTPUT_ARRAYS = ('coefficients', 'mass_balance_errors', 'reaction_extents', 'budget_limited', 'status',
+                 'solution_methods', 'routed', 'route_overrides', 'reconstructed', 'estimated_costs',
+                 'block_residuals', 'unidentifiable', 'alternative_counts', 'alternative_errors',
+                 'alternative_coefficients', 'representations', 'estimated_bytes', 'phase_peaks')
+
+_worker_blocks = []
+_worker_block_names = None
+_worker_solver = None
+
+def case_components(case, unused=()):
+    components = {}
+    for side, role in ((REACTANT_SIDE, 'reactants'), (PRODUCT_SIDE, 'products')):
+        for component in case[role]:
+            if component['name'] not in unused:
+                components[component['name']] = (side, component)
+    return components
+
+def batch_layout(encoded_cases, top_k=0, n_backends=None):
+    if n_backends is None:
+        n_backends = len(SOLVER_BACKENDS)
+    n_cases = len(encoded_cases)
+    n_components = sum(len(components) for components, _ in encoded_cases)
+    n_reactions = sum(len(case['reactions']) for _, case in encoded_cases)
+    n_members = sum(len(r['reactants']) + len(r['products']) for _, case in encoded_cases for r in case['reactions'])
+    n_coefficients = sum(len(components) * len(case['reactions']) for components, case in encoded_cases)
+
+    return {
+        'molar_weights': ('<f8', (n_components,)),
+        'molar_flows': ('<f8', (n_components,)),
+        'placements': ('i1', (n_components,)),
+        'has_formula': ('i1', (n_components,)),
+        'element_counts': ('<i4', (n_components, len(ELEMENTS))),
+        'reaction_starts': ('<i8', (n_reactions + 1,)),
+        'reaction_backends': ('<i2', (n_reactions,)),
+        'members': ('<i4', (n_members,)),
+        'member_sides': ('i1', (n_members,)),
+        'coefficients': ('<f8', (n_coefficients,)),
+        'mass_balance_errors': ('<f8', (n_reactions,)),
+        'reaction_extents': ('<f8', (n_reactions,)),
+        'budget_limited': ('i1', (n_reactions,)),
+        'status': ('i1', (n_cases,)),
+        'solution_methods': ('<i2', (n_reactions,)),
+        'routed': ('i1', (n_reactions,)),
+        'route_overrides': ('<i2', (n_reactions,)),
+        'reconstructed': ('i1', (n_reactions,)),
+        'estimated_costs': ('<f8', (n_reactions, n_backends)),
+        'block_residuals': ('<f8', (n_reactions,)),
+        'unidentifiable': ('i1', (n_reactions,)),
+        'alternative_counts': ('<i4', (n_reactions,)),
+        'alternative_errors': ('<f8', (n_reactions, top_k)),
+        'alternative_coefficients': ('<i8', (n_members * top_k,)),
+        'representations': ('i1', (n_cases,)),
+        'estimated_bytes': ('<i8', (n_cases,)),
+        'phase_peaks': ('<i8', (n_cases, len(SOLVE_PHASES)))
+    }
+
+def layout_bytes(layout):
+    return sum(int(np.prod(shape)) * np.dtype(dtype).itemsize for dtype, shape in layout.values())
+
+def chunk_cases(encoded_cases, max_chunk_bytes, top_k=0):
+    chunks = [[]]
+    chunk_bytes = 0
+    for index, encoded_case in enumerate(encoded_cases):
+        case_bytes = layout_bytes(batch_layout([encoded_case], top_k))
+        if max_chunk_bytes is not None and chunks[-1] and chunk_bytes + case_bytes > max_chunk_bytes:
+            chunks.append([])
+            chunk_bytes = 0
+        chunks[-1].append(index)
+        chunk_bytes += case_bytes
+    return chunks
+
+def allocate_arrays(layout, shared):
+    arrays = {}
+    blocks = []
+    for name, (dtype, shape) in layout.items():
+        if shared:
+            nbytes = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+            block = shared_memory.SharedMemory(create=True, size=nbytes)
+            blocks.append(block)
+            arrays[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+            arrays[name].fill(0)
+        else:
+            arrays[name] = np.zeros(shape, dtype=dtype)
+    return arrays, blocks
+
+def backend_code(backend_names, backend):
+    if backend is None:
+        return NO_BACKEND
+    if backend not in backend_names:
+        raise ValueError(f"Unknown solver backend '{backend}'")
+    return backend_names.index(backend)
+
+def encode_cases(encoded_cases, diagnostics, arrays, solver, backend_names):
+    tasks = []
+    component_offset = 0
+    reaction_offset = 0
+    member_offset = 0
+    coefficient_offset = 0
+
+    for case_index, ((components, case), case_diagnostics) in enumerate(zip(encoded_cases, diagnostics)):
+        positions = {name: i for i, name in enumerate(components)}
+        for i, (side, component) in enumerate(components.values()):
+            row = component_offset + i
+            try:
+                weights, _ = solver.resolve_molar_weights([component])
+                arrays['molar_weights'][row] = float(weights[component['name']])
+            except (TypeError, ValueError):
+                arrays['molar_weights'][row] = np.nan
+            arrays['molar_flows'][row] = side * component['molar_flow']
+            arrays['placements'][row] = side
+            try:
+                counts = parse_formula(component['formula']) if component.get('formula') else ()
+            except ValueError:
+                counts = ()
+            for element, count in counts:
+                arrays['element_counts'][row, ELEMENT_INDEX[element]] = count
+            arrays['has_formula'][row] = len(counts) > 0
+
+        solvable = set(case_diagnostics['solvable_reactions'])
+        for r_offset, reaction in enumerate(case['reactions']):
+            arrays['reaction_starts'][reaction_offset + r_offset] = member_offset
+            arrays['reaction_backends'][reaction_offset + r_offset] = NO_BACKEND
+            if r_offset not in solvable:
+                continue
+            arrays['reaction_backends'][reaction_offset + r_offset] = backend_code(backend_names, reaction.get('backend'))
+            for side, role in ((REACTANT_SIDE, 'reactants'), (PRODUCT_SIDE, 'products')):
+                for name in reaction[role]:
+                    arrays['members'][member_offset] = positions.get(name, -1)
+                    arrays['member_sides'][member_offset] = side
+                    member_offset += 1
+
+        n_components = len(components)
+        n_reactions = len(case['reactions'])
+        tasks.append((case_index, component_offset, n_components, reaction_offset, n_reactions, coefficient_offset))
+        component_offset += n_components
+        reaction_offset += n_reactions
+        coefficient_offset += n_components * n_reactions
+
+    arrays['reaction_starts'][reaction_offset] = member_offset
+    return tasks
+
+def decode_case(arrays, task, backend_names):
+    _, component_offset, n_components, reaction_offset, n_reactions, _ = task
+    reactants = []
+    products = []
+
+    for i in range(n_components):
+        row = component_offset + i
+        weight = float(arrays['molar_weights'][row])
+        placement = int(arrays['placements'][row])
+        component = {
+            'name': str(i),
+            'molar_weight': weight if np.isfinite(weight) else None,
+            'molar_flow': placement * float(arrays['molar_flows'][row])
+        }
+        if arrays['has_formula'][row]:
+            counts = arrays['element_counts'][row]
+            component['formula'] = ''.join(f"{ELEMENTS[e]}{counts[e]}" for e in np.flatnonzero(counts))
+        (reactants if placement == REACTANT_SIDE else products).append(component)
+
+    reactions = []
+    starts = arrays['reaction_starts']
+    for r_idx in range(reaction_offset, reaction_offset + n_reactions):
+        reaction = {'reactants': [], 'products': []}
+        if arrays['reaction_backends'][r_idx] != NO_BACKEND:
+            reaction['backend'] = backend_names[arrays['reaction_backends'][r_idx]]
+        for member in range(starts[r_idx], starts[r_idx + 1]):
+            index = arrays['members'][member]
+            name = str(index) if index >= 0 else f"unknown{member}"
+            reaction['reactants' if arrays['member_sides'][member] == REACTANT_SIDE else 'products'].append(name)
+        reactions.append(reaction)
+
+    return reactants, products, reactions
+
+def write_case_details(arrays, task, result, backend_names, top_k):
+    case_index, _, _, reaction_offset, n_reactions, _ = task
+    starts = arrays['reaction_starts']
+    for r_offset in range(n_reactions):
+        r_idx = reaction_offset + r_offset
+        method = result['solution_methods'][r_offset]
+        arrays['solution_methods'][r_idx] = backend_code(backend_names, method)
+        route = result['routing'][r_offset]
+        if route is not None:
+            arrays['routed'][r_idx] = 1
+            arrays['route_overrides'][r_idx] = backend_code(backend_names, route['override'])
+            arrays['reconstructed'][r_idx] = route['reconstructed']
+            arrays['estimated_costs'][r_idx] = [route['estimated_costs'].get(name, np.nan) for name in backend_names]
+
+        alternatives = result['alternatives'][r_offset]
+        arrays['alternative_counts'][r_idx] = len(alternatives)
+        n_members = starts[r_idx + 1] - starts[r_idx]
+        for k, alternative in enumerate(alternatives):
+            arrays['alternative_errors'][r_idx, k] = alternative['mass_error']
+            slot = starts[r_idx] * top_k + k * n_members
+            arrays['alternative_coefficients'][slot:slot + len(alternative['coefficients'])] = list(alternative['coefficients'].values())
+
+    for block in result['extent_blocks']:
+        arrays['block_residuals'][np.array(block['reactions'], dtype=int) + reaction_offset] = block['residual']
+        arrays['unidentifiable'][np.array(block['unidentifiable'], dtype=int) + reaction_offset] = 1
+
+    memory = result['memory']
+    arrays['representations'][case_index] = REPRESENTATIONS.index(memory['representation'])
+    arrays['estimated_bytes'][case_index] = memory['estimated_bytes']
+    arrays['phase_peaks'][case_index] = [(memory['phase_peaks'] or {}).get(phase, -1) for phase in SOLVE_PHASES]
+
+def solve_case_arrays(arrays, solver, task, backend_names):
+    case_index, _, n_components, reaction_offset, n_reactions, coefficient_offset = task
+    result = solver.solve_stoichiometry(*decode_case(arrays, task, backend_names))
+    if not result['success']:
+        return 0
+
+    reactions = slice(reaction_offset, reaction_offset + n_reactions)
+    coefficients = arrays['coefficients'][coefficient_offset:coefficient_offset + n_components * n_reactions]
+    coefficients.reshape(n_components, n_reactions)[:] = coefficient_array(result)
+    arrays['mass_balance_errors'][reactions] = result['mass_balance_errors']
+    arrays['reaction_extents'][reactions] = result['reaction_extents']
+    arrays['budget_limited'][reactions] = result['budget_limited']
+    write_case_details(arrays, task, result, backend_names, solver.top_k)
+    return 1
+
+def start_worker(options):
+    global _worker_solver
+    _worker_solver = StoichiometrySolver(**options)
+
+def attach_shared_arrays(layout, block_names):
+    global _worker_block_names
+    if block_names != _worker_block_names:
+        for block in _worker_blocks:
+            block.close()
+        _worker_blocks[:] = [shared_memory.SharedMemory(name=block_name) for block_name in block_names]
+        _worker_block_names = block_names
+
+    return {
+        name: np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        for (name, (dtype, shape)), block in zip(layout.items(), _worker_blocks)
+    }
+
+def solve_shared_case(layout, block_names, backend_names, task):
+    return solve_case_arrays(attach_shared_arrays(layout, block_names), _worker_solver, task, backend_names)
+
+def case_routing(solver, outputs, r_idx, backend_names):
+    if not outputs['routed'][r_idx]:
+        return None
+    estimates = {name: float(cost) for name, cost in zip(backend_names, outputs['estimated_costs'][r_idx]) if not np.isnan(cost)}
+    override = outputs['route_overrides'][r_idx]
+    override = backend_names[override] if override != NO_BACKEND else None
+    return {
+        'order': solver.route_order(estimates, override),
+        'estimated_costs': estimates,
+        'override': override,
+        'reconstructed': bool(outputs['reconstructed'][r_idx])
+    }
+
+def case_alternatives(solver, outputs, r_idx, participant_names):
+    start = outputs['reaction_starts'][r_idx]
+    n_members = outputs['reaction_starts'][r_idx + 1] - start
+    alternatives = []
+    for k in range(outputs['alternative_counts'][r_idx]):
+        slot = start * solver.top_k + k * n_members
+        coefficients = outputs['alternative_coefficients'][slot:slot + len(participant_names)].tolist()
+        alternatives.append({'coefficients': dict(zip(participant_names, coefficients)),
+                             'mass_error': float(outputs['alternative_errors'][r_idx, k])})
+    return alternatives
+
+def case_extent_blocks(solver, outputs, nu_matrix, reaction_offset, component_names):
+    blocks = []
+    for block_components, block_reactions in solver.find_reaction_blocks(nu_matrix):
+        rows = reaction_offset + block_reactions
+        blocks.append({
+            'reactions': block_reactions.tolist(),
+            'components': [component_names[i] for i in block_components],
+            'residual': float(outputs['block_residuals'][rows[0]]),
+            'unidentifiable': block_reactions[outputs['unidentifiable'][rows].astype(bool)].tolist()
+        })
+    return blocks
+
+def case_memory(solver, outputs, case_index):
+    phase_peaks = None
+    if solver.track_memory:
+        phase_peaks = {phase: int(peak) for phase, peak in zip(SOLVE_PHASES, outputs['phase_peaks'][case_index]) if peak >= 0}
+    return {
+        'representation': REPRESENTATIONS[outputs['representations'][case_index]],
+        'estimated_bytes': int(outputs['estimated_bytes'][case_index]),
+        'phase_peaks': phase_peaks
+    }
+
+def collect_results(encoded_cases, outputs, tasks, diagnostics, solver, backend_names):
+    results = []
+    for (components, case), task, case_diagnostics in zip(encoded_cases, tasks, diagnostics):
+        case_index, _, n_components, reaction_offset, n_reactions, coefficient_offset = task
+        if not outputs['status'][case_index]:
+            results.append({
+                'success': False,
+                'error': preflight_error(case_diagnostics),
+                'diagnostics': case_diagnostics
+            })
+            continue
+
+        component_names = list(components)
+        reactions = slice(reaction_offset, reaction_offset + n_reactions)
+        coefficients = outputs['coefficients'][coefficient_offset:coefficient_offset + n_components * n_reactions]
+        nu_matrix = coefficients.reshape(n_components, n_reactions)
+        methods = outputs['solution_methods'][reactions]
+        extent_blocks = case_extent_blocks(solver, outputs, nu_matrix, reaction_offset, component_names)
+        results.append({
+            'success': True,
+            'stoichiometric_coefficients': nu_matrix.tolist(),
+            'mass_balance_errors': outputs['mass_balance_errors'][reactions].tolist(),
+            'component_names': component_names,
+            'budget_limited': outputs['budget_limited'][reactions].astype(bool).tolist(),
+            'solution_methods': [backend_names[method] if method != NO_BACKEND else None for method in methods],
+            'routing': [case_routing(solver, outputs, r_idx, backend_names) for r_idx in range(reactions.start, reactions.stop)],
+            'alternatives': [
+                case_alternatives(solver, outputs, reaction_offset + r_offset,
+                                  [name for name in dict.fromkeys(reaction['reactants'] + reaction['products']) if name in components])
+                for r_offset, reaction in enumerate(case['reactions'])
+            ],
+            'reaction_extents': outputs['reaction_extents'][reactions].tolist(),
+            'extent_blocks': extent_blocks,
+            'unidentifiable_reactions': sorted(r_idx for block in extent_blocks for r_idx in block['unidentifiable']),
+            'memory': case_memory(solver, outputs, case_index),
+            'diagnostics': case_diagnostics
+        })
+    return results
+
+def solve_chunk(encoded_cases, diagnostics, executor, solver):
+    backend_names = tuple(SOLVER_BACKENDS)
+    layout = batch_layout(encoded_cases, solver.top_k, len(backend_names))
+    shared = executor is not None and sum(d['ok'] for d in diagnostics) > 1
+    arrays, blocks = allocate_arrays(layout, shared)
+
+    try:
+        tasks = encode_cases(encoded_cases, diagnostics, arrays, solver, backend_names)
+        pending = [task for task, case_diagnostics in zip(tasks, diagnostics) if case_diagnostics['ok']]
+
+        if shared:
+            block_names = [block.name for block in blocks]
+            n_pending = len(pending)
+            solved = executor.map(solve_shared_case, [layout] * n_pending, [block_names] * n_pending,
+                                  [backend_names] * n_pending, pending)
+        else:
+            solved = (solve_case_arrays(arrays, solver, task, backend_names) for task in pending)
+        for task, status in zip(pending, solved):
+            arrays['status'][task[0]] = status
+
+        outputs = {name: arrays[name].copy() for name in OUTPUT_ARRAYS + ('reaction_starts',)}
+    finally:
+        arrays.clear()
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    return collect_results(encoded_cases, outputs, tasks, diagnostics, solver, backend_names)
+
+def solve_batch(cases, max_workers=None, max_chunk_bytes=None, **options):
+    solver = StoichiometrySolver(**options)
+    diagnostics = [solver.preflight(case['reactants'], case['products'], case['reactions']) for case in cases]
+    encoded_cases = [(case_components(case, set(case_diagnostics['unused_components'])), case)
+                     for case, case_diagnostics in zip(cases, diagnostics)]
+    if max_chunk_bytes is None:
+        max_chunk_bytes = solver.memory_budget
+    chunks = chunk_cases(encoded_cases, max_chunk_bytes, solver.top_k)
+
+    executor = None
+    if max_workers != 1 and sum(d['ok'] for d in diagnostics) > 1:
+        executor = ProcessPoolExecutor(max_workers=max_workers, initializer=start_worker, initargs=(options,))
+
+    results = []
+    try:
+        for chunk in chunks:
+            results.extend(solve_chunk([encoded_cases[i] for i in chunk], [diagnostics[i] for i in chunk], executor, solver))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return results
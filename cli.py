@@ -0,0 +1,217 @@
+import argparse
+import json
+import sys
+from flows import prepare_project_flows
+from importer import read_component_file, format_import_errors
+from daemon import SpoolDaemon
+import metrics
+from results import coefficient_array, write_results_csv, write_results_json, reaction_labels
+from sidecar import load_project_sidecar, save_project_sidecar, sidecar_result
+from solver import solve_stoichiometry
+from tuning import load_corpus, profile_solver, save_profile, tune
+from streaming import StreamingReconciler, reconcile_stream, read_flow_csv, read_flow_jsonl
+
+def solve_project(filename, use_sidecar=True, solver=None):
+    with open(filename, 'rb') as f:
+        content = f.read()
+
+    if use_sidecar:
+        sidecar = load_project_sidecar(filename, content)
+        result = sidecar_result(sidecar)
+        if result is not None:
+            reactions = [{'name': name} for name in sidecar['metadata']['reaction_names']]
+            return result, reactions, True
+
+    data = json.loads(content)
+    prepare_project_flows(data)
+    reactions = data.get('reactions', [])
+    result = solve_stoichiometry(data.get('reactants', []), data.get('products', []), reactions, solver=solver)
+
+    if use_sidecar:
+        save_project_sidecar(filename, content, data, result, reactions)
+    return result, reactions, False
+
+def solve_command(args):
+    try:
+        solver = profile_solver(args.profile, args.profile_dir) if args.profile else None
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    result, reactions, cached = solve_project(args.project, use_sidecar=not (args.no_sidecar or args.profile), solver=solver)
+    if args.metrics_file:
+        metrics.write_prometheus(args.metrics_file)
+
+    if not result['success']:
+        print(f"Error: {result.get('error', 'Unknown error occurred')}", file=sys.stderr)
+        return 1
+
+    if cached:
+        print(f"Using cached results for {args.project}", file=sys.stderr)
+
+    write_results = write_results_csv if args.format == 'csv' else write_results_json
+    if args.output:
+        with open(args.output, 'w', newline='') as f:
+            write_results(result, f, reactions)
+    else:
+        write_results(result, sys.stdout, reactions)
+    return 0
+
+def stream_command(args):
+    result, reactions, _ = solve_project(args.project, use_sidecar=not args.no_sidecar)
+    if not result['success']:
+        print(f"Error: {result.get('error', 'Unknown error occurred')}", file=sys.stderr)
+        return 1
+
+    with open(args.project) as f:
+        reactant_names = [reactant['name'] for reactant in json.load(f).get('reactants', [])]
+
+    component_names = result['component_names']
+    labels = reaction_labels(result, reactions)
+    reconciler = StreamingReconciler(coefficient_array(result), component_names, reactant_names,
+                                     window=args.window, flow_std=args.flow_std,
+                                     gross_error_threshold=args.threshold, patience=args.patience)
+
+    output = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        with open(args.flows, newline='') as flow_file:
+            if args.flows.endswith(('.jsonl', '.ndjson')):
+                samples = read_flow_jsonl(flow_file, component_names)
+            else:
+                samples = read_flow_csv(flow_file, component_names)
+
+            for update in reconcile_stream(samples, reconciler):
+                output.write(json.dumps({
+                    'timestamp': update['timestamp'],
+                    'extents': dict(zip(labels, update['extents'].tolist())),
+                    'gross_errors': update['gross_errors'],
+                    'excluded': update['excluded']
+                }) + '\n')
+                if args.flush:
+                    output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 0
+
+def import_command(args):
+    data = {'total_reactant_mass': 0.0, 'reactants': [], 'products': [], 'reactions': []}
+    if args.project:
+        with open(args.project) as f:
+            data.update(json.load(f))
+    if args.total_mass is not None:
+        data['total_reactant_mass'] = args.total_mass
+
+    existing_names = [component['name'] for component in data['reactants'] + data['products']]
+    try:
+        imported = read_component_file(args.components, role=args.role, existing_names=existing_names)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if imported['errors']:
+        print(format_import_errors(imported['errors']), file=sys.stderr)
+        return 1
+
+    data['reactants'] = data['reactants'] + imported['reactants']
+    data['products'] = data['products'] + imported['products']
+    prepare_project_flows(data)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(data, f, indent=4)
+    else:
+        json.dump(data, sys.stdout, indent=4)
+    print(f"Imported {len(imported['reactants'])} reactants and {len(imported['products'])} products", file=sys.stderr)
+    return 0
+
+def tune_command(args):
+    cases = load_corpus(args.corpus)
+    if not cases:
+        print("Error: no project files found in the corpus", file=sys.stderr)
+        return 1
+
+    tuning = tune(cases, max_workers=args.workers, repeats=args.repeats, max_error=args.max_error)
+    filename = save_profile(args.name, tuning, args.profile_dir)
+
+    chosen = tuning['measurement']
+    print(f"Profile '{args.name}' saved to {filename}")
+    print(f"Parameters: {json.dumps(tuning['parameters'])}")
+    print(f"Corpus: {len(cases)} projects, {len(tuning['results'])} parameter sets")
+    print(f"Tuned:    {chosen['seconds']:.4f} s, mean error {chosen['mean_error']:.6g}, max error {chosen['max_error']:.6g}")
+    baseline = tuning['baseline']
+    if baseline is not None:
+        print(f"Defaults: {baseline['seconds']:.4f} s, mean error {baseline['mean_error']:.6g}, max error {baseline['max_error']:.6g}")
+    return 0
+
+def watch_command(args):
+    daemon = SpoolDaemon(args.directory, max_workers=args.workers, poll_interval=args.interval)
+    if args.metrics_port:
+        metrics.serve_metrics(args.metrics_port)
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Stoichiometry coefficient solver")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    solve_parser = subparsers.add_parser('solve', help="Solve a project JSON file")
+    solve_parser.add_argument('project', help="Project JSON file")
+    solve_parser.add_argument('-o', '--output', help="Write results to this file instead of stdout")
+    solve_parser.add_argument('-f', '--format', choices=['json', 'csv'], default='json')
+    solve_parser.add_argument('--no-sidecar', action='store_true',
+                              help="Always re-solve and do not read or write the binary sidecar cache")
+    solve_parser.add_argument('--metrics-file', help="Write solver metrics in Prometheus text format to this file")
+    solve_parser.add_argument('--profile', help="Solve with the limits of this tuning profile (skips the sidecar cache)")
+    solve_parser.add_argument('--profile-dir', help="Directory of tuning profiles")
+    solve_parser.set_defaults(handler=solve_command)
+
+    stream_parser = subparsers.add_parser('stream', help="Reconcile a time series of molar flows against a project")
+    stream_parser.add_argument('project', help="Project JSON file that defines the reaction network")
+    stream_parser.add_argument('flows', help="CSV or JSONL file of timestamped molar-flow readings")
+    stream_parser.add_argument('-o', '--output', help="Write reconciled extents as JSON lines to this file instead of stdout")
+    stream_parser.add_argument('--window', type=int, default=60, help="Number of samples in the rolling window")
+    stream_parser.add_argument('--flow-std', type=float, default=1.0, help="Standard deviation of each molar-flow reading")
+    stream_parser.add_argument('--threshold', type=float, default=3.0,
+                               help="Standardized residual above which a reading is flagged as a gross error")
+    stream_parser.add_argument('--patience', type=int, default=3,
+                               help="Consecutive flagged samples before a component is excluded or restored")
+    stream_parser.add_argument('--no-sidecar', action='store_true', help="Solve the project without the sidecar cache")
+    stream_parser.add_argument('--flush', action='store_true', help="Flush output after every sample")
+    stream_parser.set_defaults(handler=stream_command)
+
+    import_parser = subparsers.add_parser('import', help="Import components from a CSV or TSV file into a project")
+    import_parser.add_argument('components', help="Delimited file with name, mole_fraction, molar_weight and/or formula columns")
+    import_parser.add_argument('-p', '--project', help="Existing project JSON file to add the components to")
+    import_parser.add_argument('-o', '--output', help="Write the project JSON to this file instead of stdout")
+    import_parser.add_argument('--role', choices=['reactant', 'product'],
+                               help="Import every row with this role instead of reading a role column")
+    import_parser.add_argument('--total-mass', type=float, help="Total reactant mass flow (kg/h) for the project")
+    import_parser.set_defaults(handler=import_command)
+
+    tune_parser = subparsers.add_parser('tune', help="Tune search limits and tolerances on a corpus and save a profile")
+    tune_parser.add_argument('corpus', nargs='+', help="Project JSON files or directories of them")
+    tune_parser.add_argument('-n', '--name', required=True, help="Name of the profile to save")
+    tune_parser.add_argument('-j', '--workers', type=int, help="Number of worker processes (default: CPU count)")
+    tune_parser.add_argument('--repeats', type=int, default=1, help="Time each parameter set this many times and keep the fastest")
+    tune_parser.add_argument('--max-error', type=float,
+                             help="Largest acceptable mean mass-balance error (default: the error with the default limits)")
+    tune_parser.add_argument('--profile-dir', help="Directory of tuning profiles")
+    tune_parser.set_defaults(handler=tune_command)
+
+    watch_parser = subparsers.add_parser('watch', help="Watch a directory and solve flowsheet JSON files dropped into it")
+    watch_parser.add_argument('directory', help="Spool directory to watch")
+    watch_parser.add_argument('-j', '--workers', type=int, help="Number of worker processes (default: CPU count)")
+    watch_parser.add_argument('--interval', type=float, default=1.0, help="Seconds between directory scans")
+    watch_parser.add_argument('--metrics-port', type=int, help="Serve Prometheus metrics on this port")
+    watch_parser.set_defaults(handler=watch_command)
+
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
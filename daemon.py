@@ -0,0 +1,208 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from flows import prepare_project_flows
+import metrics
+from results import results_to_dict
+from sidecar import content_hash
+from solver import solve_stoichiometry
+
+RESULT_SUFFIX = '.result.json'
+STATUS_FILENAME = 'status.json'
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_CACHED_RESULTS = 1000
+THROUGHPUT_WINDOW = 60.0
+
+def result_path(project_filename):
+    return os.path.splitext(project_filename)[0] + RESULT_SUFFIX
+
+def write_json_atomic(filename, data):
+    temp_filename = filename + '.tmp'
+    with open(temp_filename, 'w') as f:
+        json.dump(data, f, indent=4)
+    os.replace(temp_filename, filename)
+
+def solve_flowsheet(content):
+    data = json.loads(content)
+    prepare_project_flows(data)
+    reactions = data.get('reactions', [])
+    result = solve_stoichiometry(data.get('reactants', []), data.get('products', []), reactions)
+    if not result['success']:
+        return {'success': False, 'error': result.get('error', 'Unknown error occurred'), 'diagnostics': result.get('diagnostics')}
+    return dict(success=True, **results_to_dict(result, reactions))
+
+def solve_flowsheet_in_worker(content):
+    metrics.reset()
+    try:
+        result = solve_flowsheet(content)
+    except Exception as e:
+        result = {'success': False, 'error': f"{type(e).__name__}: {e}"}
+    return result, metrics.collect()
+
+class SpoolDaemon:
+    def __init__(self, directory, max_workers=None, poll_interval=DEFAULT_POLL_INTERVAL, status_filename=STATUS_FILENAME,
+                 max_cached_results=DEFAULT_CACHED_RESULTS):
+        self.directory = directory
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.poll_interval = poll_interval
+        self.status_path = os.path.join(directory, status_filename)
+        self.max_cached_results = max_cached_results
+
+        self.observed = {}
+        self.processed = {}
+        self.solved_hashes = {}
+        self.results_by_hash = OrderedDict()
+        self.pending = deque()
+        self.running = {}
+        self.in_flight = {}
+        self.counts = {'solved': 0, 'deduplicated': 0, 'failed': 0}
+        self.completed = deque()
+        self.solve_seconds = 0.0
+        self.stop_event = threading.Event()
+
+    def is_flowsheet(self, name):
+        return (name.endswith('.json') and not name.endswith(RESULT_SUFFIX)
+                and os.path.join(self.directory, name) != self.status_path)
+
+    def scan(self):
+        current = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file() and self.is_flowsheet(entry.name):
+                    stat = entry.stat()
+                    current[entry.path] = (stat.st_mtime_ns, stat.st_size)
+
+        queued = set(self.pending) | {path for path, _, _, _ in self.running.values()}
+        queued.update(path for waiting in self.in_flight.values() for path, _ in waiting)
+        for path, key in current.items():
+            stable = self.observed.get(path) == key
+            if stable and self.processed.get(path) != key and path not in queued:
+                self.pending.append(path)
+        for path in [path for path in self.processed if path not in current]:
+            del self.processed[path]
+            self.solved_hashes.pop(path, None)
+        self.observed = current
+
+    def stored_hash(self, path):
+        if path not in self.solved_hashes:
+            try:
+                with open(result_path(path)) as f:
+                    self.solved_hashes[path] = json.load(f).get('project_hash')
+            except (OSError, ValueError):
+                self.solved_hashes[path] = None
+        return self.solved_hashes[path]
+
+    def record(self, outcome):
+        self.counts[outcome] += 1
+        self.completed.append(time.monotonic())
+        metrics.increment('stoichiometry_spool_files_total', outcome=outcome)
+
+    def write_result(self, path, project_hash, result):
+        write_json_atomic(result_path(path), dict(result, source=os.path.basename(path), project_hash=project_hash))
+        self.solved_hashes[path] = project_hash
+
+    def cache_result(self, project_hash, result):
+        self.results_by_hash[project_hash] = result
+        self.results_by_hash.move_to_end(project_hash)
+        while len(self.results_by_hash) > self.max_cached_results:
+            self.results_by_hash.popitem(last=False)
+
+    def dispatch(self, executor):
+        while self.pending and len(self.running) < self.max_workers:
+            path = self.pending.popleft()
+            key = self.observed.get(path)
+            try:
+                with open(path, 'rb') as f:
+                    content = f.read()
+            except OSError:
+                continue
+
+            project_hash = content_hash(content)
+            if self.stored_hash(path) == project_hash:
+                self.processed[path] = key
+                self.record('deduplicated')
+                continue
+            if project_hash in self.results_by_hash:
+                self.write_result(path, project_hash, self.results_by_hash[project_hash])
+                self.processed[path] = key
+                self.record('deduplicated')
+                continue
+            if project_hash in self.in_flight:
+                self.in_flight[project_hash].append((path, key))
+                continue
+
+            future = executor.submit(solve_flowsheet_in_worker, content)
+            self.running[future] = (path, key, project_hash, time.monotonic())
+            self.in_flight[project_hash] = []
+
+    def collect(self, timeout=0):
+        if not self.running:
+            return
+        done, _ = wait(self.running, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            path, key, project_hash, start = self.running.pop(future)
+            self.solve_seconds += time.monotonic() - start
+            try:
+                result, worker_metrics = future.result()
+                metrics.absorb(*worker_metrics)
+            except Exception as e:
+                result = {'success': False, 'error': f"{type(e).__name__}: {e}"}
+
+            self.write_result(path, project_hash, result)
+            self.processed[path] = key
+            if result['success']:
+                self.cache_result(project_hash, result)
+                self.record('solved')
+            else:
+                self.record('failed')
+
+            for duplicate_path, duplicate_key in self.in_flight.pop(project_hash):
+                self.write_result(duplicate_path, project_hash, result)
+                self.processed[duplicate_path] = duplicate_key
+                self.record('deduplicated')
+
+    def status(self):
+        now = time.monotonic()
+        while self.completed and now - self.completed[0] > THROUGHPUT_WINDOW:
+            self.completed.popleft()
+        solved = self.counts['solved'] + self.counts['failed']
+        return {
+            'directory': os.path.abspath(self.directory),
+            'updated_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'workers': self.max_workers,
+            'queue_depth': len(self.pending),
+            'running': len(self.running),
+            'waiting_on_duplicates': sum(len(waiting) for waiting in self.in_flight.values()),
+            'solved': self.counts['solved'],
+            'deduplicated': self.counts['deduplicated'],
+            'failed': self.counts['failed'],
+            'files_per_minute': len(self.completed) * 60.0 / THROUGHPUT_WINDOW,
+            'mean_solve_seconds': self.solve_seconds / solved if solved else None
+        }
+
+    def write_status(self):
+        write_json_atomic(self.status_path, self.status())
+
+    def run_once(self, executor):
+        self.scan()
+        self.dispatch(executor)
+        self.collect(timeout=self.poll_interval)
+        self.dispatch(executor)
+        self.write_status()
+
+    def run(self):
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            while not self.stop_event.is_set():
+                started = time.monotonic()
+                self.run_once(executor)
+                self.stop_event.wait(max(0.0, self.poll_interval - (time.monotonic() - started)))
+            self.pending.clear()
+            while self.running:
+                self.collect(timeout=None)
+            self.write_status()
+
+    def stop(self):
+        self.stop_event.set()
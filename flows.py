@@ -0,0 +1,186 @@
+import json
+import threading
+import numpy as np
+from solver import StoichiometrySolver, SOLVER_BACKENDS, component_molar_weight
+from formula import formula_molar_weight
+from results import coefficient_array
+import metrics
+
+_coefficient_cache = {}
+_coefficient_cache_lock = threading.Lock()
+COEFFICIENT_CACHE_SIZE = 64
+SOLVER_SETTINGS = ('max_coeff', 'max_coeff_limit', 'level_tolerance', 'best_error_limit', 'mass_balance_tolerance',
+                   'max_denominator', 'top_k', 'exact_preference', 'nonnegative_extents', 'reaction_time_budget',
+                   'reaction_max_evaluations', 'memory_budget')
+
+def reactant_flows(total_mass, mole_fractions, molar_weights):
+    total_mass = np.asarray(total_mass, dtype=float)[..., None]
+    mole_fractions = np.asarray(mole_fractions, dtype=float)
+    molar_weights = np.asarray(molar_weights, dtype=float)
+
+    valid_weights = molar_weights > 0
+    mass_flows = np.where(valid_weights, total_mass * mole_fractions, 0.0)
+    molar_flows = np.divide(mass_flows, molar_weights, out=np.zeros_like(mass_flows), where=valid_weights)
+    return mass_flows, molar_flows
+
+def product_flows(total_mass, mole_fractions, molar_weights):
+    total_mass = np.asarray(total_mass, dtype=float)
+    mole_fractions = np.asarray(mole_fractions, dtype=float)
+    molar_weights = np.asarray(molar_weights, dtype=float)
+
+    avg_molar_weight = mole_fractions @ molar_weights
+    total_molar_flow = total_mass / avg_molar_weight
+    molar_flows = total_molar_flow[..., None] * mole_fractions
+    mass_flows = molar_flows * molar_weights
+    mass_balance_errors = np.abs(total_mass - mass_flows.sum(axis=-1))
+    return mass_flows, molar_flows, mass_balance_errors
+
+def prepare_project_flows(data):
+    total_mass = data.get('total_reactant_mass', 0.0)
+    reactants = data.get('reactants', [])
+    products = data.get('products', [])
+
+    for component in reactants + products:
+        if 'molar_weight' not in component and component.get('formula'):
+            component['molar_weight'] = formula_molar_weight(component['formula'])
+
+    if reactants:
+        mass_flows, molar_flows = reactant_flows(
+            total_mass,
+            [r['mole_fraction'] for r in reactants],
+            [r['molar_weight'] for r in reactants]
+        )
+        for reactant, mass_flow, molar_flow in zip(reactants, mass_flows.tolist(), molar_flows.tolist()):
+            reactant['mass_flow'] = mass_flow
+            reactant['molar_flow'] = molar_flow
+
+    if total_mass > 0 and products:
+        mass_flows, molar_flows, _ = product_flows(
+            total_mass,
+            [p['mole_fraction'] for p in products],
+            [p['molar_weight'] for p in products]
+        )
+        for product, mass_flow, molar_flow in zip(products, mass_flows.tolist(), molar_flows.tolist()):
+            product['mass_flow'] = mass_flow
+            product['molar_flow'] = molar_flow
+
+    return project_product_summary(data)
+
+def project_product_summary(data):
+    total_mass = data.get('total_reactant_mass', 0.0)
+    products = data.get('products', [])
+    if total_mass <= 0 or not products:
+        return None
+
+    mole_fractions = np.array([p['mole_fraction'] for p in products], dtype=float)
+    molar_weights = np.array([p['molar_weight'] for p in products], dtype=float)
+    total_calculated_mass = float(sum(p['mass_flow'] for p in products))
+    avg_molar_weight = float(mole_fractions @ molar_weights)
+
+    return {
+        'total_mole_fraction': float(mole_fractions.sum()),
+        'total_mass_flow': float(total_mass),
+        'avg_molar_weight': avg_molar_weight,
+        'total_molar_flow': float(total_mass / avg_molar_weight),
+        'total_calculated_mass': total_calculated_mass,
+        'mass_balance_error': abs(total_mass - total_calculated_mass)
+    }
+
+def structure_key(reactants, products, reactions, solver=None):
+    if solver is None:
+        solver = StoichiometrySolver()
+    return json.dumps([
+        [(c['name'], component_molar_weight(c), c.get('formula')) for c in reactants],
+        [(c['name'], component_molar_weight(c), c.get('formula')) for c in products],
+        [(r.get('name'), r['reactants'], r['products'], r.get('backend')) for r in reactions],
+        [getattr(solver, name) for name in SOLVER_SETTINGS],
+        list(SOLVER_BACKENDS)
+    ])
+
+def solve_structure(reactants, products, reactions, solver=None, cache=None):
+    if cache is None:
+        cache = _coefficient_cache
+    if solver is None:
+        solver = StoichiometrySolver()
+    key = structure_key(reactants, products, reactions, solver)
+
+    with _coefficient_cache_lock:
+        solution = cache.pop(key, None)
+        if solution is not None:
+            cache[key] = solution
+    metrics.increment('stoichiometry_cache_requests_total', cache='coefficients', result='miss' if solution is None else 'hit')
+    if solution is None:
+        solution = solver.solve_stoichiometry(reactants, products, reactions)
+        with _coefficient_cache_lock:
+            cache[key] = solution
+            while len(cache) > COEFFICIENT_CACHE_SIZE:
+                del cache[next(iter(cache))]
+    return solution
+
+def clear_coefficient_cache():
+    with _coefficient_cache_lock:
+        _coefficient_cache.clear()
+
+def run_sweep(reactants, products, reactions, total_masses, reactant_fractions=None, product_fractions=None,
+              solver=None, cache=None):
+    if solver is None:
+        solver = StoichiometrySolver()
+    total_masses = np.asarray(total_masses, dtype=float)
+    reactant_weights = np.array([component_molar_weight(c) for c in reactants], dtype=float)
+    product_weights = np.array([component_molar_weight(c) for c in products], dtype=float)
+
+    if reactant_fractions is None:
+        reactant_fractions = [[c['mole_fraction'] for c in reactants]]
+    if product_fractions is None:
+        product_fractions = [[c['mole_fraction'] for c in products]]
+    reactant_fractions = np.asarray(reactant_fractions, dtype=float).reshape(-1, len(reactants))
+    product_fractions = np.asarray(product_fractions, dtype=float).reshape(-1, len(products))
+
+    grid_totals = total_masses[:, None, None]
+    reactant_mass, reactant_molar = reactant_flows(grid_totals, reactant_fractions[None, :, None, :], reactant_weights)
+    product_mass, product_molar, product_errors = product_flows(grid_totals, product_fractions[None, None, :, :], product_weights)
+
+    grid_shape = (len(total_masses), len(reactant_fractions), len(product_fractions))
+    reactant_mass = np.broadcast_to(reactant_mass, grid_shape + (len(reactants),))
+    reactant_molar = np.broadcast_to(reactant_molar, grid_shape + (len(reactants),))
+    product_mass = np.broadcast_to(product_mass, grid_shape + (len(products),))
+    product_molar = np.broadcast_to(product_molar, grid_shape + (len(products),))
+    product_errors = np.broadcast_to(product_errors, grid_shape)
+
+    solution = solve_structure(reactants, products, reactions, solver=solver, cache=cache)
+    if not solution['success']:
+        return solution
+
+    nu_matrix = coefficient_array(solution)
+    component_names = solution['component_names']
+
+    signed_flows = np.concatenate([-reactant_molar, product_molar], axis=-1)
+    all_names = [c['name'] for c in reactants + products]
+    last_position = {name: index for index, name in enumerate(all_names)}
+    signed_flows = signed_flows[..., [last_position[name] for name in component_names]]
+
+    flow_columns = signed_flows.reshape(-1, len(component_names)).T
+    extents, _ = solver.calculate_block_extents(nu_matrix, flow_columns, component_names)
+    extent_residuals = np.linalg.norm(nu_matrix @ extents - flow_columns, axis=0)
+
+    return {
+        'success': solution['success'],
+        'component_names': component_names,
+        'total_masses': total_masses,
+        'reactant_fractions': reactant_fractions,
+        'product_fractions': product_fractions,
+        'reactant_mass_flows': np.ascontiguousarray(reactant_mass),
+        'reactant_molar_flows': np.ascontiguousarray(reactant_molar),
+        'product_mass_flows': np.ascontiguousarray(product_mass),
+        'product_molar_flows': np.ascontiguousarray(product_molar),
+        'product_mass_balance_errors': np.ascontiguousarray(product_errors),
+        'stoichiometric_coefficients': nu_matrix,
+        'mass_balance_errors': np.array(solution['mass_balance_errors']),
+        'reaction_extents': extents.T.reshape(grid_shape + (nu_matrix.shape[1],)),
+        'extent_residuals': extent_residuals.reshape(grid_shape)
+    }
+
+def save_sweep(sweep, filename):
+    arrays = {key: value for key, value in sweep.items() if isinstance(value, np.ndarray)}
+    arrays['component_names'] = np.array(sweep['component_names'])
+    np.savez_compressed(filename, **arrays)
@@ -0,0 +1,115 @@
+import re
+from fractions import Fraction
+from functools import lru_cache
+from math import gcd, lcm
+
+ATOMIC_WEIGHTS = {
+    'H': 1.008, 'He': 4.0026, 'Li': 6.94, 'Be': 9.0122, 'B': 10.81, 'C': 12.011, 'N': 14.007, 'O': 15.999,
+    'F': 18.998, 'Ne': 20.180, 'Na': 22.990, 'Mg': 24.305, 'Al': 26.982, 'Si': 28.085, 'P': 30.974, 'S': 32.06,
+    'Cl': 35.45, 'Ar': 39.948, 'K': 39.098, 'Ca': 40.078, 'Sc': 44.956, 'Ti': 47.867, 'V': 50.942, 'Cr': 51.996,
+    'Mn': 54.938, 'Fe': 55.845, 'Co': 58.933, 'Ni': 58.693, 'Cu': 63.546, 'Zn': 65.38, 'Ga': 69.723, 'Ge': 72.630,
+    'As': 74.922, 'Se': 78.971, 'Br': 79.904, 'Kr': 83.798, 'Rb': 85.468, 'Sr': 87.62, 'Y': 88.906, 'Zr': 91.224,
+    'Nb': 92.906, 'Mo': 95.95, 'Tc': 98.0, 'Ru': 101.07, 'Rh': 102.91, 'Pd': 106.42, 'Ag': 107.87, 'Cd': 112.41,
+    'In': 114.82, 'Sn': 118.71, 'Sb': 121.76, 'Te': 127.60, 'I': 126.90, 'Xe': 131.29, 'Cs': 132.91, 'Ba': 137.33,
+    'La': 138.91, 'Ce': 140.12, 'Pr': 140.91, 'Nd': 144.24, 'Pm': 145.0, 'Sm': 150.36, 'Eu': 151.96, 'Gd': 157.25,
+    'Tb': 158.93, 'Dy': 162.50, 'Ho': 164.93, 'Er': 167.26, 'Tm': 168.93, 'Yb': 173.05, 'Lu': 174.97, 'Hf': 178.49,
+    'Ta': 180.95, 'W': 183.84, 'Re': 186.21, 'Os': 190.23, 'Ir': 192.22, 'Pt': 195.08, 'Au': 196.97, 'Hg': 200.59,
+    'Tl': 204.38, 'Pb': 207.2, 'Bi': 208.98, 'Po': 209.0, 'At': 210.0, 'Rn': 222.0, 'Fr': 223.0, 'Ra': 226.0,
+    'Ac': 227.0, 'Th': 232.04, 'Pa': 231.04, 'U': 238.03
+}
+
+TOKEN_PATTERN = re.compile(r'([A-Z][a-z]?)|(\d+)|([(\[])|([)\]])|([.·*])|(\s+)|(.)')
+
+@lru_cache(maxsize=4096)
+def parse_formula(formula):
+    stack = [{}]
+    hydrate_multiplier = None
+    last_group = None
+
+    for element, number, open_group, close_group, hydrate_dot, space, other in TOKEN_PATTERN.findall(formula):
+        if element:
+            if element not in ATOMIC_WEIGHTS:
+                raise ValueError(f"Unknown element '{element}' in formula '{formula}'")
+            last_group = {element: 1}
+            add_counts(stack[-1], last_group)
+        elif number:
+            count = int(number)
+            if last_group is None:
+                if hydrate_multiplier is None or stack[-1]:
+                    raise ValueError(f"Misplaced count in formula '{formula}'")
+                hydrate_multiplier = count
+            else:
+                add_counts(stack[-1], {element: n * (count - 1) for element, n in last_group.items()})
+                last_group = None
+        elif open_group:
+            stack.append({})
+            last_group = None
+        elif close_group:
+            if len(stack) == 1:
+                raise ValueError(f"Unbalanced brackets in formula '{formula}'")
+            last_group = stack.pop()
+            add_counts(stack[-1], last_group)
+        elif hydrate_dot:
+            if len(stack) != 1:
+                raise ValueError(f"Unbalanced brackets in formula '{formula}'")
+            stack = [stack[0], {}]
+            hydrate_multiplier = 1
+            last_group = None
+        elif other:
+            raise ValueError(f"Unexpected character '{other}' in formula '{formula}'")
+
+    if hydrate_multiplier is not None:
+        hydrate = stack.pop()
+        add_counts(stack[-1], {element: n * hydrate_multiplier for element, n in hydrate.items()})
+
+    if len(stack) != 1 or not stack[0]:
+        raise ValueError(f"Invalid formula '{formula}'")
+
+    return tuple(sorted(stack[0].items()))
+
+def add_counts(counts, addition):
+    for element, n in addition.items():
+        counts[element] = counts.get(element, 0) + n
+
+def formula_molar_weight(formula):
+    return sum(ATOMIC_WEIGHTS[element] * count for element, count in parse_formula(formula))
+
+def element_matrix(formulas):
+    parsed = [dict(parse_formula(formula)) for formula in formulas]
+    elements = sorted({element for counts in parsed for element in counts})
+    return elements, [[counts.get(element, 0) for counts in parsed] for element in elements]
+
+def integer_nullspace(matrix, n_columns):
+    rows = [[Fraction(value) for value in row] for row in matrix]
+    pivot_columns = []
+    pivot_row = 0
+
+    for column in range(n_columns):
+        pivot = next((r for r in range(pivot_row, len(rows)) if rows[r][column] != 0), None)
+        if pivot is None:
+            continue
+        rows[pivot_row], rows[pivot] = rows[pivot], rows[pivot_row]
+        pivot_value = rows[pivot_row][column]
+        rows[pivot_row] = [value / pivot_value for value in rows[pivot_row]]
+        for r in range(len(rows)):
+            if r != pivot_row and rows[r][column] != 0:
+                factor = rows[r][column]
+                rows[r] = [value - factor * pivot for value, pivot in zip(rows[r], rows[pivot_row])]
+        pivot_columns.append(column)
+        pivot_row += 1
+        if pivot_row == len(rows):
+            break
+
+    basis = []
+    for free_column in (c for c in range(n_columns) if c not in pivot_columns):
+        vector = [Fraction(0)] * n_columns
+        vector[free_column] = Fraction(1)
+        for r, pivot_column in enumerate(pivot_columns):
+            vector[pivot_column] = -rows[r][free_column]
+
+        denominator = lcm(*(value.denominator for value in vector))
+        integers = [int(value * denominator) for value in vector]
+        divisor = gcd(*integers)
+        basis.append([value // divisor for value in integers])
+
+    return basis
@@ -2,9 +2,57 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import json
 import os
-from solver import solve_stoichiometry
+from solver import StoichiometrySolver, solve_stoichiometry
+from flows import run_sweep, save_sweep, prepare_project_flows, product_flows, project_product_summary, reactant_flows
+from importer import read_component_file, format_import_errors
+from formula import formula_molar_weight
+from results import coefficient_table, reaction_labels, write_results_csv, write_results_json
+from sidecar import content_hash, load_project_sidecar, save_project_sidecar, apply_sidecar_flows, sidecar_result
+import io
+import itertools
+import queue
+import threading
 import numpy as np
 
+RESULTS_PAGE_SIZE = 500
+RESULTS_RENDER_CHUNK = 100
+RESULT_ALTERNATIVES = 5
+PROJECT_READ_CHUNK = 256 * 1024
+PROJECT_READ_SHARE = 0.5
+PROJECT_LOAD_BATCH = 200
+PROJECT_LOAD_POLL_MS = 50
+
+def read_project_file(filename, cancel_event, messages):
+    try:
+        file_size = max(os.path.getsize(filename), 1)
+        chunks = []
+        bytes_read = 0
+        with open(filename, 'rb') as f:
+            while True:
+                if cancel_event.is_set():
+                    messages.put(('cancelled',))
+                    return
+                chunk = f.read(PROJECT_READ_CHUNK)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                bytes_read += len(chunk)
+                messages.put(('progress', 0.8 * PROJECT_READ_SHARE * bytes_read / file_size))
+
+        content = b''.join(chunks)
+        data = json.loads(content)
+        sidecar = load_project_sidecar(filename, content)
+        if sidecar is not None and apply_sidecar_flows(data, sidecar):
+            product_summary = project_product_summary(data)
+            cached_result = sidecar_result(sidecar)
+        else:
+            product_summary = prepare_project_flows(data)
+            cached_result = None
+        messages.put(('progress', PROJECT_READ_SHARE))
+        messages.put(('loaded', data, product_summary, cached_result))
+    except Exception as e:
+        messages.put(('error', str(e)))
+
 class ChemicalComponentGUI:
     def __init__(self, root):
         self.root = root
@@ -17,6 +65,16 @@ class ChemicalComponentGUI:
         self.total_reactant_mass = 0.0
         self.total_product_mass = 0.0
         self.reactions = []
+        self.last_sweep = None
+        self.last_result = None
+        self.last_result_reactions = None
+        self.last_result_hash = None
+        self.result_rows = None
+        self.result_order = None
+        self.result_sort = (None, False)
+        self.result_page = 0
+        self.result_rendered = 0
+        self.project_load = None
 
         self.colors = {
             'primary': '#2c3e50',
@@ -108,7 +166,7 @@ class ChemicalComponentGUI:
         input_grid = tk.Frame(reactants_frame, bg=self.colors['light'])
         input_grid.pack(fill=tk.X, pady=5)
         
-        headers = ["Name", "Mole Frac", "MW"]
+        headers = ["Name", "Mole Frac", "MW", "Formula"]
         for i, header in enumerate(headers):
             tk.Label(input_grid, text=header, font=('Arial', 9, 'bold'),
                     bg=self.colors['light']).grid(row=0, column=i, padx=2, pady=2, sticky=tk.W)
@@ -122,8 +180,11 @@ class ChemicalComponentGUI:
         self.reactant_mw = ttk.Entry(input_grid, width=8, font=('Arial', 9))
         self.reactant_mw.grid(row=1, column=2, padx=2, pady=2)
         
+        self.reactant_formula = ttk.Entry(input_grid, width=10, font=('Arial', 9))
+        self.reactant_formula.grid(row=1, column=3, padx=2, pady=2)
+        
         ttk.Button(input_grid, text="➕ Add", 
-                command=self.add_reactant, style='Success.TButton').grid(row=1, column=3, padx=5)
+                command=self.add_reactant, style='Success.TButton').grid(row=1, column=4, padx=5)
         
         products_frame = ttk.LabelFrame(left_pane, text="📤 PRODUCTS OUTPUT", padding=10)
         products_frame.pack(fill=tk.X, pady=(0, 10))
@@ -144,8 +205,11 @@ class ChemicalComponentGUI:
         self.product_mw = ttk.Entry(product_input_grid, width=8, font=('Arial', 9))
         self.product_mw.grid(row=1, column=2, padx=2, pady=2)
         
+        self.product_formula = ttk.Entry(product_input_grid, width=10, font=('Arial', 9))
+        self.product_formula.grid(row=1, column=3, padx=2, pady=2)
+        
         ttk.Button(product_input_grid, text="➕ Add", 
-                command=self.add_product, style='Success.TButton').grid(row=1, column=3, padx=5)
+                command=self.add_product, style='Success.TButton').grid(row=1, column=4, padx=5)
         
         reaction_frame = ttk.LabelFrame(left_pane, text="🔄 REACTION DEFINITIONS", padding=10)
         reaction_frame.pack(fill=tk.X, pady=(0, 10))
@@ -208,6 +272,7 @@ class ChemicalComponentGUI:
         buttons = [
             ("💾 Save to JSON", self.save_to_json, self.colors['accent']),
             ("📂 Load from JSON", self.load_from_json, self.colors['secondary']),
+            ("📥 Import CSV", self.import_components, self.colors['secondary']),
             ("🧮 Calculate All", self.calculate_all_flows, self.colors['success']),
             ("🗑️ Clear All", self.clear_all, self.colors['warning'])
         ]
@@ -382,6 +447,10 @@ class ChemicalComponentGUI:
         
         self.products_tree.pack(fill=tk.BOTH, expand=True)
 
+        sweep_tab = ttk.Frame(self.notebook, padding=5)
+        self.notebook.add(sweep_tab, text="Sweep")
+        self.create_sweep_section(sweep_tab)
+
         table_controls = tk.Frame(preview_frame, bg=self.colors['light'], pady=5)
         table_controls.pack(fill=tk.X)
         
@@ -390,6 +459,116 @@ class ChemicalComponentGUI:
         ttk.Button(table_controls, text="🗑️ Remove Product", 
                 command=self.remove_product).pack(side=tk.LEFT)
         
+    def create_sweep_section(self, parent):
+        sweep_grid = tk.Frame(parent, bg=self.colors['light'])
+        sweep_grid.pack(fill=tk.X)
+
+        sweep_fields = [
+            ("Min Mass (kg/h)", 'sweep_min_mass'),
+            ("Max Mass (kg/h)", 'sweep_max_mass'),
+            ("Mass Steps", 'sweep_mass_steps'),
+            ("Compositions", 'sweep_compositions'),
+            ("Spread (%)", 'sweep_spread')
+        ]
+        for i, (label, attribute) in enumerate(sweep_fields):
+            tk.Label(sweep_grid, text=label, font=('Arial', 9, 'bold'),
+                    bg=self.colors['light']).grid(row=i // 3 * 2, column=i % 3, padx=2, pady=2, sticky=tk.W)
+            entry = ttk.Entry(sweep_grid, width=12, font=('Arial', 9))
+            entry.grid(row=i // 3 * 2 + 1, column=i % 3, padx=2, pady=2)
+            setattr(self, attribute, entry)
+
+        self.sweep_mass_steps.insert(0, "10")
+        self.sweep_compositions.insert(0, "1")
+        self.sweep_spread.insert(0, "0")
+
+        sweep_controls = tk.Frame(parent, bg=self.colors['light'], pady=5)
+        sweep_controls.pack(fill=tk.X)
+
+        ttk.Button(sweep_controls, text="📈 Run Sweep",
+                command=self.run_parameter_sweep).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(sweep_controls, text="💾 Export Grid",
+                command=self.export_sweep).pack(side=tk.LEFT)
+
+        self.sweep_summary_var = tk.StringVar(value="Sweep total mass and composition over a grid")
+        tk.Label(parent, textvariable=self.sweep_summary_var, justify=tk.LEFT, anchor=tk.W,
+                font=('Consolas', 8), bg=self.colors['light']).pack(fill=tk.BOTH, expand=True)
+
+    def sample_compositions(self, components, n_variants, spread, rng):
+        fractions = np.array([c['mole_fraction'] for c in components], dtype=float)
+        if n_variants <= 1 or spread == 0:
+            return fractions[None, :]
+
+        variants = fractions * (1 + spread * rng.uniform(-1, 1, size=(n_variants - 1, len(fractions))))
+        variants = np.clip(variants, 0, None)
+        variants *= fractions.sum() / variants.sum(axis=1, keepdims=True)
+        return np.vstack([fractions, variants])
+
+    def run_parameter_sweep(self):
+        if not self.reactants or not self.products or not self.reactions:
+            messagebox.showerror("Error", "Define reactants, products and reactions before sweeping")
+            return
+
+        checks = [
+            self.validate_number(self.sweep_min_mass.get().strip(), "Min mass", allow_zero=False),
+            self.validate_number(self.sweep_max_mass.get().strip(), "Max mass", allow_zero=False),
+            self.validate_number(self.sweep_mass_steps.get().strip(), "Mass steps", allow_zero=False),
+            self.validate_number(self.sweep_compositions.get().strip(), "Compositions", allow_zero=False),
+            self.validate_number(self.sweep_spread.get().strip(), "Spread")
+        ]
+        for valid, value in checks:
+            if not valid:
+                messagebox.showerror("Error", value)
+                return
+        min_mass, max_mass, mass_steps, n_compositions, spread = [value for valid, value in checks]
+        if int(mass_steps) < 1 or int(n_compositions) < 1:
+            messagebox.showerror("Error", "Mass steps and compositions must be at least 1")
+            return
+
+        rng = np.random.default_rng(0)
+        try:
+            self.last_sweep = run_sweep(
+                self.reactants, self.products, self.reactions,
+                np.linspace(min_mass, max_mass, int(mass_steps)),
+                self.sample_compositions(self.reactants, int(n_compositions), spread / 100, rng),
+                self.sample_compositions(self.products, int(n_compositions), spread / 100, rng)
+            )
+        except Exception as e:
+            messagebox.showerror("Error", f"Sweep failed: {str(e)}")
+            return
+
+        sweep = self.last_sweep
+        if not sweep['success']:
+            self.last_sweep = None
+            messagebox.showerror("Error", f"Sweep failed: {sweep.get('error', 'Unknown error occurred')}")
+            return
+
+        n_points = sweep['extent_residuals'].size
+        self.sweep_summary_var.set(
+            f"Grid points: {n_points}\n"
+            f"Max product mass error: {sweep['product_mass_balance_errors'].max():.4f} kg/h\n"
+            f"Extent residual: {sweep['extent_residuals'].min():.4f} - {sweep['extent_residuals'].max():.4f}\n"
+            f"Total reaction mass error: {sweep['mass_balance_errors'].sum():.4f} kg/h"
+        )
+        self.status_var.set(f"📈 Sweep evaluated over {n_points} grid points")
+
+    def export_sweep(self):
+        if self.last_sweep is None:
+            messagebox.showwarning("Warning", "Run a sweep first")
+            return
+
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".npz",
+            filetypes=[("NumPy archive", "*.npz"), ("All files", "*.*")],
+            title="Export Sweep Grid"
+        )
+
+        if filename:
+            try:
+                save_sweep(self.last_sweep, filename)
+                self.status_var.set(f"💾 Sweep grid exported to {os.path.basename(filename)}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to export sweep: {str(e)}")
+
     def create_control_buttons(self, parent):
         control_frame = tk.Frame(parent, bg=self.colors['light'], pady=20)
         control_frame.pack(fill=tk.X)
@@ -397,6 +576,7 @@ class ChemicalComponentGUI:
         buttons = [
             ("💾 Save to JSON", self.save_to_json, self.colors['accent']),
             ("📂 Load from JSON", self.load_from_json, self.colors['secondary']),
+            ("📥 Import CSV", self.import_components, self.colors['secondary']),
             ("🧮 Calculate All", self.calculate_all_flows, self.colors['success']),
             ("🗑️ Clear All", self.clear_all, self.colors['warning'])
         ]
@@ -437,6 +617,16 @@ class ChemicalComponentGUI:
         except ValueError as e:
             return False, f"Invalid {field_name}: {str(e)}"
     
+    def resolve_molar_weight(self, mw_str, formula):
+        if formula:
+            try:
+                formula_weight = formula_molar_weight(formula)
+            except ValueError as e:
+                return False, f"Invalid formula: {str(e)}"
+            if not mw_str:
+                return True, formula_weight
+        return self.validate_number(mw_str, "Molar weight", allow_zero=False)
+
     def calculate_component_mass_flow(self, mole_fraction, molar_weight, total_mass):
         if molar_weight <= 0:
             return 0
@@ -461,6 +651,7 @@ class ChemicalComponentGUI:
         name = self.reactant_name.get().strip()
         fraction_str = self.reactant_fraction.get().strip()
         mw_str = self.reactant_mw.get().strip()
+        formula = self.reactant_formula.get().strip()
         
         if not name:
             messagebox.showerror("Error", "Component name is required")
@@ -471,7 +662,7 @@ class ChemicalComponentGUI:
             messagebox.showerror("Error", fraction)
             return
             
-        valid_mw, mw = self.validate_number(mw_str, "Molar weight", allow_zero=False)
+        valid_mw, mw = self.resolve_molar_weight(mw_str, formula)
         if not valid_mw:
             messagebox.showerror("Error", mw)
             return
@@ -490,6 +681,8 @@ class ChemicalComponentGUI:
             'mass_flow': mass_flow,
             'molar_flow': molar_flow
         }
+        if formula:
+            reactant_data['formula'] = formula
         self.reactants.append(reactant_data)
         
         self.reactants_tree.insert('', tk.END, values=(
@@ -499,6 +692,7 @@ class ChemicalComponentGUI:
         self.reactant_name.delete(0, tk.END)
         self.reactant_fraction.delete(0, tk.END)
         self.reactant_mw.delete(0, tk.END)
+        self.reactant_formula.delete(0, tk.END)
         
         self.status_var.set(f"✅ Added reactant: {name}")
         self.update_counters()
@@ -507,6 +701,7 @@ class ChemicalComponentGUI:
         name = self.product_name.get().strip()
         fraction_str = self.product_fraction.get().strip()
         mw_str = self.product_mw.get().strip()
+        formula = self.product_formula.get().strip()
         
         if not name:
             messagebox.showerror("Error", "Component name is required")
@@ -517,7 +712,7 @@ class ChemicalComponentGUI:
             messagebox.showerror("Error", fraction)
             return
             
-        valid_mw, mw = self.validate_number(mw_str, "Molar weight", allow_zero=False)
+        valid_mw, mw = self.resolve_molar_weight(mw_str, formula)
         if not valid_mw:
             messagebox.showerror("Error", mw)
             return
@@ -533,6 +728,8 @@ class ChemicalComponentGUI:
             'mass_flow': 0.0, 
             'molar_flow': 0.0  
         }
+        if formula:
+            product_data['formula'] = formula
         self.products.append(product_data)
         
         self.products_tree.insert('', tk.END, values=(
@@ -542,6 +739,7 @@ class ChemicalComponentGUI:
         self.product_name.delete(0, tk.END)
         self.product_fraction.delete(0, tk.END)
         self.product_mw.delete(0, tk.END)
+        self.product_formula.delete(0, tk.END)
         
         self.status_var.set(f"✅ Added product: {name} (flows will be calculated)")
         self.update_counters()
@@ -583,14 +781,12 @@ class ChemicalComponentGUI:
         for item in self.reactants_tree.get_children():
             self.reactants_tree.delete(item)
         
-        for reactant in self.reactants:
-            mass_flow = self.calculate_component_mass_flow(
-                reactant['mole_fraction'], 
-                reactant['molar_weight'],
-                self.total_reactant_mass
-            )
-            molar_flow = self.calculate_molar_flow(mass_flow, reactant['molar_weight'])
-            
+        mass_flows, molar_flows = reactant_flows(
+            self.total_reactant_mass,
+            [reactant['mole_fraction'] for reactant in self.reactants],
+            [reactant['molar_weight'] for reactant in self.reactants]
+        )
+        for reactant, mass_flow, molar_flow in zip(self.reactants, mass_flows.tolist(), molar_flows.tolist()):
             reactant['mass_flow'] = mass_flow
             reactant['molar_flow'] = molar_flow
             
@@ -617,6 +813,41 @@ class ChemicalComponentGUI:
         self.status_var.set("🔄 Reactant flows recalculated | Product flows: TBD (from stoichiometry)")
         self.update_counters()
     
+    def import_components(self):
+        filename = filedialog.askopenfilename(
+            filetypes=[("Delimited files", "*.csv *.tsv *.txt"), ("All files", "*.*")],
+            title="Import Components"
+        )
+        if not filename:
+            return
+
+        try:
+            imported = read_component_file(filename, existing_names=[c['name'] for c in self.reactants + self.products])
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Failed to import file: {str(e)}")
+            return
+
+        if imported['errors']:
+            messagebox.showerror("Import Errors", format_import_errors(imported['errors']))
+            self.status_var.set(f"❌ Nothing imported from {os.path.basename(filename)}")
+            return
+
+        self.reactants.extend(imported['reactants'])
+        self.products.extend(imported['products'])
+        product_summary = prepare_project_flows({
+            'total_reactant_mass': self.total_reactant_mass,
+            'reactants': self.reactants,
+            'products': self.products
+        })
+        for tree, values in self.project_rows(imported['reactants'], imported['products']):
+            tree.insert('', tk.END, values=values)
+        self.update_counters()
+        if imported['products'] and product_summary is not None:
+            self.report_product_summary(product_summary)
+
+        self.status_var.set(f"📥 Imported {len(imported['reactants'])} reactants and "
+                            f"{len(imported['products'])} products from {os.path.basename(filename)}")
+
     def update_counters(self):
         reaction_count = len(self.reactions) if hasattr(self, 'reactions') else 0
         self.counter_var.set(f"Reactants: {len(self.reactants)} | Products: {len(self.products)} | Reactions: {reaction_count}")
@@ -664,15 +895,12 @@ class ChemicalComponentGUI:
         
         if filename:
             try:
-                data = {
-                    'total_reactant_mass': self.total_reactant_mass,
-                    'reactants': self.reactants,
-                    'products': self.products,
-                    'reactions': self.reactions
-                }
-                
-                with open(filename, 'w') as f:
-                    json.dump(data, f, indent=4)
+                content = self.project_content()
+                with open(filename, 'wb') as f:
+                    f.write(content)
+
+                result = self.last_result if self.last_result_hash == content_hash(content) else None
+                save_project_sidecar(filename, content, self.project_data(), result, self.last_result_reactions)
                 
                 self.status_var.set(f"💾 Data saved to {os.path.basename(filename)}")
                 messagebox.showinfo("Success", f"Data successfully saved to {filename}")
@@ -680,53 +908,188 @@ class ChemicalComponentGUI:
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to save file: {str(e)}")
     
+    def project_data(self):
+        return {
+            'total_reactant_mass': self.total_reactant_mass,
+            'reactants': self.reactants,
+            'products': self.products,
+            'reactions': self.reactions
+        }
+
+    def project_content(self):
+        return json.dumps(self.project_data(), indent=4).encode()
+
     def load_from_json(self):
+        if self.project_load is not None:
+            messagebox.showwarning("Warning", "A project is already being loaded")
+            return
+
         filename = filedialog.askopenfilename(
             filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
             title="Load Chemical Data"
         )
         
         if filename:
+            self.start_project_load(filename)
+
+    def start_project_load(self, filename):
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Loading Project")
+        dialog.transient(self.root)
+        dialog.resizable(False, False)
+        dialog.protocol("WM_DELETE_WINDOW", self.cancel_project_load)
+
+        phase_var = tk.StringVar(value=f"Reading {os.path.basename(filename)}...")
+        progress_var = tk.DoubleVar(value=0.0)
+        ttk.Label(dialog, textvariable=phase_var).pack(padx=15, pady=(12, 4))
+        ttk.Progressbar(dialog, variable=progress_var, maximum=100, length=320,
+                        mode='determinate').pack(padx=15, pady=4)
+        ttk.Button(dialog, text="Cancel", command=self.cancel_project_load).pack(pady=(4, 12))
+
+        self.project_load = {
+            'filename': filename,
+            'cancel': threading.Event(),
+            'messages': queue.Queue(),
+            'dialog': dialog,
+            'phase': phase_var,
+            'progress': progress_var,
+            'rows': None,
+            'populated': 0
+        }
+        threading.Thread(target=read_project_file,
+                         args=(filename, self.project_load['cancel'], self.project_load['messages']),
+                         daemon=True).start()
+
+        self.status_var.set(f"📂 Loading {os.path.basename(filename)}...")
+        self.root.after(PROJECT_LOAD_POLL_MS, self.poll_project_load)
+
+    def poll_project_load(self):
+        load = self.project_load
+        if load is None:
+            return
+
+        while True:
             try:
-                with open(filename, 'r') as f:
-                    data = json.load(f)
-                
-                self.clear_all(message_box=False)
-                
-                if 'total_reactant_mass' in data:
-                    self.total_reactant_mass = data['total_reactant_mass']
-                    self.total_reactant_mass_entry.delete(0, tk.END)
-                    self.total_reactant_mass_entry.insert(0, str(self.total_reactant_mass))
-                
-                if 'reactants' in data:
-                    for reactant in data['reactants']:
-                        self.reactants.append(reactant)
-                
-                if 'products' in data:
-                    for product in data['products']:
-                        self.products.append(product)
-                
-                if 'reactions' in data:
-                    self.reactions = data['reactions']
-                    for item in self.reactions_tree.get_children():
-                        self.reactions_tree.delete(item)
-                    for reaction in self.reactions:
-                        self.reactions_tree.insert('', tk.END, values=(
-                            reaction['name'],
-                            ', '.join(reaction['reactants']),
-                            ', '.join(reaction['products'])
-                        ))
-                
-                if self.total_reactant_mass > 0 and self.products:
-                    self.calculate_product_flows_from_mass_balance()
-                else:
-                    self.calculate_all_flows()
-                
-                self.status_var.set(f"📂 Data loaded from {os.path.basename(filename)}")
-                messagebox.showinfo("Success", f"Data successfully loaded from {filename}")
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to load file: {str(e)}")
+                message = load['messages'].get_nowait()
+            except queue.Empty:
+                break
+
+            kind = message[0]
+            if kind == 'progress':
+                load['progress'].set(100 * message[1])
+            elif kind == 'loaded':
+                self.begin_project_population(message[1], message[2], message[3])
+                return
+            elif kind == 'error':
+                self.finish_project_load()
+                self.status_var.set("❌ Failed to load project")
+                messagebox.showerror("Error", f"Failed to load file: {message[1]}")
+                return
+            elif kind == 'cancelled':
+                self.finish_project_load()
+                self.status_var.set("⏹️ Loading cancelled")
+                return
+
+        self.root.after(PROJECT_LOAD_POLL_MS, self.poll_project_load)
+
+    def begin_project_population(self, data, product_summary, cached_result):
+        load = self.project_load
+        if load['cancel'].is_set():
+            self.finish_project_load()
+            self.status_var.set("⏹️ Loading cancelled")
+            return
+
+        self.clear_all(message_box=False)
+
+        if 'total_reactant_mass' in data:
+            self.total_reactant_mass = data['total_reactant_mass']
+            self.total_reactant_mass_entry.insert(0, str(self.total_reactant_mass))
+
+        self.reactants.extend(data.get('reactants', []))
+        self.products.extend(data.get('products', []))
+        if 'reactions' in data:
+            self.reactions = data['reactions']
+            for item in self.reactions_tree.get_children():
+                self.reactions_tree.delete(item)
+
+        load['phase'].set(f"Populating {os.path.basename(load['filename'])}...")
+        load['product_summary'] = product_summary
+        load['cached_result'] = cached_result
+        load['rows'] = self.project_rows(self.reactants, self.products, self.reactions if 'reactions' in data else ())
+        load['total_rows'] = len(self.reactants) + len(self.products) + (len(self.reactions) if 'reactions' in data else 0)
+        self.root.after(1, self.populate_project_batch)
+
+    def project_rows(self, reactants, products, reactions=()):
+        for reactant in reactants:
+            yield self.reactants_tree, (
+                reactant['name'],
+                f"{reactant['mole_fraction']:.4f}",
+                f"{reactant['molar_weight']:.4f}",
+                f"{reactant['mass_flow']:.4f}",
+                f"{reactant['molar_flow']:.6f}"
+            )
+        for product in products:
+            yield self.products_tree, (
+                product['name'],
+                f"{product['mole_fraction']:.4f}",
+                f"{product['molar_weight']:.4f}",
+                "TBD",
+                "TBD"
+            )
+        for reaction in reactions:
+            yield self.reactions_tree, (
+                reaction['name'],
+                ', '.join(reaction['reactants']),
+                ', '.join(reaction['products'])
+            )
+
+    def populate_project_batch(self):
+        load = self.project_load
+        if load is None:
+            return
+        if load['cancel'].is_set():
+            self.finish_project_load()
+            self.clear_all(message_box=False)
+            self.status_var.set("⏹️ Loading cancelled, partially loaded data cleared")
+            return
+
+        for tree, values in itertools.islice(load['rows'], PROJECT_LOAD_BATCH):
+            tree.insert('', tk.END, values=values)
+            load['populated'] += 1
+
+        if load['populated'] < load['total_rows']:
+            fraction = load['populated'] / load['total_rows']
+            load['progress'].set(100 * (PROJECT_READ_SHARE + (1 - PROJECT_READ_SHARE) * fraction))
+            self.update_counters()
+            self.root.after(1, self.populate_project_batch)
+            return
+
+        filename = load['filename']
+        product_summary = load['product_summary']
+        cached_result = load['cached_result']
+        self.finish_project_load()
+        self.update_counters()
+
+        if product_summary is not None:
+            self.report_product_summary(product_summary)
+
+        if cached_result is not None:
+            self.last_result_reactions = list(self.reactions)
+            self.display_stoichiometry_results(cached_result)
+            self.last_result_hash = content_hash(self.project_content())
+            self.status_var.set(f"📂 Data and cached results loaded from {os.path.basename(filename)}")
+        else:
+            self.status_var.set(f"📂 Data loaded from {os.path.basename(filename)}")
+        messagebox.showinfo("Success", f"Data successfully loaded from {filename}")
+
+    def cancel_project_load(self):
+        if self.project_load is not None:
+            self.project_load['cancel'].set()
+            self.project_load['phase'].set("Cancelling...")
+
+    def finish_project_load(self):
+        self.project_load['dialog'].destroy()
+        self.project_load = None
 
     def create_stoichiometry_section(self, parent):
         stoich_frame = ttk.LabelFrame(parent, text="🧪 STOICHIOMETRY SOLVER", padding=8)
@@ -746,13 +1109,40 @@ class ChemicalComponentGUI:
         text_frame = tk.Frame(results_frame, bg=self.colors['light'])
         text_frame.pack(fill=tk.BOTH, expand=True)
         
-        self.results_text = tk.Text(text_frame, height=10, font=('Consolas', 8),
+        self.results_text = tk.Text(text_frame, height=6, font=('Consolas', 8),
                                 wrap=tk.WORD, bg='#f8f9fa', relief=tk.SUNKEN, bd=1)
         self.results_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
         text_scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=self.results_text.yview)
         text_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.results_text.configure(yscrollcommand=text_scrollbar.set)
+
+        table_frame = tk.Frame(results_frame, bg=self.colors['light'])
+        table_frame.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
+
+        result_columns = ('Reaction', 'Component', 'Role', 'Coefficient', 'Reaction Error')
+        self.results_tree = ttk.Treeview(table_frame, columns=result_columns, show='headings', height=8)
+
+        column_widths = [90, 90, 70, 90, 100]
+        for col, width in zip(result_columns, column_widths):
+            self.results_tree.heading(col, text=col, command=lambda c=col: self.sort_results(c))
+            self.results_tree.column(col, width=width, minwidth=50)
+        self.results_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.results_scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.results_tree.yview)
+        self.results_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.results_tree.configure(yscrollcommand=self.on_results_scroll)
+
+        page_controls = tk.Frame(stoich_frame, bg=self.colors['light'], pady=2)
+        page_controls.pack(fill=tk.X)
+
+        ttk.Button(page_controls, text="◀ Prev",
+                command=lambda: self.show_results_page(self.result_page - 1)).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(page_controls, text="Next ▶",
+                command=lambda: self.show_results_page(self.result_page + 1)).pack(side=tk.LEFT)
+        self.results_page_var = tk.StringVar(value="No results")
+        tk.Label(page_controls, textvariable=self.results_page_var, font=('Arial', 9),
+                bg=self.colors['light']).pack(side=tk.LEFT, padx=10)
         
         results_controls = tk.Frame(stoich_frame, bg=self.colors['light'], pady=5)
         results_controls.pack(fill=tk.X)
@@ -841,7 +1231,10 @@ class ChemicalComponentGUI:
                 
             self.calculate_all_flows()
                 
-            result = solve_stoichiometry(self.reactants, self.products, self.reactions)
+            result = solve_stoichiometry(self.reactants, self.products, self.reactions,
+                                         solver=StoichiometrySolver(top_k=RESULT_ALTERNATIVES))
+            self.last_result_reactions = list(self.reactions)
+            self.last_result_hash = content_hash(self.project_content())
                 
             self.display_stoichiometry_results(result)
 
@@ -857,61 +1250,153 @@ class ChemicalComponentGUI:
     def display_stoichiometry_results(self, result: dict):
         self.results_text.delete(1.0, tk.END)
         
-        text = "=" * 60 + "\n"
-        text += "STOICHIOMETRY SOLUTION RESULTS\n"
-        text += "=" * 60 + "\n\n"
+        lines = ["=" * 60, "STOICHIOMETRY SOLUTION RESULTS", "=" * 60, ""]
         
         if not result.get('success', False):
+            self.last_result = None
+            self.set_result_rows(None)
+
             error_msg = result.get('error', 'Unknown error occurred')
-            text += f"❌ SOLUTION FAILED\n"
-            text += f"Error: {error_msg}\n\n"
-            text += "Troubleshooting tips:\n"
-            text += "1. Check that all component names in reactions match your defined components\n"
-            text += "2. Verify molar weights are positive numbers\n"
-            text += "3. Ensure you have both reactants and products defined\n"
-            text += "4. Check that reactions have at least one reactant and one product\n"
-            text += "5. Verify total reactant mass flow is set and greater than 0\n"
-            self.results_text.insert(tk.END, text)
+            lines += [
+                "❌ SOLUTION FAILED",
+                f"Error: {error_msg}",
+                "",
+                "Troubleshooting tips:",
+                "1. Check that all component names in reactions match your defined components",
+                "2. Verify molar weights are positive numbers",
+                "3. Ensure you have both reactants and products defined",
+                "4. Check that reactions have at least one reactant and one product",
+                "5. Verify total reactant mass flow is set and greater than 0"
+            ]
+            self.results_text.insert(tk.END, "\n".join(lines) + "\n" + self.format_preflight_diagnostics(result.get('diagnostics')))
             return
 
-        text += "STOICHIOMETRIC COEFFICIENTS:\n"
-        text += "-" * 40 + "\n"
-        
-        nu_matrix = np.array(result['stoichiometric_coefficients'])
-        component_names = result['component_names']
-        
-        for r_idx in range(nu_matrix.shape[1]):
-            text += f"Reaction {r_idx + 1}:\n"
-            reactants = []
-            products = []
-            
-            for c_idx in range(nu_matrix.shape[0]):
-                coeff = nu_matrix[c_idx, r_idx]
-                if abs(coeff) > 1e-6:  
-                    name = component_names[c_idx]
-                    if coeff < 0:
-                        reactants.append(f"{-coeff:.5f} {name}")
-                    else:
-                        products.append(f"{coeff:.5f} {name}")
-            
-            if reactants and products:
-                text += f"  {' + '.join(reactants)} -> {' + '.join(products)}\n"
-            else:
-                text += "  (No significant coefficients found)\n"
-            
-        text += "\n"
+        self.last_result = result
+        table = coefficient_table(result)
+        self.set_result_rows(table)
 
-        text += "ERROR ANALYSIS:\n"
-        text += "-" * 40 + '\n'
+        labels = reaction_labels(result, self.last_result_reactions)
+        budget_limited = result.get('budget_limited', [])
+        limited = [labels[i] for i, flag in enumerate(budget_limited) if flag]
 
-        for index, mass_balance_error in enumerate(result['mass_balance_errors']):
-            text += f"Reaction {index + 1}: {mass_balance_error} kg/hr\n"
-            
-        text += "\n"
+        lines += [
+            f"Reactions: {len(labels)} | Non-zero coefficients: {len(table['coefficient'])}",
+            f"Total Error: {np.sum(result['mass_balance_errors'])} kg/hr",
+            f"Worst Reaction Error: {np.max(result['mass_balance_errors'], initial=0.0)} kg/hr"
+        ]
+        if limited:
+            lines.append(f"Budget-limited (best found so far): {', '.join(limited)}")
+        unidentifiable = [labels[i] for i in result.get('unidentifiable_reactions', [])]
+        if unidentifiable:
+            lines.append(f"Unidentifiable extents (linear combinations of other reactions, reported as 0): {', '.join(unidentifiable)}")
+        reconstructed = [labels[i] for i, route in enumerate(result.get('routing') or []) if route and route.get('reconstructed')]
+        if reconstructed:
+            lines.append(f"Integer coefficients reconstructed from the optimizer: {', '.join(reconstructed)}")
+        for label, alternatives in zip(labels, result.get('alternatives') or []):
+            if len(alternatives) > 1:
+                lines.append(f"\nAlternative balances for {label} (best first):")
+                for rank, alternative in enumerate(alternatives, start=1):
+                    coefficients = ", ".join(f"{name}: {coeff}" for name, coeff in alternative['coefficients'].items())
+                    lines.append(f"  {rank}. {coefficients} (error before normalisation {alternative['mass_error']:.4g} kg/hr)")
+        
+        self.results_text.insert(tk.END, "\n".join(lines) + self.format_preflight_diagnostics(result.get('diagnostics')))
 
-        text += f"Total Error: {np.sum(result['mass_balance_errors'])} kg/hr"
-        
-        self.results_text.insert(tk.END, text)
+    def set_result_rows(self, table):
+        self.result_rows = table
+        self.result_sort = (None, False)
+        self.result_order = None if table is None else np.arange(len(table['coefficient']))
+        self.show_results_page(0)
+
+    def sort_results(self, column):
+        if self.result_rows is None:
+            return
+
+        table = self.result_rows
+        previous_column, previous_reverse = self.result_sort
+        reverse = not previous_reverse if previous_column == column else False
+
+        if column == 'Reaction':
+            keys = table['reaction']
+        elif column == 'Component':
+            keys = np.array(self.last_result['component_names'])[table['component']]
+        elif column == 'Role':
+            keys = np.sign(table['coefficient'])
+        elif column == 'Coefficient':
+            keys = table['coefficient']
+        else:
+            keys = np.asarray(self.last_result['mass_balance_errors'])[table['reaction']]
+
+        order = np.argsort(keys, kind='stable')
+        self.result_order = order[::-1] if reverse else order
+        self.result_sort = (column, reverse)
+        self.show_results_page(0)
+
+    def show_results_page(self, page):
+        self.results_tree.delete(*self.results_tree.get_children())
+        self.result_rendered = 0
+
+        if self.result_rows is None:
+            self.result_page = 0
+            self.results_page_var.set("No results")
+            return
+
+        n_rows = len(self.result_order)
+        n_pages = max(1, -(-n_rows // RESULTS_PAGE_SIZE))
+        self.result_page = min(max(page, 0), n_pages - 1)
+        self.results_page_var.set(f"Page {self.result_page + 1} of {n_pages} ({n_rows} coefficients)")
+        self.render_result_rows()
+
+    def render_result_rows(self):
+        page_start = self.result_page * RESULTS_PAGE_SIZE
+        page_end = min(page_start + RESULTS_PAGE_SIZE, len(self.result_order))
+        start = page_start + self.result_rendered
+        stop = min(start + RESULTS_RENDER_CHUNK, page_end)
+        if start >= stop:
+            return
+
+        table = self.result_rows
+        labels = reaction_labels(self.last_result, self.last_result_reactions)
+        component_names = self.last_result['component_names']
+        errors = self.last_result['mass_balance_errors']
+
+        for row in self.result_order[start:stop]:
+            r_idx = table['reaction'][row]
+            coeff = table['coefficient'][row]
+            self.results_tree.insert('', tk.END, values=(
+                labels[r_idx],
+                component_names[table['component'][row]],
+                'Reactant' if coeff < 0 else 'Product',
+                f"{abs(coeff):.5f}",
+                f"{errors[r_idx]:.6g}"
+            ))
+        self.result_rendered += stop - start
+
+    def on_results_scroll(self, first, last):
+        self.results_scrollbar.set(first, last)
+        if self.result_rows is not None and float(last) > 0.9:
+            self.render_result_rows()
+
+    def format_preflight_diagnostics(self, diagnostics):
+        if not diagnostics:
+            return ""
+
+        lines = []
+        for dropped in diagnostics['dropped_reactions']:
+            lines.append(f"Skipped {dropped['name']}: {dropped['reason']}")
+        for r_idx, names in diagnostics['unknown_components'].items():
+            lines.append(f"Reaction {r_idx + 1} names undefined components: {', '.join(names)}")
+        if diagnostics['invalid_molar_weights']:
+            lines.append(f"Invalid molar weights: {', '.join(diagnostics['invalid_molar_weights'])}")
+        if diagnostics.get('invalid_formulas'):
+            lines.append(f"Invalid formulas: {', '.join(diagnostics['invalid_formulas'])}")
+        if diagnostics['duplicate_components']:
+            lines.append(f"Duplicate component names: {', '.join(diagnostics['duplicate_components'])}")
+        if diagnostics['unused_components']:
+            lines.append(f"Not used by any reaction: {', '.join(diagnostics['unused_components'])}")
+
+        if not lines:
+            return ""
+        return "\n\nPREFLIGHT WARNINGS:\n" + "-" * 40 + "\n" + "\n".join(lines) + "\n"
 
     def update_product_flows_from_stoichiometry(self, result: dict):
         product_mass_flows = result.get('product_mass_flows', {})
@@ -926,24 +1411,34 @@ class ChemicalComponentGUI:
         self.calculate_all_flows()
 
     def copy_results(self):
-        results_text = self.results_text.get(1.0, tk.END)
+        if self.last_result is None:
+            messagebox.showwarning("Warning", "No results to copy")
+            return
+
+        buffer = io.StringIO()
+        write_results_csv(self.last_result, buffer, self.last_result_reactions)
         self.root.clipboard_clear()
-        self.root.clipboard_append(results_text)
+        self.root.clipboard_append(buffer.getvalue())
         self.status_var.set("📋 Results copied to clipboard")
 
-
     def save_results(self):
+        if self.last_result is None:
+            messagebox.showwarning("Warning", "No results to save")
+            return
+
         filename = filedialog.asksaveasfilename(
-            defaultextension=".txt",
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")],
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("JSON files", "*.json"), ("All files", "*.*")],
             title="Save Stoichiometry Results"
         )
         
         if filename:
             try:
-                results_text = self.results_text.get(1.0, tk.END)
-                with open(filename, 'w') as f:
-                    f.write(results_text)
+                with open(filename, 'w', newline='') as f:
+                    if filename.lower().endswith('.json'):
+                        write_results_json(self.last_result, f, self.last_result_reactions)
+                    else:
+                        write_results_csv(self.last_result, f, self.last_result_reactions)
                 self.status_var.set(f"💾 Results saved to {os.path.basename(filename)}")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to save results: {str(e)}")
@@ -1040,44 +1535,40 @@ class ChemicalComponentGUI:
             messagebox.showwarning("Warning", 
                                 f"Product mole fractions sum to {total_mole_fraction:.3f} (should be 1.0)")
         
-        total_mass_flow = self.total_reactant_mass
-
-        avg_molar_weight = 0
-        for product in self.products:
-            mole_frac = product['mole_fraction']
-            molar_weight = product['molar_weight']
-            avg_molar_weight += mole_frac * molar_weight
-
-        total_molar_flow = total_mass_flow / avg_molar_weight
-
-        total_calculated_mass = 0
-        for product in self.products:
-            mole_frac = product['mole_fraction']
-            molar_weight = product['molar_weight']
-            
-            molar_flow = total_molar_flow * mole_frac
-            
-            mass_flow = molar_flow * molar_weight
-            
-            product['molar_flow'] = molar_flow
+        mass_flows, molar_flows, _ = product_flows(
+            self.total_reactant_mass,
+            [product['mole_fraction'] for product in self.products],
+            [product['molar_weight'] for product in self.products]
+        )
+        for product, mass_flow, molar_flow in zip(self.products, mass_flows.tolist(), molar_flows.tolist()):
             product['mass_flow'] = mass_flow
-            
-            total_calculated_mass += mass_flow
+            product['molar_flow'] = molar_flow
 
         self.calculate_all_flows()
 
-        mass_balance_error = abs(total_mass_flow - total_calculated_mass)
-        self.status_var.set(f"✅ Product flows updated! Mass balance error: {mass_balance_error:.2f} kg/h")
+        self.show_product_flow_report(project_product_summary({
+            'total_reactant_mass': self.total_reactant_mass,
+            'products': self.products
+        }))
+
+    def report_product_summary(self, summary):
+        if abs(summary['total_mole_fraction'] - 1.0) > 0.01:
+            messagebox.showwarning("Warning",
+                                f"Product mole fractions sum to {summary['total_mole_fraction']:.3f} (should be 1.0)")
+        self.show_product_flow_report(summary)
+
+    def show_product_flow_report(self, summary):
+        self.status_var.set(f"✅ Product flows updated! Mass balance error: {summary['mass_balance_error']:.2f} kg/h")
 
         self.results_text.delete(1.0, tk.END)
         self.results_text.insert(tk.END, 
             f"📊 CORRECTED PRODUCT FLOWS:\n"
             f"{'='*50}\n"
-            f"Total reactant mass: {total_mass_flow:.2f} kg/h\n"
-            f"Average product MW: {avg_molar_weight:.2f} kg/kmol\n"
-            f"Total product molar flow: {total_molar_flow:.2f} kmol/h\n"
-            f"Total product mass: {total_calculated_mass:.2f} kg/h\n"
-            f"Mass balance error: {mass_balance_error:.2f} kg/h\n\n"
+            f"Total reactant mass: {summary['total_mass_flow']:.2f} kg/h\n"
+            f"Average product MW: {summary['avg_molar_weight']:.2f} kg/kmol\n"
+            f"Total product molar flow: {summary['total_molar_flow']:.2f} kmol/h\n"
+            f"Total product mass: {summary['total_calculated_mass']:.2f} kg/h\n"
+            f"Mass balance error: {summary['mass_balance_error']:.2f} kg/h\n\n"
             f"{'Product':<10} {'Mole Frac':<10} {'Molar Flow':<12} {'Mass Flow':<12}\n"
             f"{'-'*50}\n"
         )
@@ -0,0 +1,107 @@
+import csv
+import os
+import numpy as np
+from formula import formula_molar_weight
+
+REACTANT_ROLES = ('reactant', 'reactants', 'r')
+PRODUCT_ROLES = ('product', 'products', 'p')
+TAB_EXTENSIONS = ('.tsv', '.tab')
+MAX_REPORTED_ERRORS = 20
+
+def detect_delimiter(filename, header_line):
+    if os.path.splitext(filename)[1].lower() in TAB_EXTENSIONS or '\t' in header_line:
+        return '\t'
+    return ';' if header_line.count(';') > header_line.count(',') else ','
+
+def parse_numbers(values):
+    numbers = np.full(len(values), np.nan)
+    present = values != ''
+    try:
+        numbers[present] = values[present].astype(float)
+    except ValueError:
+        for i in np.flatnonzero(present):
+            try:
+                numbers[i] = float(values[i])
+            except ValueError:
+                pass
+    return numbers, present
+
+def read_component_file(filename, role=None, delimiter=None, existing_names=()):
+    with open(filename, newline='', encoding='utf-8-sig') as f:
+        text = f.read()
+    header_line = text.split('\n', 1)[0]
+    rows = list(csv.reader(text.splitlines(), delimiter=delimiter or detect_delimiter(filename, header_line)))
+    return parse_component_rows(rows, role=role, existing_names=existing_names)
+
+def parse_component_rows(rows, role=None, existing_names=()):
+    if not rows:
+        raise ValueError("File is empty")
+
+    header = [column.strip().lower().replace(' ', '_') for column in rows[0]]
+    required = ['name', 'mole_fraction'] + (['role'] if role is None else [])
+    missing = [column for column in required if column not in header]
+    if 'molar_weight' not in header and 'formula' not in header:
+        missing.append('molar_weight or formula')
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    body = [(line, row) for line, row in enumerate(rows[1:], start=2) if any(cell.strip() for cell in row)]
+    width = len(header)
+    table = np.array([row[:width] + [''] * (width - len(row)) for _, row in body], dtype=str).reshape(len(body), width)
+    columns = {column: np.char.strip(table[:, i]) for i, column in enumerate(header)}
+    lines = np.array([line for line, _ in body], dtype=int)
+    empty = np.full(len(body), '', dtype=str)
+
+    names = columns['name']
+    roles = np.char.lower(columns['role']) if role is None else np.full(len(body), role.lower())
+    formulas = columns.get('formula', empty)
+    fractions, has_fraction = parse_numbers(columns['mole_fraction'])
+    weights, has_weight = parse_numbers(columns.get('molar_weight', empty))
+
+    errors = []
+    def report(mask, message):
+        errors.extend((int(line), message) for line in lines[mask])
+
+    is_product = np.isin(roles, PRODUCT_ROLES)
+    report(~is_product & ~np.isin(roles, REACTANT_ROLES), "role must be 'reactant' or 'product'")
+    report(names == '', "name is required")
+    report(~has_fraction, "mole fraction is required")
+    report(has_fraction & ~((fractions >= 0) & (fractions <= 1)), "mole fraction must be a number between 0 and 1")
+    report(has_weight & ~(weights > 0), "molar weight must be a positive number")
+    report(~has_weight & (formulas == ''), "molar weight or formula is required")
+
+    unique_formulas = np.unique(formulas[formulas != ''])
+    formula_weights = {}
+    for formula in unique_formulas:
+        try:
+            formula_weights[formula] = formula_molar_weight(formula)
+        except ValueError as e:
+            report(formulas == formula, f"invalid formula: {e}")
+    needs_formula_weight = ~has_weight & (formulas != '')
+    weights[needs_formula_weight] = [formula_weights.get(formula, np.nan) for formula in formulas[needs_formula_weight]]
+
+    unique_names, first_index, counts = np.unique(names, return_index=True, return_counts=True)
+    repeated = np.isin(names, unique_names[counts > 1])
+    repeated[first_index] = False
+    report(repeated & (names != ''), "duplicate component name")
+    report(np.isin(names, list(existing_names)), "component already exists")
+
+    errors.sort()
+    if errors:
+        return {'reactants': [], 'products': [], 'errors': errors}
+
+    reactants = []
+    products = []
+    for name, fraction, weight, formula, product in zip(names.tolist(), fractions.tolist(), weights.tolist(),
+                                                        formulas.tolist(), is_product.tolist()):
+        component = {'name': name, 'mole_fraction': fraction, 'molar_weight': weight, 'mass_flow': 0.0, 'molar_flow': 0.0}
+        if formula:
+            component['formula'] = formula
+        (products if product else reactants).append(component)
+    return {'reactants': reactants, 'products': products, 'errors': errors}
+
+def format_import_errors(errors, limit=MAX_REPORTED_ERRORS):
+    lines = [f"Line {line}: {message}" for line, message in errors[:limit]]
+    if len(errors) > limit:
+        lines.append(f"... and {len(errors) - limit} more")
+    return f"{len(errors)} problem(s) found:\n" + "\n".join(lines)
@@ -0,0 +1,51 @@
+import numpy as np
+
+LLL_DELTA = 0.75
+
+def gram_schmidt(basis):
+    q, r = np.linalg.qr(basis.T)
+    diagonal = np.diag(r)
+    mu = (r / diagonal[:, None]).T
+    return mu, diagonal ** 2, (q * diagonal).T
+
+def size_reduce(basis, mu, k, j):
+    q = np.rint(mu[k, j])
+    if q:
+        basis[k] -= q * basis[j]
+        mu[k, :j + 1] -= q * mu[j, :j + 1]
+
+def lll_reduce(basis, delta=LLL_DELTA):
+    basis = np.array(basis, dtype=float)
+    n = len(basis)
+    mu, norms, _ = gram_schmidt(basis)
+    k = 1
+
+    while k < n:
+        size_reduce(basis, mu, k, k - 1)
+        if norms[k] >= (delta - mu[k, k - 1] ** 2) * norms[k - 1]:
+            for j in range(k - 2, -1, -1):
+                size_reduce(basis, mu, k, j)
+            k += 1
+        else:
+            m = mu[k, k - 1]
+            combined = norms[k] + m ** 2 * norms[k - 1]
+            basis[[k - 1, k]] = basis[[k, k - 1]]
+            mu[[k - 1, k], :k - 1] = mu[[k, k - 1], :k - 1]
+            mu[k, k - 1] = m * norms[k - 1] / combined
+            norms[k], norms[k - 1] = norms[k - 1] * norms[k] / combined, combined
+
+            below = mu[k + 1:, k].copy()
+            mu[k + 1:, k] = mu[k + 1:, k - 1] - m * below
+            mu[k + 1:, k - 1] = below + mu[k, k - 1] * mu[k + 1:, k]
+            k = max(k - 1, 1)
+    return basis
+
+def closest_vectors(basis, targets):
+    _, norms, orthogonal = gram_schmidt(basis)
+    residual = np.array(targets, dtype=float)
+    multipliers = np.zeros((len(residual), len(basis)))
+
+    for i in range(len(basis) - 1, -1, -1):
+        multipliers[:, i] = np.rint(residual @ orthogonal[i] / norms[i])
+        residual -= multipliers[:, [i]] * basis[i]
+    return multipliers @ basis
@@ -0,0 +1,180 @@
+import bisect
+import os
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_METRICS_PORT = 9464
+
+METRIC_TYPES = {
+    'stoichiometry_solves_total': ('counter', 'solve_stoichiometry calls by outcome'),
+    'stoichiometry_solve_seconds': ('histogram', 'Wall time of solve_stoichiometry calls'),
+    'stoichiometry_phase_seconds': ('histogram', 'Wall time of each solve_stoichiometry phase'),
+    'stoichiometry_reaction_methods_total': ('counter', 'Reactions solved, by the method that produced the coefficients'),
+    'stoichiometry_budget_limited_total': ('counter', 'Reactions whose search ran out of budget'),
+    'stoichiometry_combinations_total': ('counter', 'Coefficient combinations enumerated by the algebraic search'),
+    'stoichiometry_optimizer_evaluations_total': ('counter', 'L-BFGS-B objective evaluations'),
+    'stoichiometry_cache_requests_total': ('counter', 'Cache lookups by cache and result'),
+    'stoichiometry_spool_files_total': ('counter', 'Flowsheet files handled by the spool daemon, by outcome')
+}
+
+class ThreadMetrics:
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+
+_thread_local = threading.local()
+_thread_metrics = []
+_thread_metrics_lock = threading.Lock()
+_retired_metrics = ThreadMetrics()
+
+def thread_metrics():
+    metrics = getattr(_thread_local, 'metrics', None)
+    if metrics is None:
+        metrics = ThreadMetrics()
+        with _thread_metrics_lock:
+            retire_finished_threads()
+            _thread_metrics.append((weakref.ref(threading.current_thread()), metrics))
+        _thread_local.metrics = metrics
+    return metrics
+
+def merge_metrics(counters, histograms, store):
+    for key, value in list(store.counters.items()):
+        counters[key] = counters.get(key, 0) + value
+    for key, (buckets, total, count) in list(store.histograms.items()):
+        merged = histograms.setdefault(key, [[0] * (len(LATENCY_BUCKETS) + 1), 0.0, 0])
+        merged[0] = [a + b for a, b in zip(merged[0], buckets)]
+        merged[1] += total
+        merged[2] += count
+
+def retire_finished_threads():
+    live = []
+    for thread_ref, store in _thread_metrics:
+        thread = thread_ref()
+        if thread is not None and thread.is_alive():
+            live.append((thread_ref, store))
+        else:
+            merge_metrics(_retired_metrics.counters, _retired_metrics.histograms, store)
+    _thread_metrics[:] = live
+
+def increment(name, amount=1, **labels):
+    counters = thread_metrics().counters
+    key = (name, tuple(sorted(labels.items())))
+    counters[key] = counters.get(key, 0) + amount
+
+def observe(name, value, **labels):
+    histograms = thread_metrics().histograms
+    key = (name, tuple(sorted(labels.items())))
+    histogram = histograms.get(key)
+    if histogram is None:
+        histogram = histograms[key] = [[0] * (len(LATENCY_BUCKETS) + 1), 0.0, 0]
+    histogram[0][bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+    histogram[1] += value
+    histogram[2] += 1
+
+@contextmanager
+def timed(name, **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+def collect():
+    counters = {}
+    histograms = {}
+    with _thread_metrics_lock:
+        retire_finished_threads()
+        merge_metrics(counters, histograms, _retired_metrics)
+        stores = [store for _, store in _thread_metrics]
+
+    for store in stores:
+        merge_metrics(counters, histograms, store)
+    return counters, histograms
+
+def absorb(counters, histograms):
+    store = ThreadMetrics()
+    store.counters = counters
+    store.histograms = histograms
+    with _thread_metrics_lock:
+        merge_metrics(_retired_metrics.counters, _retired_metrics.histograms, store)
+
+def reset():
+    with _thread_metrics_lock:
+        retire_finished_threads()
+        for store in [_retired_metrics] + [store for _, store in _thread_metrics]:
+            store.counters.clear()
+            store.histograms.clear()
+
+def format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + '}'
+
+def render_prometheus():
+    counters, histograms = collect()
+    series = {}
+    for (name, labels), value in counters.items():
+        series.setdefault(name, []).append((labels, value))
+    for (name, labels), value in histograms.items():
+        series.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name in sorted(series):
+        metric_type, help_text = METRIC_TYPES.get(name, ('untyped', name))
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for labels, value in sorted(series[name], key=lambda item: item[0]):
+            if metric_type == 'histogram':
+                buckets, total, count = value
+                cumulative = 0
+                for bound, bucket_count in zip(LATENCY_BUCKETS + ('+Inf',), buckets):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{format_labels(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{name}_sum{format_labels(labels)} {total!r}")
+                lines.append(f"{name}_count{format_labels(labels)} {count}")
+            else:
+                lines.append(f"{name}{format_labels(labels)} {value}")
+    return '\n'.join(lines) + '\n'
+
+def write_prometheus(filename):
+    temp_filename = filename + '.tmp'
+    with open(temp_filename, 'w') as f:
+        f.write(render_prometheus())
+    os.replace(temp_filename, filename)
+
+def export_periodically(filename, interval=15.0):
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            write_prometheus(filename)
+        write_prometheus(filename)
+
+    threading.Thread(target=run, daemon=True).start()
+    return stop
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def serve_metrics(port=DEFAULT_METRICS_PORT, host='127.0.0.1'):
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
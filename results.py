@@ -0,0 +1,91 @@
+import csv
+import json
+import numpy as np
+
+COEFFICIENT_THRESHOLD = 1e-6
+
+def is_sparse_coefficients(coefficients):
+    return isinstance(coefficients, dict)
+
+def sparse_entries(coefficients):
+    return (np.asarray(coefficients['rows'], dtype=np.int64), np.asarray(coefficients['columns'], dtype=np.int64),
+            np.asarray(coefficients['values'], dtype=float))
+
+def coefficient_array(result):
+    coefficients = result['stoichiometric_coefficients']
+    if is_sparse_coefficients(coefficients):
+        rows, columns, values = sparse_entries(coefficients)
+        nu_matrix = np.zeros(tuple(coefficients['shape']))
+        nu_matrix[rows, columns] = values
+        return nu_matrix
+    return np.asarray(coefficients, dtype=float)
+
+def coefficient_table(result, threshold=COEFFICIENT_THRESHOLD):
+    if is_sparse_coefficients(result['stoichiometric_coefficients']):
+        component_idx, reaction_idx, coefficients = sparse_entries(result['stoichiometric_coefficients'])
+        keep = np.abs(coefficients) > threshold
+        component_idx, reaction_idx, coefficients = component_idx[keep], reaction_idx[keep], coefficients[keep]
+    else:
+        nu_matrix = coefficient_array(result)
+        component_idx, reaction_idx = np.nonzero(np.abs(nu_matrix) > threshold)
+        coefficients = nu_matrix[component_idx, reaction_idx]
+
+    order = np.lexsort((component_idx, reaction_idx))
+    return {
+        'reaction': reaction_idx[order],
+        'component': component_idx[order],
+        'coefficient': coefficients[order]
+    }
+
+def reaction_labels(result, reactions=None):
+    n_reactions = len(result['mass_balance_errors'])
+    if reactions is not None and len(reactions) == n_reactions:
+        return [reaction.get('name', f"Reaction {i + 1}") for i, reaction in enumerate(reactions)]
+    return [f"Reaction {i + 1}" for i in range(n_reactions)]
+
+def write_results_csv(result, file, reactions=None):
+    table = coefficient_table(result)
+    labels = reaction_labels(result, reactions)
+    component_names = result['component_names']
+
+    writer = csv.writer(file)
+    writer.writerow(['reaction', 'component', 'role', 'coefficient'])
+    writer.writerows(
+        (labels[r_idx], component_names[c_idx], 'reactant' if coeff < 0 else 'product', repr(float(coeff)))
+        for r_idx, c_idx, coeff in zip(table['reaction'], table['component'], table['coefficient'])
+    )
+
+def results_to_dict(result, reactions=None):
+    table = coefficient_table(result)
+    labels = reaction_labels(result, reactions)
+    component_names = result['component_names']
+    bounds = np.searchsorted(table['reaction'], np.arange(len(labels) + 1))
+
+    reaction_results = []
+    for r_idx, label in enumerate(labels):
+        rows = slice(bounds[r_idx], bounds[r_idx + 1])
+        reaction_results.append({
+            'name': label,
+            'coefficients': {
+                component_names[c_idx]: float(coeff)
+                for c_idx, coeff in zip(table['component'][rows], table['coefficient'][rows])
+            },
+            'mass_balance_error': result['mass_balance_errors'][r_idx],
+            'extent': result['reaction_extents'][r_idx] if 'reaction_extents' in result else None,
+            'budget_limited': result['budget_limited'][r_idx] if 'budget_limited' in result else False,
+            'solution_method': result['solution_methods'][r_idx] if 'solution_methods' in result else None,
+            'routing': result['routing'][r_idx] if result.get('routing') else None,
+            'alternatives': result['alternatives'][r_idx] if result.get('alternatives') else [],
+            'identifiable': r_idx not in result.get('unidentifiable_reactions', [])
+        })
+
+    return {
+        'component_names': component_names,
+        'reactions': reaction_results,
+        'total_mass_balance_error': float(np.sum(result['mass_balance_errors'])),
+        'memory': result.get('memory'),
+        'diagnostics': result.get('diagnostics')
+    }
+
+def write_results_json(result, file, reactions=None):
+    json.dump(results_to_dict(result, reactions), file, indent=4)
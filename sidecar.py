@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import struct
+import numpy as np
+from results import coefficient_array, is_sparse_coefficients, sparse_entries
+
+SIDECAR_SUFFIX = '.sidecar'
+SIDECAR_MAGIC = b'STOICSC\x01'
+SIDECAR_ALIGNMENT = 64
+
+RESULT_ARRAYS = ('reaction_extents', 'mass_balance_errors')
+SPARSE_COEFFICIENT_ARRAYS = ('coefficient_rows', 'coefficient_columns', 'coefficient_values')
+RESULT_METADATA = ('component_names', 'budget_limited', 'solution_methods', 'routing', 'alternatives', 'extent_blocks', 'unidentifiable_reactions', 'memory', 'diagnostics')
+
+def sidecar_path(project_filename):
+    return project_filename + SIDECAR_SUFFIX
+
+def content_hash(content):
+    return hashlib.sha256(content).hexdigest()
+
+def align(offset):
+    return -(-offset // SIDECAR_ALIGNMENT) * SIDECAR_ALIGNMENT
+
+def write_sidecar(filename, project_hash, arrays, metadata=None):
+    arrays = {name: np.ascontiguousarray(value) for name, value in arrays.items()}
+
+    entries = {}
+    offset = 0
+    for name, array in arrays.items():
+        entries[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        offset = align(offset + array.nbytes)
+
+    header = json.dumps({
+        'project_hash': project_hash,
+        'arrays': entries,
+        'metadata': metadata or {}
+    }).encode()
+    data_start = align(len(SIDECAR_MAGIC) + 8 + len(header))
+
+    temp_filename = filename + '.tmp'
+    with open(temp_filename, 'wb') as f:
+        f.write(SIDECAR_MAGIC)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.seek(data_start + entries[name]['offset'])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(temp_filename, filename)
+
+def read_sidecar(filename, project_hash=None):
+    try:
+        with open(filename, 'rb') as f:
+            if f.read(len(SIDECAR_MAGIC)) != SIDECAR_MAGIC:
+                return None
+            (header_length,) = struct.unpack('<Q', f.read(8))
+            header = json.loads(f.read(header_length))
+            if project_hash is not None and header['project_hash'] != project_hash:
+                return None
+            f.seek(align(len(SIDECAR_MAGIC) + 8 + header_length))
+            data = f.read()
+
+        arrays = {
+            name: np.ndarray(tuple(entry['shape']), dtype=np.dtype(entry['dtype']), buffer=data, offset=entry['offset'])
+            for name, entry in header['arrays'].items()
+        }
+    except (OSError, ValueError, TypeError, KeyError, struct.error):
+        return None
+
+    return {'project_hash': header['project_hash'], 'arrays': arrays, 'metadata': header['metadata']}
+
+def project_arrays(data):
+    reactants = data.get('reactants', [])
+    products = data.get('products', [])
+    return {
+        'reactant_molar_weights': np.array([c['molar_weight'] for c in reactants], dtype=float),
+        'reactant_mass_flows': np.array([c.get('mass_flow', 0.0) for c in reactants], dtype=float),
+        'reactant_molar_flows': np.array([c.get('molar_flow', 0.0) for c in reactants], dtype=float),
+        'product_molar_weights': np.array([c['molar_weight'] for c in products], dtype=float),
+        'product_mass_flows': np.array([c.get('mass_flow', 0.0) for c in products], dtype=float),
+        'product_molar_flows': np.array([c.get('molar_flow', 0.0) for c in products], dtype=float)
+    }
+
+def save_project_sidecar(project_filename, content, data, result=None, reactions=None):
+    arrays = project_arrays(data)
+    metadata = {}
+
+    if result is not None and result.get('success'):
+        coefficients = result['stoichiometric_coefficients']
+        if is_sparse_coefficients(coefficients):
+            arrays.update(zip(SPARSE_COEFFICIENT_ARRAYS, sparse_entries(coefficients)))
+            metadata['coefficient_shape'] = list(coefficients['shape'])
+        else:
+            arrays['stoichiometric_coefficients'] = coefficient_array(result)
+        for key in RESULT_ARRAYS:
+            arrays[key] = np.asarray(result[key], dtype=float)
+        for key in RESULT_METADATA:
+            metadata[key] = result.get(key)
+        metadata['reaction_names'] = [reaction['name'] for reaction in reactions or []]
+
+    write_sidecar(sidecar_path(project_filename), content_hash(content), arrays, metadata)
+
+def load_project_sidecar(project_filename, content):
+    return read_sidecar(sidecar_path(project_filename), content_hash(content))
+
+def apply_sidecar_flows(data, sidecar):
+    arrays = sidecar['arrays']
+    total_mass = data.get('total_reactant_mass', 0.0)
+
+    for role in ('reactant', 'product'):
+        if len(arrays[role + '_molar_weights']) != len(data.get(role + 's', [])):
+            return False
+
+    for role in ('reactant', 'product'):
+        components = data.get(role + 's', [])
+        columns = zip(components, arrays[role + '_molar_weights'].tolist(),
+                      arrays[role + '_mass_flows'].tolist(), arrays[role + '_molar_flows'].tolist())
+        for component, molar_weight, mass_flow, molar_flow in columns:
+            component.setdefault('molar_weight', molar_weight)
+            if role == 'reactant' or total_mass > 0:
+                component['mass_flow'] = mass_flow
+                component['molar_flow'] = molar_flow
+
+    return True
+
+def sidecar_result(sidecar):
+    if sidecar is None or 'reaction_extents' not in sidecar['arrays']:
+        return None
+
+    arrays = sidecar['arrays']
+    if 'stoichiometric_coefficients' in arrays:
+        result = {'success': True, 'stoichiometric_coefficients': arrays['stoichiometric_coefficients']}
+    else:
+        result = {'success': True, 'stoichiometric_coefficients': dict(
+            zip(('rows', 'columns', 'values'), (arrays[key] for key in SPARSE_COEFFICIENT_ARRAYS)),
+            shape=sidecar['metadata']['coefficient_shape'])}
+    for key in RESULT_ARRAYS:
+        result[key] = sidecar['arrays'][key]
+    for key in RESULT_METADATA:
+        result[key] = sidecar['metadata'].get(key)
+
+    diagnostics = result['diagnostics']
+    if diagnostics:
+        diagnostics['unknown_components'] = {int(r_idx): names for r_idx, names in diagnostics['unknown_components'].items()}
+    return result
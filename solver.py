@@ -1,26 +1,206 @@
 import numpy as np
-from itertools import product
-from scipy.optimize import minimize
-import json
+from scipy.linalg import qr, solve_triangular
+from scipy.optimize import minimize, nnls
+from scipy.optimize import lsq_linear
+from scipy.sparse import coo_matrix, csc_matrix, issparse
+from scipy.sparse.linalg import lsqr
+from scipy.sparse.csgraph import connected_components
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+import asyncio
+import functools
+import math
+import hashlib
+import heapq
+import threading
+import time
+import tracemalloc
+from formula import formula_molar_weight, element_matrix, integer_nullspace
+from lattice import lll_reduce, closest_vectors
+from warmstart import WARM_START_TOLERANCE
+import metrics
+
+class SolveBudget:
+    def __init__(self, time_budget=None, max_evaluations=None, parent=None):
+        self.deadline = None if time_budget is None else time.perf_counter() + time_budget
+        self.evaluations_left = max_evaluations
+        self.parent = parent
+        self.exhausted = False
+
+    def spend(self, evaluations=1):
+        if self.evaluations_left is not None:
+            self.evaluations_left -= evaluations
+            if self.evaluations_left <= 0:
+                self.exhausted = True
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.exhausted = True
+        if self.parent is not None and self.parent.spend(evaluations):
+            self.exhausted = True
+        return self.exhausted
+
+_tracing_lock = threading.Lock()
+_active_trackers = []
+_started_tracing = False
+
+def fold_traced_peak():
+    current, peak = tracemalloc.get_traced_memory()
+    for tracker in _active_trackers:
+        tracker.phase_peak = max(tracker.phase_peak, peak)
+    tracemalloc.reset_peak()
+    return current
+
+class PhaseMemoryTracker:
+    def __init__(self):
+        global _started_tracing
+        self.peaks = {}
+        with _tracing_lock:
+            if not _active_trackers and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _started_tracing = True
+            self.baseline = fold_traced_peak()
+            self.phase_peak = self.baseline
+            _active_trackers.append(self)
+
+    def record(self, phase):
+        with _tracing_lock:
+            current = fold_traced_peak()
+            self.peaks[phase] = max(self.phase_peak - self.baseline, 0)
+            self.baseline = current
+            self.phase_peak = current
+
+    def stop(self):
+        global _started_tracing
+        with _tracing_lock:
+            _active_trackers.remove(self)
+            if not _active_trackers and _started_tracing:
+                tracemalloc.stop()
+                _started_tracing = False
+        return self.peaks
+
+class ExtentsEngine:
+    def __init__(self, nu_matrix):
+        self.nu_matrix = np.array(nu_matrix, dtype=float)
+        q, r, pivots = qr(self.nu_matrix, mode='economic', pivoting=True)
+
+        diagonal = np.abs(np.diag(r))
+        cutoff = EXTENT_RANK_TOLERANCE * (diagonal[0] if len(diagonal) else 0.0)
+        self.rank = int(np.count_nonzero(diagonal > cutoff))
+        self.independent = np.sort(pivots[:self.rank])
+        self.dependent = np.sort(pivots[self.rank:])
+
+        self.pseudo_inverse = np.zeros((self.nu_matrix.shape[1], self.nu_matrix.shape[0]))
+        self.pseudo_inverse[pivots[:self.rank]] = solve_triangular(r[:self.rank, :self.rank], q[:, :self.rank].T)
+
+    def solve(self, molar_flows, nonnegative=False):
+        molar_flows = np.asarray(molar_flows, dtype=float)
+        flow_columns = molar_flows.reshape(molar_flows.shape[0], -1)
+
+        if nonnegative:
+            independent_nu = self.nu_matrix[:, self.independent]
+            extents = np.zeros((self.nu_matrix.shape[1], flow_columns.shape[1]))
+            for column in range(flow_columns.shape[1]):
+                extents[self.independent, column] = nnls(independent_nu, flow_columns[:, column])[0]
+        else:
+            extents = self.pseudo_inverse @ flow_columns
+
+        return extents[:, 0] if molar_flows.ndim == 1 else extents
+
+    def residuals(self, extents, molar_flows):
+        return np.linalg.norm(self.nu_matrix @ extents - molar_flows, axis=0)
+
+_extents_engine_cache = OrderedDict()
+_extents_engine_cache_lock = threading.Lock()
+EXTENTS_ENGINE_CACHE_SIZE = 128
+EXTENT_RANK_TOLERANCE = 1e-9
+
+def get_extents_engine(nu_matrix):
+    nu_matrix = np.ascontiguousarray(nu_matrix, dtype=float)
+    key = (nu_matrix.shape, hashlib.sha1(nu_matrix.tobytes()).hexdigest())
+
+    with _extents_engine_cache_lock:
+        engine = _extents_engine_cache.get(key)
+        if engine is not None:
+            _extents_engine_cache.move_to_end(key)
+            metrics.increment('stoichiometry_cache_requests_total', cache='extents_engine', result='hit')
+            return engine
+
+    metrics.increment('stoichiometry_cache_requests_total', cache='extents_engine', result='miss')
+    engine = ExtentsEngine(nu_matrix)
+    with _extents_engine_cache_lock:
+        _extents_engine_cache[key] = engine
+        while len(_extents_engine_cache) > EXTENTS_ENGINE_CACHE_SIZE:
+            _extents_engine_cache.popitem(last=False)
+    return engine
+
+def clear_extents_engine_cache():
+    with _extents_engine_cache_lock:
+        _extents_engine_cache.clear()
+
+ELEMENTS_SECONDS_PER_STEP = 2e-6
+ALGEBRAIC_SECONDS_PER_CANDIDATE = 2e-6
+OPTIMIZATION_SECONDS_PER_EVALUATION = 5e-5
+OPTIMIZATION_EVALUATIONS_PER_VARIABLE = 4
+DEFAULT_EXACT_PREFERENCE = 10.0
+DEFAULT_MAX_COEFF = 6
+DEFAULT_LEVEL_TOLERANCE = 0.01
+DEFAULT_BEST_ERROR_LIMIT = 1.0
+DEFAULT_MASS_BALANCE_TOLERANCE = 0.1
+DEFAULT_MAX_DENOMINATOR = 100
+RECONSTRUCTION_MASS_SCALE = 10.0
+
+SOLVE_PHASES = ('preflight', 'reactions', 'normalisation', 'extents')
+DENSE_BYTES_PER_ENTRY = 24
+SPARSE_BYTES_PER_MEMBER = 64
+EXTENTS_BYTES_PER_ENTRY = 40
+
+SOLVER_BACKENDS = OrderedDict()
+
+def register_backend(name, solve, estimate_cost, exact=False, verify=True):
+    SOLVER_BACKENDS[name] = {'solve': solve, 'estimate_cost': estimate_cost, 'exact': exact, 'verify': verify}
+
+def component_molar_weight(component):
+    if component.get('molar_weight') is None and component.get('formula'):
+        return formula_molar_weight(component['formula'])
+    return component['molar_weight']
 
 class StoichiometrySolver:
-    def build_skeleton_matrix(self, reactions, reactants, products, participants, participant_ids):
-        n_reactants = len(reactants)
-        n_products = len(products)
-        skeleton_matrix = np.zeros(shape = (len(reactions), n_reactants + n_products))
+    def __init__(self, reaction_time_budget=None, reaction_max_evaluations=None, extent_workers=None,
+                 nonnegative_extents=False, max_coeff=DEFAULT_MAX_COEFF, max_coeff_limit=None, warm_start_index=None,
+                 exact_preference=DEFAULT_EXACT_PREFERENCE, memory_budget=None, track_memory=False,
+                 level_tolerance=DEFAULT_LEVEL_TOLERANCE, best_error_limit=DEFAULT_BEST_ERROR_LIMIT,
+                 mass_balance_tolerance=DEFAULT_MASS_BALANCE_TOLERANCE, max_denominator=DEFAULT_MAX_DENOMINATOR,
+                 top_k=0):
+        self.max_coeff = max_coeff
+        self.level_tolerance = level_tolerance
+        self.best_error_limit = best_error_limit
+        self.mass_balance_tolerance = mass_balance_tolerance
+        self.max_denominator = max_denominator
+        self.top_k = top_k
+        self.max_coeff_limit = max_coeff_limit
+        self.reaction_time_budget = reaction_time_budget
+        self.reaction_max_evaluations = reaction_max_evaluations
+        self.extent_workers = extent_workers
+        self.nonnegative_extents = nonnegative_extents
+        self.warm_start_index = warm_start_index
+        self.exact_preference = exact_preference
+        self.memory_budget = memory_budget
+        self.track_memory = track_memory
+
+    def build_skeleton_matrix(self, reactions, participant_ids):
+        skeleton_matrix = np.zeros(shape = (len(reactions), len(participant_ids)))
 
         for primary_index,reaction in enumerate(reactions):
             reactants = reaction['reactants']
             products = reaction['products']
 
-            for secondary_index in range(n_reactants + n_products):
+            for secondary_index in range(len(participant_ids)):
                 participant = participant_ids[secondary_index]
                 if participant in reactants: skeleton_matrix[primary_index][secondary_index] = -1
                 elif participant in products: skeleton_matrix[primary_index][secondary_index] = 1
         
         return skeleton_matrix.T
 
-    def solve_reaction_algebraically(self, component_names, molar_masses, indices, skeleton_matrix, reaction_index):
+    def solve_reaction_algebraically(self, component_names, molar_masses, indices, skeleton_matrix, reaction_index, budget=None, alternatives=None):
         n_vars = len(component_names)
 
         required_signs = [skeleton_matrix[indices[i], reaction_index] for i in range(n_vars)]
@@ -29,45 +209,150 @@ class StoichiometrySolver:
 
         if not reactant_indices or not product_indices: return None
 
-        max_coeff = 6
-        best_solution = None
+        best_sums = None
         best_error = float('inf')
 
-        reactant_coeffs_range = [range(-max_coeff, -1)] * len(reactant_indices)
-        product_coeffs_range = [range(1, max_coeff+1)] * len(product_indices)
-
-        for reactant_coeffs in product(*reactant_coeffs_range):
-            for product_coeffs in product(*product_coeffs_range):
-                coeffs = [0] * n_vars
-                for i, idx in enumerate(reactant_indices):
-                    coeffs[idx] = reactant_coeffs[i]
-                for i, idx in enumerate(product_indices):
-                    coeffs[idx] = product_coeffs[i]
-
-                mass_balance = sum(coeffs[i] * molar_masses[i] for i in range(n_vars))
-                mass_error = abs(mass_balance)
-                
-                signs_correct = all(
-                    (coeffs[i] < 0 and required_signs[i] < 0) or 
-                    (coeffs[i] > 0 and required_signs[i] > 0) or 
-                    (coeffs[i] == 0 and required_signs[i] == 0)
-                    for i in range(n_vars)
-                )
-                
-                if signs_correct and mass_error < best_error:
-                    best_error = mass_error
-                    best_solution = coeffs
-                
-                if signs_correct and mass_error < 0.01:
-                    return coeffs
-        
-        if best_solution and best_error < 1.0:
-            return best_solution
+        weight_classes = {}
+        for i in reactant_indices + product_indices:
+            weight_classes.setdefault((required_signs[i] > 0, molar_masses[i]), []).append(i)
+
+        class_members = list(weight_classes.values())
+        class_signs = [1 if is_product else -1 for is_product, molar_mass in weight_classes]
+        class_weights = [sign * molar_mass for sign, (is_product, molar_mass) in zip(class_signs, weight_classes)]
+        lower = [len(members) * (1 if sign > 0 else 2) for members, sign in zip(class_members, class_signs)]
+
+        max_coeff_limit = max(self.max_coeff, self.max_coeff_limit or self.max_coeff)
+        enumerated = 0
+        top_k = self.top_k if alternatives is not None else 0
+        heap = []
+        kept = set()
+
+        try:
+            bound = self.max_coeff
+            searched = None
+            found = None
+
+            while True:
+                upper = [len(members) * bound for members in class_members]
+
+                for total in range(sum(lower), sum(upper) + 1):
+                    level_sums = None
+                    level_error = self.level_tolerance
+
+                    for class_sums, mass_balance in self.iterate_class_sums(total, lower, upper, class_weights):
+                        if searched is not None and all(s <= limit for s, limit in zip(class_sums, searched)):
+                            continue
+
+                        enumerated += 1
+                        mass_error = abs(mass_balance)
+                        if mass_error < best_error:
+                            best_error = mass_error
+                            best_sums = class_sums
+                        if mass_error < level_error:
+                            level_error = mass_error
+                            level_sums = class_sums
+                        if top_k and (len(heap) < top_k or mass_error < -heap[0][0]):
+                            coeffs = self.expand_class_sums(class_sums, class_members, class_signs, n_vars)
+                            self.keep_alternative(heap, kept, top_k, mass_error, total, coeffs)
+
+                        if budget is not None and budget.spend():
+                            return self.expand_class_sums(found or best_sums, class_members, class_signs, n_vars)
+
+                    if found is None:
+                        found = level_sums
+                    if found is not None and len(heap) >= top_k:
+                        return self.expand_class_sums(found, class_members, class_signs, n_vars)
+
+                if found is not None:
+                    return self.expand_class_sums(found, class_members, class_signs, n_vars)
+
+                if best_error < self.best_error_limit or bound >= max_coeff_limit:
+                    break
+                searched = upper
+                bound = min(bound * 2, max_coeff_limit)
+
+            if best_sums and best_error < self.best_error_limit:
+                return self.expand_class_sums(best_sums, class_members, class_signs, n_vars)
         
-        return None
+            return None
+        finally:
+            metrics.increment('stoichiometry_combinations_total', enumerated)
+            if alternatives is not None:
+                alternatives[:] = [{'coefficients': coeffs, 'mass_error': -negative_error}
+                                   for negative_error, _, _, coeffs in sorted(heap, reverse=True)]
+
+    def keep_alternative(self, heap, kept, top_k, mass_error, total, coeffs):
+        divisor = math.gcd(*coeffs)
+        key = tuple(c // divisor for c in coeffs)
+        if key in kept:
+            return
+        kept.add(key)
+        entry = (-mass_error, -total, key, coeffs)
+        if len(heap) < top_k:
+            heapq.heappush(heap, entry)
+        else:
+            kept.discard(heapq.heappushpop(heap, entry)[2])
+
+    def iterate_class_sums(self, total, lower, upper, class_weights):
+        n_classes = len(lower)
+        min_after = [0] * (n_classes + 1)
+        max_after = [0] * (n_classes + 1)
+        for c in range(n_classes - 1, -1, -1):
+            min_after[c] = min_after[c + 1] + lower[c]
+            max_after[c] = max_after[c + 1] + upper[c]
+
+        if not min_after[0] <= total <= max_after[0]:
+            return
+
+        class_sums = [0] * n_classes
+        last = n_classes - 1
+
+        def assign(c, remaining, mass_balance):
+            if c == last:
+                class_sums[c] = remaining
+                yield tuple(class_sums), mass_balance + class_weights[c] * remaining
+                return
+            weight = class_weights[c]
+            for value in range(max(lower[c], remaining - max_after[c + 1]), min(upper[c], remaining - min_after[c + 1]) + 1):
+                class_sums[c] = value
+                yield from assign(c + 1, remaining - value, mass_balance + weight * value)
+
+        yield from assign(0, total, 0.0)
 
-    def solve_reaction_optimization(self, component_names, molar_masses, indices, skeleton_matrix, reaction_index):
+    def expand_class_sums(self, class_sums, class_members, class_signs, n_vars):
+        if class_sums is None:
+            return None
+
+        coeffs = [0] * n_vars
+        for members, sign, class_sum in zip(class_members, class_signs, class_sums):
+            base, extra = divmod(class_sum, len(members))
+            for position, idx in enumerate(members):
+                coeffs[idx] = sign * (base + (1 if position >= len(members) - extra else 0))
+        return coeffs
+
+    def solve_reaction_by_elements(self, formulas, required_signs):
+        if not all(formulas):
+            return None
+
+        try:
+            elements, matrix = element_matrix(formulas)
+        except ValueError:
+            return None
+
+        basis = integer_nullspace(matrix, len(formulas))
+        if len(basis) != 1:
+            return None
+
+        coeffs = basis[0]
+        if sum(c * sign for c, sign in zip(coeffs, required_signs)) < 0:
+            coeffs = [-c for c in coeffs]
+        if not all(c * sign > 0 for c, sign in zip(coeffs, required_signs)):
+            return None
+        return coeffs
+
+    def solve_reaction_optimization(self, component_names, molar_masses, indices, skeleton_matrix, reaction_index, budget=None):
         n_vars = len(component_names)
+        best = {'value': float('inf'), 'x': None, 'evaluations': 0}
         
         def objective(x):
             mass_error = sum(x[i] * molar_masses[i] for i in range(n_vars))
@@ -82,7 +367,18 @@ class StoichiometrySolver:
                 elif expected_sign == 0 and abs(x[i]) > 0.001:  
                     sign_penalty += 1000 * abs(x[i])
             
-            return mass_error**2 + sign_penalty
+            value = mass_error**2 + sign_penalty
+            best['evaluations'] += 1
+            if value < best['value']:
+                best['value'] = value
+                best['x'] = np.array(x)
+            if budget is not None:
+                budget.spend()
+            return value
+
+        def stop_when_exhausted(intermediate_result):
+            if budget is not None and budget.exhausted:
+                raise StopIteration
         
         x0 = []
         bounds = []
@@ -98,24 +394,226 @@ class StoichiometrySolver:
                 x0.append(0.0)
                 bounds.append((0, 0))
         
-        result = minimize(objective, x0, bounds=bounds, method='L-BFGS-B')
+        if budget is not None and budget.exhausted:
+            return np.array(x0)
+
+        signs = [skeleton_matrix[indices[i], reaction_index] for i in range(n_vars)]
+        if self.warm_start_index is not None:
+            seed = self.warm_start_index.query(signs, molar_masses)
+            metrics.increment('stoichiometry_cache_requests_total', cache='warm_start', result='miss' if seed is None else 'hit')
+            if seed is not None:
+                x0 = np.clip(seed, [low for low, high in bounds], [high for low, high in bounds])
+                if objective(x0) < WARM_START_TOLERANCE:
+                    metrics.increment('stoichiometry_optimizer_evaluations_total', best['evaluations'])
+                    return x0
+
+        result = minimize(objective, x0, bounds=bounds, method='L-BFGS-B', callback=stop_when_exhausted)
+        metrics.increment('stoichiometry_optimizer_evaluations_total', best['evaluations'])
+        if budget is not None and budget.exhausted and best['x'] is not None:
+            return best['x']
+
+        if self.warm_start_index is not None and self.check_mass_balance(result.x, molar_masses):
+            self.warm_start_index.add(signs, molar_masses, result.x)
         return result.x
     
-    def solve_stoichiometry(self, reactants, products, reactions):
+    def reconstruct_integer_coefficients(self, coeffs, molar_masses, required_signs):
+        coeffs = np.asarray(coeffs, dtype=float)
+        signs = np.sign(required_signs)
+        active = np.flatnonzero(signs)
+        scale = np.abs(coeffs[active]).max() if len(active) else 0.0
+        if not self.max_denominator or len(active) < 2 or not np.isfinite(scale) or scale == 0:
+            return None
+
+        weights = np.asarray(molar_masses, dtype=float)[active]
+        mass_scale = RECONSTRUCTION_MASS_SCALE / self.level_tolerance
+        basis = lll_reduce(np.hstack([np.eye(len(active)), mass_scale * weights[:, None]]))
+        multipliers = np.arange(1, self.max_denominator + 1)[:, None]
+        targets = np.hstack([multipliers * (coeffs[active] / scale), np.zeros((len(multipliers), 1))])
+        candidates = np.rint(closest_vectors(basis, targets)[:, :-1])
+
+        sizes = np.abs(candidates).max(axis=1)
+        valid = ((np.abs(candidates @ weights) < self.level_tolerance) & (sizes <= self.max_denominator)
+                 & np.all(np.sign(candidates) == signs[active], axis=1))
+        if not valid.any():
+            return None
+
+        best = candidates[np.flatnonzero(valid)[np.argmin(sizes[valid])]].astype(np.int64)
+        integers = np.zeros(len(coeffs), dtype=np.int64)
+        integers[active] = best // np.gcd.reduce(np.abs(best))
+        return integers.tolist()
+
+    def resolve_molar_weights(self, components):
+        molar_weights = {}
+        invalid_formulas = []
+        for component in components:
+            try:
+                molar_weights[component['name']] = component_molar_weight(component)
+            except ValueError:
+                invalid_formulas.append(component['name'])
+                molar_weights[component['name']] = component.get('molar_weight')
+        return molar_weights, invalid_formulas
+
+    def preflight(self, reactants, products, reactions):
+        molar_weights, invalid_formulas = self.resolve_molar_weights(reactants + products)
+        seen_names = set()
+        duplicate_components = []
+        for component in reactants + products:
+            if component['name'] in seen_names:
+                duplicate_components.append(component['name'])
+            seen_names.add(component['name'])
+
+        invalid_molar_weights = [
+            name for name, weight in molar_weights.items()
+            if not isinstance(weight, (int, float)) or not np.isfinite(weight) or weight <= 0
+        ]
+        invalid_names = set(invalid_molar_weights)
+
+        unknown_components = {}
+        dropped_reactions = []
+        solvable_reactions = []
+        used_components = set()
+
+        for r_idx, reaction in enumerate(reactions):
+            reactant_names = set(reaction['reactants'])
+            participant_names = list(dict.fromkeys(reaction['reactants'] + reaction['products']))
+
+            unknown = [name for name in participant_names if name not in molar_weights]
+            if unknown:
+                unknown_components[r_idx] = unknown
+
+            valid = [name for name in participant_names if name in molar_weights]
+            has_reactant = any(name in reactant_names for name in valid)
+            has_product = any(name not in reactant_names for name in valid)
+            invalid = [name for name in valid if name in invalid_names]
+
+            if len(valid) < 2:
+                reason = 'fewer than two known participants'
+            elif not has_reactant:
+                reason = 'no known reactant'
+            elif not has_product:
+                reason = 'no known product'
+            elif invalid:
+                reason = f"invalid molar weight for {', '.join(invalid)}"
+            elif reaction.get('backend') is not None and reaction['backend'] not in SOLVER_BACKENDS:
+                reason = f"unknown solver backend '{reaction['backend']}'"
+            else:
+                reason = None
+
+            if reason is None:
+                solvable_reactions.append(r_idx)
+                used_components.update(valid)
+            else:
+                dropped_reactions.append({'index': r_idx, 'name': reaction.get('name', f"Reaction {r_idx + 1}"), 'reason': reason})
+
+        return {
+            'ok': bool(solvable_reactions) and not duplicate_components,
+            'solvable_reactions': solvable_reactions,
+            'dropped_reactions': dropped_reactions,
+            'unknown_components': unknown_components,
+            'unused_components': [name for name in molar_weights if name not in used_components],
+            'duplicate_components': duplicate_components,
+            'invalid_molar_weights': invalid_molar_weights,
+            'invalid_formulas': invalid_formulas
+        }
+
+    def route_reaction(self, problem, override=None):
+        estimates = {}
+        for name, backend in SOLVER_BACKENDS.items():
+            cost = backend['estimate_cost'](self, problem)
+            if cost is not None:
+                estimates[name] = cost
+
+        return {'order': self.route_order(estimates, override), 'estimated_costs': estimates, 'override': override}
+
+    def route_order(self, estimates, override=None):
+        order = sorted(estimates, key=lambda name: estimates[name] / (self.exact_preference if SOLVER_BACKENDS[name]['exact'] else 1.0))
+        if override is not None:
+            if override not in SOLVER_BACKENDS:
+                raise ValueError(f"Unknown solver backend '{override}'")
+            order = [override] + [name for name in order if name != override]
+        return order
+
+    def solve_routed_reaction(self, problem, budget, override=None):
+        route = self.route_reaction(problem, override)
+        route['reconstructed'] = False
+        fallback = None
+
+        for name in route['order']:
+            backend = SOLVER_BACKENDS[name]
+            coeffs = backend['solve'](self, problem, budget)
+            if coeffs is None:
+                continue
+            if not backend['exact']:
+                integers = self.reconstruct_integer_coefficients(coeffs, problem['molar_masses'], problem['required_signs'])
+                if integers is not None:
+                    coeffs = integers
+                    route['reconstructed'] = True
+            if not backend['verify'] or budget.exhausted or self.check_mass_balance(coeffs, problem['molar_masses']):
+                return coeffs, name, route
+            if fallback is None:
+                fallback = (coeffs, name)
+
+        if fallback is not None:
+            return fallback[0], fallback[1], route
+        return [0] * len(problem['names']), None, route
+
+    def choose_representation(self, n_components, n_reactions, n_members):
+        dense_bytes = DENSE_BYTES_PER_ENTRY * n_components * n_reactions
+        sparse_bytes = SPARSE_BYTES_PER_MEMBER * n_members
+        if self.memory_budget is None or dense_bytes <= self.memory_budget:
+            return 'dense', dense_bytes
+        if sparse_bytes <= self.memory_budget:
+            return 'sparse', sparse_bytes
+        return None, sparse_bytes
+
+    def solve_stoichiometry(self, reactants, products, reactions, time_budget=None, max_evaluations=None, backend=None):
+        tracker = PhaseMemoryTracker() if self.track_memory else None
+        try:
+            result = self.run_solve(reactants, products, reactions, time_budget, max_evaluations, backend, tracker)
+        finally:
+            if tracker is not None:
+                tracker.stop()
+
+        if 'memory' in result and tracker is not None:
+            result['memory']['phase_peaks'] = tracker.peaks
+        return result
+
+    def run_solve(self, reactants, products, reactions, time_budget, max_evaluations, backend, tracker):
+        solve_start = time.perf_counter()
+        diagnostics = self.preflight(reactants, products, reactions)
+        phase_start = self.record_phase('preflight', solve_start, tracker)
+        if not diagnostics['ok']:
+            metrics.increment('stoichiometry_solves_total', outcome='rejected')
+            metrics.observe('stoichiometry_solve_seconds', time.perf_counter() - solve_start)
+            return {
+                'success': False,
+                'error': preflight_error(diagnostics),
+                'diagnostics': diagnostics
+            }
+
+        case_budget = SolveBudget(time_budget, max_evaluations)
+        resolved_weights, invalid_formulas = self.resolve_molar_weights(reactants + products)
+        unused = set(diagnostics['unused_components'])
         participants = {}
         index = 0
 
         for reactant in reactants:
+            if reactant['name'] in unused:
+                continue
             participants[reactant['name']] = {
-                'mass': reactant['molar_weight'],
+                'mass': resolved_weights[reactant['name']] or 0.0,
+                'formula': reactant.get('formula'),
                 'molar_flow': -reactant['molar_flow'], 
                 'id': index
             }
             index += 1
 
         for product in products:
+            if product['name'] in unused:
+                continue
             participants[product['name']] = {
-                'mass': product['molar_weight'],
+                'mass': resolved_weights[product['name']] or 0.0,
+                'formula': product.get('formula'),
                 'molar_flow': product['molar_flow'],
                 'id': index
             }
@@ -123,103 +621,321 @@ class StoichiometrySolver:
 
         all_names = list(participants.keys())
         participant_ids = {i: name for i, name in enumerate(all_names)}
+        participant_positions = {name: i for i, name in enumerate(all_names)}
         molar_masses = {participant: participants[participant]['mass'] for participant in participants}
 
-        skeleton_matrix = self.build_skeleton_matrix(reactions, reactants, products, participants, participant_ids)
+        reaction_members = {
+            r_idx: [p for p in dict.fromkeys(reactions[r_idx]['reactants'] + reactions[r_idx]['products']) if p in participants]
+            for r_idx in diagnostics['solvable_reactions']
+        }
+        n_members = sum(len(members) for members in reaction_members.values())
+        representation, estimated_bytes = self.choose_representation(len(all_names), len(reactions), n_members)
+        if representation is None:
+            metrics.increment('stoichiometry_solves_total', outcome='memory_budget')
+            metrics.observe('stoichiometry_solve_seconds', time.perf_counter() - solve_start)
+            return {
+                'success': False,
+                'error': f"Memory budget of {self.memory_budget} bytes is too small: this network needs about {estimated_bytes} bytes",
+                'diagnostics': diagnostics
+            }
 
-        nu_matrix = np.zeros((len(all_names), len(reactions)))
+        if representation == 'dense':
+            skeleton_matrix = self.build_skeleton_matrix(reactions, participant_ids)
+            nu_matrix = np.zeros((len(all_names), len(reactions)))
+        else:
+            skeleton_matrix = None
+            nu_rows = np.empty(n_members, dtype=np.int64)
+            nu_columns = np.empty(n_members, dtype=np.int64)
+            nu_values = np.empty(n_members)
+            n_entries = 0
+        budget_limited = [False] * len(reactions)
+        solution_methods = [None] * len(reactions)
+        routing = [None] * len(reactions)
+        alternatives = [[] for _ in reactions]
 
-        for r_idx, reaction in enumerate(reactions):
-            participants_in_rxn = reaction['reactants'] + reaction['products']
-            valid_participants = [p for p in participants_in_rxn if p in participants]
-                    
-            if len(valid_participants) < 2:
-                continue
-                
-            participant_indices = []
-            participant_names = []
-            mw_values = []
-            for comp in valid_participants:
-                for pid, name in participant_ids.items():
-                    if name == comp:
-                        participant_indices.append(pid)
-                        participant_names.append(name)
-                        mw_values.append(molar_masses[name])
-                        break
-            
-            nu_reaction = self.solve_reaction_algebraically(participant_names, mw_values, participant_indices, skeleton_matrix, r_idx)
+        for r_idx in diagnostics['solvable_reactions']:
+            reaction = reactions[r_idx]
+            participant_names = reaction_members[r_idx]
+            participant_indices = [participant_positions[name] for name in participant_names]
+            mw_values = [molar_masses[name] for name in participant_names]
             
-            if nu_reaction is not None and self.check_mass_balance(nu_reaction, mw_values):
-                for i, pid in enumerate(participant_indices):
-                    nu_matrix[pid, r_idx] = nu_reaction[i]
+            budget = SolveBudget(self.reaction_time_budget, self.reaction_max_evaluations, parent=case_budget)
+            if skeleton_matrix is None:
+                reactant_names = set(reaction['reactants'])
+                required_signs = [-1.0 if name in reactant_names else 1.0 for name in participant_names]
+                problem = {
+                    'indices': list(range(len(participant_names))),
+                    'skeleton_matrix': np.array(required_signs)[:, None],
+                    'reaction_index': 0
+                }
+            else:
+                required_signs = [skeleton_matrix[pid, r_idx] for pid in participant_indices]
+                problem = {
+                    'indices': participant_indices,
+                    'skeleton_matrix': skeleton_matrix,
+                    'reaction_index': r_idx
+                }
+            problem.update({
+                'names': participant_names,
+                'molar_masses': mw_values,
+                'formulas': [participants[name]['formula'] for name in participant_names],
+                'required_signs': required_signs,
+                'alternatives': [] if self.top_k else None
+            })
+
+            override = reaction.get('backend')
+            if isinstance(backend, dict):
+                override = backend.get(reaction.get('name'), override)
+            elif backend is not None:
+                override = backend
+
+            nu_reaction, solution_methods[r_idx], routing[r_idx] = self.solve_routed_reaction(problem, budget, override)
+            if problem['alternatives']:
+                alternatives[r_idx] = [{'coefficients': dict(zip(participant_names, alternative['coefficients'])),
+                                        'mass_error': alternative['mass_error']} for alternative in problem['alternatives']]
+
+            if skeleton_matrix is None:
+                n_new = len(participant_indices)
+                nu_rows[n_entries:n_entries + n_new] = participant_indices
+                nu_columns[n_entries:n_entries + n_new] = r_idx
+                nu_values[n_entries:n_entries + n_new] = nu_reaction
+                n_entries += n_new
             else:
-                nu_reaction = self.solve_reaction_optimization(participant_names, mw_values, participant_indices, skeleton_matrix, r_idx)
                 for i, pid in enumerate(participant_indices):
                     nu_matrix[pid, r_idx] = nu_reaction[i]
-    
-        mass_balance_errors = self.calculate_mass_balance_errors(nu_matrix, participants, participant_ids)
 
-        nu_matrix = nu_matrix.T
+            budget_limited[r_idx] = budget.exhausted
+            metrics.increment('stoichiometry_reaction_methods_total', method=solution_methods[r_idx])
+            if budget.exhausted:
+                metrics.increment('stoichiometry_budget_limited_total')
+
+        phase_start = self.record_phase('reactions', phase_start, tracker)
 
-        for row in range(nu_matrix.shape[0]):
-            row_array = [abs(coeff) for coeff in nu_matrix[row]]
-            max_val = max(row_array)
-            nu_matrix[row] = nu_matrix[row]/max_val
+        if skeleton_matrix is None:
+            nu_matrix = csc_matrix((nu_values[:n_entries], (nu_rows[:n_entries], nu_columns[:n_entries])),
+                                   shape=(len(all_names), len(reactions)))
+            nu_matrix.eliminate_zeros()
+            max_values = abs(nu_matrix).max(axis=0).toarray().ravel()
+            scale = np.divide(1.0, max_values, out=np.ones_like(max_values), where=max_values > 0)
+            nu_matrix.data *= np.repeat(scale, np.diff(nu_matrix.indptr))
+        else:
+            nu_matrix = nu_matrix.T
 
-        reaction_extents = self.calculate_extents_vector(nu_matrix.T, participants, participant_ids)
-        mass_balance_errors = self.calculate_mass_balance_errors(nu_matrix.T, participants, participant_ids)
+            for row in range(nu_matrix.shape[0]):
+                row_array = [abs(coeff) for coeff in nu_matrix[row]]
+                max_val = max(row_array)
+                if max_val > 0:
+                    nu_matrix[row] = nu_matrix[row]/max_val
+
+            nu_matrix = nu_matrix.T
+
+        phase_start = self.record_phase('normalisation', phase_start, tracker)
+        molar_flows = np.array([participants[participant_ids[index]]['molar_flow'] for index in participant_ids])
+        reaction_extents, extent_blocks = self.calculate_block_extents(nu_matrix, molar_flows, all_names)
+        mass_balance_errors = self.calculate_mass_balance_errors(nu_matrix, participants, participant_ids)
+        self.record_phase('extents', phase_start, tracker)
+
+        metrics.increment('stoichiometry_solves_total', outcome='success')
+        metrics.observe('stoichiometry_solve_seconds', time.perf_counter() - solve_start)
 
         return {
             'success': True,
-            'stoichiometric_coefficients': nu_matrix.T.tolist(),
+            'stoichiometric_coefficients': sparse_coefficients(nu_matrix) if issparse(nu_matrix) else nu_matrix.tolist(),
             'mass_balance_errors': mass_balance_errors,
             'component_names': all_names,
-            'mass_balance_errors': mass_balance_errors        
+            'mass_balance_errors': mass_balance_errors,
+            'budget_limited': budget_limited,
+            'solution_methods': solution_methods,
+            'routing': routing,
+            'alternatives': alternatives,
+            'reaction_extents': reaction_extents.ravel().tolist(),
+            'extent_blocks': extent_blocks,
+            'unidentifiable_reactions': sorted(r_idx for block in extent_blocks for r_idx in block['unidentifiable']),
+            'memory': {
+                'representation': representation,
+                'estimated_bytes': estimated_bytes,
+                'phase_peaks': None
+            },
+            'diagnostics': diagnostics
         }
     
+    def record_phase(self, phase, phase_start, tracker=None):
+        now = time.perf_counter()
+        metrics.observe('stoichiometry_phase_seconds', now - phase_start, phase=phase)
+        if tracker is not None:
+            tracker.record(phase)
+        return now
+
     def check_mass_balance(self, coeffs, mw_values):
         mass_sum = sum(coeffs[i] * mw_values[i] for i in range(len(coeffs)))
-        return abs(mass_sum) < 0.1
+        return abs(mass_sum) < self.mass_balance_tolerance
     
-    def calculate_mass_balance_errors(self, nu_matrix, participants, participant_ids):
-        mass_balance_errors = []
-        n_reactions = nu_matrix.shape[1]
-        
-        molar_masses = {name: data['mass'] for name, data in participants.items()}
-        
-        for r_idx in range(n_reactions):
-            mass_sum = 0
-            for comp_idx in range(nu_matrix.shape[0]):
-                comp_name = participant_ids[comp_idx]
-                mass_sum += nu_matrix[comp_idx, r_idx] * molar_masses[comp_name]
-            mass_balance_errors.append(abs(mass_sum))
-        
-        return mass_balance_errors
-
     def calculate_extents_vector(self, nu_matrix, participants, participant_ids):
-        molar_flows_list = np.array([participants[participant_ids[index]]['molar_flow'] for index in participant_ids])
-        molar_flows_vector = molar_flows_list.reshape(-1,1)
+        molar_flows = np.array([participants[participant_ids[index]]['molar_flow'] for index in participant_ids])
+        return self.calculate_block_extents(nu_matrix, molar_flows)[0].reshape(-1, 1)
 
-        extents, residuals, rank, s = np.linalg.lstsq(nu_matrix, molar_flows_vector, rcond=None)
-        return extents
+    def find_reaction_blocks(self, nu_matrix):
+        n_components, n_reactions = nu_matrix.shape
+        component_idx, reaction_idx = nu_matrix.nonzero()
+        n_nodes = n_components + n_reactions
+        adjacency = coo_matrix(
+            (np.ones(len(component_idx)), (component_idx, n_components + reaction_idx)),
+            shape=(n_nodes, n_nodes)
+        )
+        n_labels, labels = connected_components(adjacency, directed=False)
 
-    def calculate_mass_balance_errors(self, nu_matrix, participants, participant_ids):
-        mass_balance_errors = []
-        n_reactions = nu_matrix.shape[1]
-        
-        molar_masses = {name: data['mass'] for name, data in participants.items()}
-        
-        for r_idx in range(n_reactions):
-            mass_sum = 0
-            for comp_idx in range(nu_matrix.shape[0]):
-                comp_name = participant_ids[comp_idx]
-                mass_sum += nu_matrix[comp_idx, r_idx] * molar_masses[comp_name]
-            mass_balance_errors.append(abs(mass_sum))
-        
-        mass_balance_errors = [float(error) for error in mass_balance_errors]
+        blocks = []
+        for label in range(n_labels):
+            block_reactions = np.flatnonzero(labels[n_components:] == label)
+            block_components = np.flatnonzero(labels[:n_components] == label)
+            if len(block_reactions) == 0 or len(block_components) == 0:
+                continue
+            blocks.append((block_components, block_reactions))
+        return blocks
+
+    def fit_block_extents(self, nu_matrix, molar_flows, block):
+        block_components, block_reactions = block
+        block_nu = nu_matrix[np.ix_(block_components, block_reactions)]
+        block_flows = molar_flows[block_components]
+        if self.memory_budget is not None and EXTENTS_BYTES_PER_ENTRY * block_nu.shape[0] * block_nu.shape[1] > self.memory_budget:
+            return self.fit_iterative_extents(block_nu, block_flows)
+        if issparse(block_nu):
+            block_nu = block_nu.toarray()
+        engine = get_extents_engine(block_nu)
+        extents = engine.solve(block_flows, nonnegative=self.nonnegative_extents)
+        residuals = engine.residuals(extents, block_flows)
+        return extents, float(residuals) if residuals.ndim == 0 else residuals.tolist(), engine.dependent
+
+    def fit_iterative_extents(self, block_nu, block_flows):
+        flow_columns = block_flows.reshape(block_flows.shape[0], -1)
+        extents = np.zeros((block_nu.shape[1], flow_columns.shape[1]))
+        for column in range(flow_columns.shape[1]):
+            if self.nonnegative_extents:
+                extents[:, column] = lsq_linear(block_nu, flow_columns[:, column], bounds=(0, np.inf), lsmr_tol='auto').x
+            else:
+                extents[:, column] = lsqr(block_nu, flow_columns[:, column], atol=1e-12, btol=1e-12)[0]
+        residuals = np.linalg.norm(block_nu @ extents - flow_columns, axis=0)
+        if block_flows.ndim == 1:
+            return extents[:, 0], float(residuals[0]), np.array([], dtype=int)
+        return extents, residuals.tolist(), np.array([], dtype=int)
+
+    def calculate_block_extents(self, nu_matrix, molar_flows, component_names=None):
+        blocks = self.find_reaction_blocks(nu_matrix)
 
-        return mass_balance_errors
+        if len(blocks) > 1 and self.extent_workers != 1:
+            with ThreadPoolExecutor(max_workers=self.extent_workers) as executor:
+                fits = list(executor.map(lambda block: self.fit_block_extents(nu_matrix, molar_flows, block), blocks))
+        else:
+            fits = [self.fit_block_extents(nu_matrix, molar_flows, block) for block in blocks]
+
+        extents = np.zeros((nu_matrix.shape[1],) + molar_flows.shape[1:])
+        block_reports = []
+        for (block_components, block_reactions), (block_extents, residual, dependent) in zip(blocks, fits):
+            extents[block_reactions] = block_extents
+            block_reports.append({
+                'reactions': block_reactions.tolist(),
+                'components': [component_names[i] if component_names is not None else int(i) for i in block_components],
+                'residual': residual,
+                'unidentifiable': block_reactions[dependent].tolist()
+            })
+        return extents, block_reports
+
+    def calculate_mass_balance_errors(self, nu_matrix, participants, participant_ids):
+        molar_masses = np.array([participants[participant_ids[comp_idx]]['mass'] for comp_idx in range(nu_matrix.shape[0])])
+        return [float(error) for error in np.abs(nu_matrix.T @ molar_masses)]
     
-def solve_stoichiometry(reactants, products, reactions):
-    solver = StoichiometrySolver()
-    return solver.solve_stoichiometry(reactants, products, reactions)
+def sparse_coefficients(nu_matrix):
+    entries = nu_matrix.tocoo()
+    return {
+        'shape': list(entries.shape),
+        'rows': entries.row.tolist(),
+        'columns': entries.col.tolist(),
+        'values': entries.data.tolist()
+    }
+
+def estimate_elements_cost(solver, problem):
+    if not all(problem['formulas']):
+        return None
+    return ELEMENTS_SECONDS_PER_STEP * len(problem['names']) ** 3
+
+def estimate_algebraic_cost(solver, problem):
+    class_sizes = {}
+    for sign, molar_mass in zip(problem['required_signs'], problem['molar_masses']):
+        if sign != 0:
+            key = (sign > 0, molar_mass)
+            class_sizes[key] = class_sizes.get(key, 0) + 1
+
+    if not any(is_product for is_product, _ in class_sizes) or all(is_product for is_product, _ in class_sizes):
+        return None
+
+    candidates = 1
+    for (is_product, _), members in class_sizes.items():
+        candidates *= members * (solver.max_coeff - (1 if is_product else 2)) + 1
+    return ALGEBRAIC_SECONDS_PER_CANDIDATE * candidates
+
+def estimate_optimization_cost(solver, problem):
+    evaluations = OPTIMIZATION_EVALUATIONS_PER_VARIABLE * (len(problem['names']) + 1)
+    return OPTIMIZATION_SECONDS_PER_EVALUATION * evaluations
+
+def solve_with_elements(solver, problem, budget):
+    return solver.solve_reaction_by_elements(problem['formulas'], problem['required_signs'])
+
+def solve_with_algebra(solver, problem, budget):
+    return solver.solve_reaction_algebraically(problem['names'], problem['molar_masses'], problem['indices'],
+                                               problem['skeleton_matrix'], problem['reaction_index'], budget=budget,
+                                               alternatives=problem.get('alternatives'))
+
+def solve_with_optimization(solver, problem, budget):
+    return solver.solve_reaction_optimization(problem['names'], problem['molar_masses'], problem['indices'],
+                                              problem['skeleton_matrix'], problem['reaction_index'], budget=budget)
+
+register_backend('elements', solve_with_elements, estimate_elements_cost, exact=True, verify=False)
+register_backend('algebraic', solve_with_algebra, estimate_algebraic_cost, exact=True)
+register_backend('optimization', solve_with_optimization, estimate_optimization_cost)
+
+def solve_stoichiometry(reactants, products, reactions, solver=None, **options):
+    if solver is None:
+        solver = StoichiometrySolver()
+    return solver.solve_stoichiometry(reactants, products, reactions, **options)
+
+def preflight_error(diagnostics):
+    if diagnostics['duplicate_components']:
+        return f"Duplicate component names: {', '.join(diagnostics['duplicate_components'])}"
+    return 'No solvable reactions: every reaction was rejected by the preflight check'
+
+def preflight(reactants, products, reactions):
+    return StoichiometrySolver().preflight(reactants, products, reactions)
+
+async def solve_async(reactants, products, reactions, executor=None, solver=None, **options):
+    loop = asyncio.get_running_loop()
+    solve = functools.partial(solve_stoichiometry, solver=solver, **options)
+    return await loop.run_in_executor(executor, solve, reactants, products, reactions)
+
+def solve_case(case, solver=None, **options):
+    return solve_stoichiometry(case['reactants'], case['products'], case['reactions'], solver=solver, **options)
+
+async def solve_many_async(cases, executor=None, solver=None, **options):
+    loop = asyncio.get_running_loop()
+    solve = functools.partial(solve_case, solver=solver, **options)
+    case_indices = {}
+    for index, case in enumerate(cases):
+        future = loop.run_in_executor(executor, solve, case)
+        case_indices[future] = index
+
+    try:
+        pending = set(case_indices)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in sorted(done, key=lambda f: case_indices[f]):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {'success': False, 'error': str(e)}
+                yield case_indices[future], result
+    finally:
+        for future in case_indices:
+            future.cancel()
+
+def calculate_extents(nu_matrix, molar_flows, nonnegative=False):
+    solver = StoichiometrySolver(nonnegative_extents=nonnegative)
+    return solver.calculate_block_extents(np.asarray(nu_matrix, dtype=float), np.asarray(molar_flows, dtype=float))
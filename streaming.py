@@ -0,0 +1,150 @@
+import csv
+import json
+from collections import deque
+import numpy as np
+
+DEFAULT_WINDOW = 60
+DEFAULT_GROSS_ERROR_THRESHOLD = 3.0
+DEFAULT_PATIENCE = 3
+MIN_RESIDUAL_SCALE = 1e-9
+
+class StreamingReconciler:
+    def __init__(self, nu_matrix, component_names, reactant_names=(), window=DEFAULT_WINDOW, flow_std=1.0,
+                 gross_error_threshold=DEFAULT_GROSS_ERROR_THRESHOLD, patience=DEFAULT_PATIENCE):
+        self.nu_matrix = np.array(nu_matrix, dtype=float)
+        n_components, n_reactions = self.nu_matrix.shape
+        self.component_names = list(component_names)
+
+        reactant_names = set(reactant_names)
+        self.signs = np.array([-1.0 if name in reactant_names else 1.0 for name in self.component_names])
+        self.variances = np.broadcast_to(np.asarray(flow_std, dtype=float) ** 2, (n_components,)).copy()
+        self.weights = 1.0 / self.variances
+        self.included = np.ones(n_components, dtype=bool)
+
+        self.gross_error_threshold = gross_error_threshold
+        self.patience = patience
+        self.exceedances = np.zeros(n_components, dtype=int)
+        self.excluded_names = []
+
+        self.window = deque(maxlen=window)
+        self.window_sum = np.zeros(n_components)
+        self.samples = 0
+        self.extents = np.zeros(n_reactions)
+
+        self.refactor()
+
+    def refactor(self):
+        weights = np.where(self.included, self.weights, 0.0)
+        self.weighted_nu_t = (self.nu_matrix * weights[:, None]).T
+        normal_matrix = self.weighted_nu_t @ self.nu_matrix
+        self.full_rank = np.linalg.matrix_rank(normal_matrix) == normal_matrix.shape[0]
+        self.normal_inverse = np.linalg.pinv(normal_matrix)
+        self.update_gain()
+
+    def update_gain(self):
+        self.gain = self.normal_inverse @ self.weighted_nu_t
+        leverage = np.einsum('cr,rs,cs->c', self.nu_matrix, self.normal_inverse, self.nu_matrix)
+        variances = np.where(self.included, self.variances - leverage, self.variances + leverage)
+        self.testable = variances > MIN_RESIDUAL_SCALE * self.variances
+        self.residual_scale = np.sqrt(np.where(self.testable, variances, 1.0))
+
+    def rank_one_update(self, component, weight):
+        row = self.nu_matrix[component]
+        projected = self.normal_inverse @ row
+        denominator = 1.0 + weight * (row @ projected)
+        if abs(denominator) < MIN_RESIDUAL_SCALE:
+            return False
+        self.normal_inverse -= np.outer(projected, projected) * (weight / denominator)
+        return True
+
+    def set_included(self, component, included):
+        if self.full_rank:
+            weight = self.weights[component] if included else -self.weights[component]
+            if not self.rank_one_update(component, weight):
+                return False
+            self.included[component] = included
+            self.weighted_nu_t[:, component] = self.nu_matrix[component] * (self.weights[component] if included else 0.0)
+            self.update_gain()
+        else:
+            self.included[component] = included
+            self.refactor()
+        return True
+
+    def track_exceedances(self, standardized, exceeded):
+        suspects = exceeded & self.included
+        if suspects.any():
+            worst = np.argmax(np.where(suspects, standardized, -1.0))
+            suspects[:] = False
+            suspects[worst] = True
+        recovered = ~exceeded & ~self.included
+        self.exceedances = np.where(suspects | recovered, self.exceedances + 1, 0)
+
+        for component in np.flatnonzero(self.exceedances >= self.patience):
+            self.set_included(component, not self.included[component])
+            self.exceedances[component] = 0
+        self.excluded_names = [self.component_names[c] for c in np.flatnonzero(~self.included)]
+
+    def update(self, timestamp, flows):
+        flows = self.signs * np.asarray(flows, dtype=float)
+        missing = np.isnan(flows)
+        if missing.any():
+            flows = np.where(missing, self.nu_matrix @ self.extents, flows)
+
+        sample_extents = self.gain @ flows
+        standardized = np.abs(flows - self.nu_matrix @ sample_extents) / self.residual_scale
+        exceeded = (standardized > self.gross_error_threshold) & self.testable & ~missing
+        gross_errors = []
+        if self.excluded_names or exceeded.any() or self.exceedances.any():
+            gross_errors = [self.component_names[c] for c in np.flatnonzero(exceeded & self.included)]
+            self.track_exceedances(standardized, exceeded)
+
+        if len(self.window) == self.window.maxlen:
+            self.window_sum -= self.window[0]
+        self.window.append(flows)
+        self.window_sum += flows
+        self.samples += 1
+        if self.samples % self.window.maxlen == 0:
+            self.window_sum = np.sum(self.window, axis=0)
+
+        self.extents = self.gain @ (self.window_sum / len(self.window))
+        return {
+            'timestamp': timestamp,
+            'extents': self.extents,
+            'reconciled_flows': self.signs * (self.nu_matrix @ self.extents),
+            'standardized_residuals': standardized,
+            'gross_errors': gross_errors,
+            'excluded': self.excluded_names
+        }
+
+def reconcile_stream(samples, reconciler):
+    for timestamp, flows in samples:
+        yield reconciler.update(timestamp, flows)
+
+def parse_reading(value):
+    value = value.strip() if isinstance(value, str) else value
+    return np.nan if value in ('', None) else float(value)
+
+def read_flow_csv(file, component_names, timestamp_column='timestamp'):
+    reader = csv.reader(file)
+    header = [name.strip() for name in next(reader)]
+    missing = [name for name in component_names if name not in header]
+    if missing:
+        raise ValueError(f"Flow file has no column for: {', '.join(missing)}")
+
+    time_index = header.index(timestamp_column) if timestamp_column in header else None
+    columns = [header.index(name) for name in component_names]
+    for line_number, row in enumerate(reader, start=2):
+        if not row:
+            continue
+        timestamp = row[time_index] if time_index is not None else line_number
+        yield timestamp, np.array([parse_reading(row[c]) for c in columns])
+
+def read_flow_jsonl(file, component_names):
+    for line_number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        flows = record['flows']
+        if isinstance(flows, dict):
+            flows = [flows.get(name) for name in component_names]
+        yield record.get('timestamp', line_number), np.array([parse_reading(value) for value in flows])
@@ -0,0 +1,29 @@
+import copy
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SAMPLE_PROJECT = {
+    'total_reactant_mass': 112000.0,
+    'reactants': [
+        {'name': 'A', 'mole_fraction': 0.3, 'molar_weight': 16.04, 'mass_flow': 33600.0, 'molar_flow': 2094.763092269327},
+        {'name': 'B', 'mole_fraction': 0.5, 'molar_weight': 32.0, 'mass_flow': 56000.0, 'molar_flow': 1750.0},
+        {'name': 'C', 'mole_fraction': 0.2, 'molar_weight': 28.01, 'mass_flow': 22400.0, 'molar_flow': 799.7143877186719}
+    ],
+    'products': [
+        {'name': 'P1', 'mole_fraction': 0.4, 'molar_weight': 44.01, 'mass_flow': 69385.13513513515,
+         'molar_flow': 1576.5765765765768},
+        {'name': 'P2', 'mole_fraction': 0.6, 'molar_weight': 18.02, 'mass_flow': 42614.86486486487,
+         'molar_flow': 2364.864864864865}
+    ],
+    'reactions': [
+        {'name': 'R1', 'reactants': ['A', 'B'], 'products': ['P1', 'P2']},
+        {'name': 'R2', 'reactants': ['C', 'B'], 'products': ['P1']}
+    ]
+}
+
+@pytest.fixture
+def project():
+    return copy.deepcopy(SAMPLE_PROJECT)
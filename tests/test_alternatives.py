@@ -0,0 +1,38 @@
+import json
+
+from results import results_to_dict
+from solver import StoichiometrySolver, solve_stoichiometry
+
+WATER_REACTANTS = [{'name': 'H2', 'molar_weight': 2.016, 'molar_flow': 2.0},
+                   {'name': 'O2', 'molar_weight': 32.0, 'molar_flow': 1.0}]
+WATER_PRODUCTS = [{'name': 'H2O', 'molar_weight': 18.015, 'molar_flow': 2.0}]
+WATER_REACTIONS = [{'name': 'W', 'reactants': ['H2', 'O2'], 'products': ['H2O']}]
+
+
+def solve_water(top_k):
+    return solve_stoichiometry(WATER_REACTANTS, WATER_PRODUCTS, WATER_REACTIONS,
+                               solver=StoichiometrySolver(top_k=top_k))
+
+
+def test_top_k_fills_every_slot():
+    result = solve_water(3)
+    alternatives = result['alternatives'][0]
+    assert len(alternatives) == 3
+    errors = [alternative['mass_error'] for alternative in alternatives]
+    assert errors == sorted(errors)
+    assert alternatives[0]['coefficients'] == {'H2': -4, 'O2': -2, 'H2O': 4}
+    keys = {tuple(alternative['coefficients'].values()) for alternative in alternatives}
+    assert len(keys) == 3
+
+
+def test_top_k_keeps_single_best_result():
+    assert solve_water(0)['stoichiometric_coefficients'] == solve_water(3)['stoichiometric_coefficients']
+    assert solve_water(0)['alternatives'] == [[]]
+
+
+def test_alternatives_in_results_dict(project):
+    result = solve_stoichiometry(project['reactants'], project['products'], project['reactions'],
+                                 solver=StoichiometrySolver(top_k=4))
+    data = json.loads(json.dumps(results_to_dict(result, project['reactions'])))
+    for reaction in data['reactions']:
+        assert len(reaction['alternatives']) == 4
@@ -0,0 +1,36 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from solver import solve_async, solve_many_async, solve_stoichiometry
+
+
+def test_solve_async_matches_direct_solve(project):
+    expected = solve_stoichiometry(project['reactants'], project['products'], project['reactions'])
+    result = asyncio.run(solve_async(project['reactants'], project['products'], project['reactions']))
+    assert result['stoichiometric_coefficients'] == expected['stoichiometric_coefficients']
+
+
+def test_solve_many_async_yields_every_case(project):
+    cases = [project] * 4
+
+    async def collect():
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            return [item async for item in solve_many_async(cases, executor=executor)]
+
+    results = dict(asyncio.run(collect()))
+    assert sorted(results) == [0, 1, 2, 3]
+    assert all(result['success'] for result in results.values())
+
+
+def test_failing_case_does_not_stop_the_stream(project):
+    broken = {'reactants': project['reactants'], 'products': project['products']}
+    cases = [project, broken, project]
+
+    async def collect():
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            return [item async for item in solve_many_async(cases, executor=executor)]
+
+    results = dict(asyncio.run(collect()))
+    assert sorted(results) == [0, 1, 2]
+    assert results[0]['success'] and results[2]['success']
+    assert results[1] == {'success': False, 'error': "'reactions'"}
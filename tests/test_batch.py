@@ -0,0 +1,70 @@
+import copy
+import pickle
+import numpy as np
+import pytest
+from batch import allocate_arrays, batch_layout, case_components, encode_cases, solve_batch, solve_case_arrays
+from solver import SOLVER_BACKENDS, StoichiometrySolver, register_backend, solve_stoichiometry
+from warmstart import WarmStartIndex
+
+def unit_coefficients(solver, problem, budget):
+    return [1 if sign > 0 else -1 for sign in problem['required_signs']]
+
+@pytest.fixture
+def unit_backend():
+    register_backend('unit', unit_coefficients, lambda solver, problem: 0.0, exact=True, verify=False)
+    yield 'unit'
+    del SOLVER_BACKENDS['unit']
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_custom_backend_through_solve_batch(project, unit_backend, max_workers):
+    cases = [copy.deepcopy(project) for _ in range(3)]
+    results = solve_batch(cases, max_workers=max_workers)
+    assert [result['success'] for result in results] == [True] * 3
+    assert all(result['solution_methods'] == [unit_backend, unit_backend] for result in results)
+
+def test_batch_results_match_direct_solve(project):
+    direct = solve_stoichiometry(project['reactants'], project['products'], project['reactions'])
+    for max_workers in (1, 2):
+        batched = solve_batch([copy.deepcopy(project), copy.deepcopy(project)], max_workers=max_workers)[0]
+        assert set(batched) == set(direct)
+        for key in direct:
+            assert type(batched[key]) is type(direct[key]), key
+        assert np.allclose(batched['stoichiometric_coefficients'], direct['stoichiometric_coefficients'])
+        assert batched['extent_blocks'] == direct['extent_blocks']
+        assert batched['routing'] == direct['routing']
+
+def test_reaction_backend_override_reaches_workers(project):
+    project['reactions'][0]['backend'] = 'optimization'
+    results = solve_batch([copy.deepcopy(project) for _ in range(2)], max_workers=2)
+    assert all(result['solution_methods'][0] == 'optimization' for result in results)
+    assert all(result['routing'][0]['override'] == 'optimization' for result in results)
+
+def test_warm_start_index_is_copied_into_workers(project):
+    index = WarmStartIndex()
+    index.add([-1, 1], [10.0, 10.0], [-1.0, 1.0])
+    copied = pickle.loads(pickle.dumps(index))
+    assert len(copied) == 1 and copied.query([-1, 1], [10.0, 10.0]) is not None
+
+    results = solve_batch([copy.deepcopy(project) for _ in range(3)], max_workers=2, warm_start_index=index)
+    assert all(result['success'] for result in results)
+
+def test_workers_receive_offsets_and_return_status_only(project):
+    solver = StoichiometrySolver()
+    encoded_cases = [(case_components(project), project)]
+    diagnostics = [solver.preflight(project['reactants'], project['products'], project['reactions'])]
+    backend_names = tuple(SOLVER_BACKENDS)
+    arrays, _ = allocate_arrays(batch_layout(encoded_cases, 0, len(backend_names)), shared=False)
+    tasks = encode_cases(encoded_cases, diagnostics, arrays, solver, backend_names)
+    assert all(type(value) is int for task in tasks for value in task)
+    assert solve_case_arrays(arrays, solver, tasks[0], backend_names) == 1
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_batch_rebuilds_case_details_in_parent(project, max_workers):
+    direct = solve_stoichiometry(project['reactants'], project['products'], project['reactions'],
+                                 solver=StoichiometrySolver(top_k=3, track_memory=True))
+    batched = solve_batch([copy.deepcopy(project) for _ in range(2)], max_workers=max_workers, top_k=3, track_memory=True)[0]
+    for key in ('solution_methods', 'routing', 'alternatives', 'extent_blocks', 'unidentifiable_reactions'):
+        assert batched[key] == direct[key], key
+    assert batched['memory']['representation'] == direct['memory']['representation']
+    assert batched['memory']['estimated_bytes'] == direct['memory']['estimated_bytes']
+    assert set(batched['memory']['phase_peaks']) == set(direct['memory']['phase_peaks'])
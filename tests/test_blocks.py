@@ -0,0 +1,35 @@
+import numpy as np
+
+from solver import StoichiometrySolver
+
+
+def split_network(n_blocks=6):
+    reactants = [{'name': f'A{i}', 'molar_weight': 20.0, 'molar_flow': 1.0 + i} for i in range(n_blocks)]
+    products = [{'name': f'P{i}', 'molar_weight': 40.0, 'molar_flow': 0.5 + i} for i in range(n_blocks)]
+    reactions = [{'name': f'X{i}', 'reactants': [f'A{i}'], 'products': [f'P{i}']} for i in range(n_blocks)]
+    return reactants, products, reactions
+
+
+def test_independent_reactions_get_their_own_blocks():
+    result = StoichiometrySolver().solve_stoichiometry(*split_network())
+    blocks = result['extent_blocks']
+    assert [block['reactions'] for block in blocks] == [[i] for i in range(6)]
+    assert [block['components'] for block in blocks] == [[f'A{i}', f'P{i}'] for i in range(6)]
+
+
+def test_block_fit_matches_whole_least_squares():
+    reactants, products, reactions = split_network()
+    result = StoichiometrySolver().solve_stoichiometry(reactants, products, reactions)
+    nu_matrix = np.array(result['stoichiometric_coefficients'])
+    signs = {c['name']: -1.0 for c in reactants}
+    flows = np.array([signs.get(c['name'], 1.0) * c['molar_flow'] for c in reactants + products])
+    order = [[c['name'] for c in reactants + products].index(name) for name in result['component_names']]
+    expected = np.linalg.lstsq(nu_matrix, flows[order], rcond=None)[0]
+    np.testing.assert_allclose(result['reaction_extents'], expected)
+
+
+def test_worker_count_does_not_change_extents():
+    serial = StoichiometrySolver(extent_workers=1).solve_stoichiometry(*split_network())
+    parallel = StoichiometrySolver(extent_workers=4).solve_stoichiometry(*split_network())
+    assert serial['reaction_extents'] == parallel['reaction_extents']
+    assert serial['extent_blocks'] == parallel['extent_blocks']
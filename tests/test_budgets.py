@@ -0,0 +1,26 @@
+from solver import SolveBudget, StoichiometrySolver, solve_stoichiometry
+
+
+def test_budget_counts_evaluations_and_parent():
+    parent = SolveBudget(max_evaluations=5)
+    child = SolveBudget(max_evaluations=10, parent=parent)
+    assert not child.spend(3)
+    assert child.spend(2)
+    assert parent.exhausted
+    assert SolveBudget(time_budget=0.0).spend()
+    assert not SolveBudget().spend(10 ** 6)
+
+
+def test_unlimited_solve_is_not_budget_limited(project):
+    result = solve_stoichiometry(project['reactants'], project['products'], project['reactions'])
+    assert result['budget_limited'] == [False, False]
+
+
+def test_exhausted_budget_still_returns_coefficients(project):
+    for options, solver in (({'max_evaluations': 3}, None), ({'time_budget': 0.0}, None),
+                            ({}, StoichiometrySolver(reaction_max_evaluations=3))):
+        result = solve_stoichiometry(project['reactants'], project['products'], project['reactions'], solver=solver,
+                                     **options)
+        assert result['success']
+        assert result['budget_limited'] == [True, True]
+        assert all(any(row[r_idx] < 0 for row in result['stoichiometric_coefficients']) for r_idx in range(2))
@@ -0,0 +1,43 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import metrics
+from daemon import SpoolDaemon, result_path
+
+def run_until_done(daemon, n_files, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        while sum(daemon.counts.values()) < n_files and time.monotonic() < deadline:
+            daemon.run_once(executor)
+
+def test_identical_files_are_solved_once(project, tmp_path):
+    content = json.dumps(project)
+    for name in ('a.json', 'b.json', 'c.json'):
+        (tmp_path / name).write_text(content)
+    other = dict(project, reactions=project['reactions'][:1])
+    (tmp_path / 'd.json').write_text(json.dumps(other))
+
+    metrics.reset()
+    daemon = SpoolDaemon(str(tmp_path), max_workers=4, poll_interval=0.05)
+    run_until_done(daemon, 4)
+
+    assert daemon.counts == {'solved': 2, 'deduplicated': 2, 'failed': 0}
+    results = [json.loads(open(result_path(str(tmp_path / name))).read()) for name in ('a.json', 'b.json', 'c.json')]
+    assert all(result['success'] for result in results)
+    assert len({result['project_hash'] for result in results}) == 1
+    assert json.loads((tmp_path / 'status.json').read_text())['solved'] == 2
+
+    counters, _ = metrics.collect()
+    assert counters[('stoichiometry_solves_total', (('outcome', 'success'),))] == 2
+    assert counters[('stoichiometry_spool_files_total', (('outcome', 'deduplicated'),))] == 2
+
+def test_invalid_file_writes_failed_result(tmp_path):
+    (tmp_path / 'bad.json').write_text('{not json')
+    daemon = SpoolDaemon(str(tmp_path), max_workers=1, poll_interval=0.05)
+    run_until_done(daemon, 1)
+
+    assert daemon.counts['failed'] == 1
+    result = json.loads(open(result_path(str(tmp_path / 'bad.json'))).read())
+    assert not result['success'] and 'JSONDecodeError' in result['error']
+    assert not os.path.exists(str(tmp_path / 'bad.result.json.tmp'))
@@ -0,0 +1,38 @@
+import numpy as np
+
+from solver import calculate_extents
+
+DEPENDENT_NETWORK = np.array([[-1.0, 0.0, -1.0],
+                              [-1.0, -1.0, -2.0],
+                              [1.0, 0.0, 1.0],
+                              [0.0, 1.0, 1.0]])
+
+
+def test_dependent_reaction_is_dropped():
+    flows = DEPENDENT_NETWORK @ np.array([1.0, 2.0, 3.0])
+    extents, blocks = calculate_extents(DEPENDENT_NETWORK, flows)
+    assert len(blocks) == 1
+    assert len(blocks[0]['unidentifiable']) == 1
+    assert extents[blocks[0]['unidentifiable'][0]] == 0.0
+    np.testing.assert_allclose(DEPENDENT_NETWORK @ extents, flows, atol=1e-9)
+    assert blocks[0]['residual'] < 1e-9
+
+
+def test_dropped_reaction_does_not_depend_on_order():
+    flows = DEPENDENT_NETWORK @ np.array([1.0, 2.0, 3.0])
+    _, blocks = calculate_extents(DEPENDENT_NETWORK, flows)
+    order = [2, 0, 1]
+    _, reordered = calculate_extents(DEPENDENT_NETWORK[:, order], flows)
+    assert [order[r_idx] for r_idx in reordered[0]['unidentifiable']] == blocks[0]['unidentifiable']
+
+
+def test_full_rank_blocks_match_least_squares():
+    rng = np.random.default_rng(1)
+    nu_matrix = np.zeros((6, 3))
+    nu_matrix[:3, :2] = rng.integers(-3, 4, size=(3, 2))
+    nu_matrix[3:, 2] = [-1.0, -2.0, 1.0]
+    flows = rng.normal(size=(6, 4))
+    extents, blocks = calculate_extents(nu_matrix, flows)
+    assert len(blocks) == 2
+    assert all(block['unidentifiable'] == [] for block in blocks)
+    np.testing.assert_allclose(extents, np.linalg.lstsq(nu_matrix, flows, rcond=None)[0], atol=1e-9)
@@ -0,0 +1,25 @@
+import numpy as np
+
+from solver import calculate_extents, get_extents_engine
+
+NU_MATRIX = np.array([[-1.0, 0.0], [-2.0, -1.0], [1.0, 0.0], [0.0, 2.0]])
+
+
+def test_engine_cached_by_contents():
+    engine = get_extents_engine(NU_MATRIX)
+    assert get_extents_engine(NU_MATRIX.copy()) is engine
+    assert get_extents_engine(2 * NU_MATRIX) is not engine
+
+
+def test_many_flow_columns_match_single_solves():
+    flows = np.random.default_rng(0).normal(size=(4, 6))
+    extents, _ = calculate_extents(NU_MATRIX, flows)
+    for column in range(flows.shape[1]):
+        np.testing.assert_allclose(extents[:, column], calculate_extents(NU_MATRIX, flows[:, column])[0])
+
+
+def test_nonnegative_extents():
+    flows = NU_MATRIX @ np.array([2.0, -1.0])
+    extents, _ = calculate_extents(NU_MATRIX, flows, nonnegative=True)
+    assert np.all(extents >= 0)
+    np.testing.assert_allclose(calculate_extents(NU_MATRIX, flows)[0], [2.0, -1.0])
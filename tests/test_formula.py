@@ -0,0 +1,33 @@
+import pytest
+
+from formula import formula_molar_weight, parse_formula
+from solver import solve_stoichiometry
+
+
+@pytest.mark.parametrize('formula, counts', [
+    ('H2O', {'H': 2, 'O': 1}),
+    ('Ca(OH)2', {'Ca': 1, 'O': 2, 'H': 2}),
+    ('K4[Fe(CN)6]', {'K': 4, 'Fe': 1, 'C': 6, 'N': 6}),
+    ('CuSO4·5H2O', {'Cu': 1, 'S': 1, 'O': 9, 'H': 10}),
+])
+def test_parse_formula(formula, counts):
+    assert dict(parse_formula(formula)) == counts
+
+
+@pytest.mark.parametrize('formula', ['', 'Xy2', 'H2O)', '(H2O', 'H2-O', '2'])
+def test_invalid_formula(formula):
+    with pytest.raises(ValueError):
+        parse_formula(formula)
+
+
+def test_formula_molar_weight():
+    assert formula_molar_weight('H2O') == pytest.approx(18.015)
+
+
+def test_combustion_balanced_from_elements():
+    reactants = [{'name': 'CH4', 'formula': 'CH4', 'molar_flow': 1.0}, {'name': 'O2', 'formula': 'O2', 'molar_flow': 2.0}]
+    products = [{'name': 'CO2', 'formula': 'CO2', 'molar_flow': 1.0}, {'name': 'H2O', 'formula': 'H2O', 'molar_flow': 2.0}]
+    reactions = [{'name': 'combustion', 'reactants': ['CH4', 'O2'], 'products': ['CO2', 'H2O']}]
+    result = solve_stoichiometry(reactants, products, reactions)
+    assert result['solution_methods'] == ['elements']
+    assert result['stoichiometric_coefficients'] == [[-0.5], [-1.0], [0.5], [1.0]]
@@ -0,0 +1,59 @@
+import pytest
+
+from formula import formula_molar_weight
+from importer import format_import_errors, parse_component_rows, read_component_file
+
+
+def test_semicolon_file_with_formulas(tmp_path):
+    path = tmp_path / 'components.csv'
+    path.write_text("Name;Role;Mole Fraction;Molar Weight;Formula\n"
+                    "CH4;reactant;0.4;;CH4\n"
+                    "O2;Reactants;0.6;32.0;\n"
+                    "\n"
+                    "CO2;p;1;;CO2\n", encoding='utf-8-sig')
+    parsed = read_component_file(str(path))
+    assert parsed['errors'] == []
+    assert [c['name'] for c in parsed['reactants']] == ['CH4', 'O2']
+    assert [c['name'] for c in parsed['products']] == ['CO2']
+    assert parsed['reactants'][0]['molar_weight'] == pytest.approx(formula_molar_weight('CH4'))
+    assert parsed['reactants'][0]['formula'] == 'CH4'
+    assert 'formula' not in parsed['reactants'][1]
+
+
+def test_tab_file_with_fixed_role(tmp_path):
+    path = tmp_path / 'products.tsv'
+    path.write_text("name\tmole_fraction\tmolar_weight\nH2O\t1\t18.02\n")
+    parsed = read_component_file(str(path), role='product')
+    assert parsed['reactants'] == []
+    assert parsed['products'][0]['molar_weight'] == 18.02
+
+
+def test_every_bad_row_is_reported():
+    rows = [['name', 'role', 'mole_fraction', 'molar_weight'],
+            ['A', 'reactant', '0.5', '16'],
+            ['A', 'reactant', '0.5', '16'],
+            ['B', 'catalyst', '1.5', '-2'],
+            ['', 'product', '', 'x'],
+            ['C', 'product', '0.2', '28']]
+    parsed = parse_component_rows(rows, existing_names=['C'])
+    assert parsed['reactants'] == [] and parsed['products'] == []
+    assert parsed['errors'] == [
+        (3, 'duplicate component name'),
+        (4, 'molar weight must be a positive number'),
+        (4, 'mole fraction must be a number between 0 and 1'),
+        (4, "role must be 'reactant' or 'product'"),
+        (5, 'molar weight must be a positive number'),
+        (5, 'mole fraction is required'),
+        (5, 'name is required'),
+        (6, 'component already exists'),
+    ]
+
+
+def test_missing_columns():
+    with pytest.raises(ValueError, match='role, molar_weight or formula'):
+        parse_component_rows([['name', 'mole_fraction']])
+
+
+def test_format_import_errors_limits_lines():
+    text = format_import_errors([(line, 'bad') for line in range(2, 30)], limit=3)
+    assert text.splitlines() == ['28 problem(s) found:', 'Line 2: bad', 'Line 3: bad', 'Line 4: bad', '... and 25 more']
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from lattice import LLL_DELTA, closest_vectors, gram_schmidt, lll_reduce
+from solver import StoichiometrySolver, solve_stoichiometry
+
+BASIS = np.array([[1.0, 1.0, 1.0],
+                  [-1.0, 0.0, 2.0],
+                  [3.0, 5.0, 6.0]])
+
+
+def test_lll_reduced_basis():
+    reduced = lll_reduce(BASIS)
+    assert abs(np.linalg.det(reduced)) == pytest.approx(abs(np.linalg.det(BASIS)))
+    transform = np.linalg.solve(BASIS.T, reduced.T)
+    np.testing.assert_allclose(transform, np.rint(transform), atol=1e-9)
+
+    mu, norms, _ = gram_schmidt(reduced)
+    assert np.all(np.abs(np.tril(mu, -1)) <= 0.5 + 1e-9)
+    for k in range(1, len(reduced)):
+        assert norms[k] >= (LLL_DELTA - mu[k, k - 1] ** 2) * norms[k - 1] - 1e-9
+
+
+def test_closest_vectors_keeps_lattice_points():
+    reduced = lll_reduce(BASIS)
+    points = np.array([[2.0, 3.0, -1.0], [0.0, 1.0, 4.0]]) @ BASIS
+    np.testing.assert_allclose(closest_vectors(reduced, points + 0.1), points)
+
+
+def test_reconstruct_integer_coefficients():
+    solver = StoichiometrySolver()
+    weights = [2.016, 32.0, 18.015]
+    assert solver.reconstruct_integer_coefficients([-1.003, -0.4991, 1.0], weights, [-1, -1, 1]) == [-2, -1, 2]
+    assert solver.reconstruct_integer_coefficients([1.0, 0.5, 1.0], weights, [-1, -1, 1]) is None
+    assert StoichiometrySolver(max_denominator=0).reconstruct_integer_coefficients(
+        [-1.0, -0.5, 1.0], weights, [-1, -1, 1]) is None
+
+
+def test_optimization_result_is_reconstructed():
+    reactants = [{'name': 'H2', 'molar_weight': 2.016, 'molar_flow': 2.0},
+                 {'name': 'O2', 'molar_weight': 32.0, 'molar_flow': 1.0}]
+    products = [{'name': 'H2O', 'molar_weight': 18.015, 'molar_flow': 2.0}]
+    reactions = [{'name': 'W', 'reactants': ['H2', 'O2'], 'products': ['H2O']}]
+    result = solve_stoichiometry(reactants, products, reactions, backend='optimization')
+    assert result['solution_methods'] == ['optimization']
+    assert result['routing'][0]['reconstructed'] is True
+    assert result['stoichiometric_coefficients'] == [[-1.0], [-0.5], [1.0]]
@@ -0,0 +1,79 @@
+import json
+import threading
+import tracemalloc
+import numpy as np
+from results import coefficient_array, coefficient_table, results_to_dict
+from sidecar import load_project_sidecar, save_project_sidecar, sidecar_result
+from solver import StoichiometrySolver
+
+def solve(project, **options):
+    return StoichiometrySolver(**options).solve_stoichiometry(project['reactants'], project['products'], project['reactions'])
+
+def test_budgeted_dense_result_is_json_serialisable(project):
+    result = solve(project, memory_budget=10 ** 6)
+    assert result['memory']['representation'] == 'dense'
+    assert isinstance(result['stoichiometric_coefficients'], list)
+    assert json.loads(json.dumps(result))['stoichiometric_coefficients'] == result['stoichiometric_coefficients']
+
+def chain_network(n_reactions=30):
+    weights = [20.0, 30.0, 50.0]
+    reactants = [{'name': f'R{i}', 'molar_weight': weights[i % 2], 'molar_flow': 1.0 + i} for i in range(n_reactions + 1)]
+    products = [{'name': f'P{i}', 'molar_weight': weights[2], 'molar_flow': 2.0 + i} for i in range(n_reactions)]
+    reactions = [{'name': f'X{i}', 'reactants': [f'R{i}', f'R{i + 1}'], 'products': [f'P{i}']} for i in range(n_reactions)]
+    return {'reactants': reactants, 'products': products, 'reactions': reactions}
+
+def test_sparse_result_matches_dense_solve():
+    project = chain_network()
+    dense = solve(project)
+    sparse = solve(project, memory_budget=10000)
+    assert sparse['memory']['representation'] == 'sparse'
+    coefficients = sparse['stoichiometric_coefficients']
+    assert coefficients['shape'] == [61, 30]
+    assert len(coefficients['values']) == 90
+    assert np.allclose(coefficient_array(sparse), coefficient_array(dense))
+
+    restored = json.loads(json.dumps(sparse))
+    assert np.allclose(coefficient_array(restored), coefficient_array(dense))
+    for key, values in coefficient_table(sparse).items():
+        assert np.allclose(values, coefficient_table(dense)[key])
+    sparse_reactions = results_to_dict(sparse, project['reactions'])['reactions']
+    dense_reactions = results_to_dict(dense, project['reactions'])['reactions']
+    assert [r['coefficients'] for r in sparse_reactions] == [r['coefficients'] for r in dense_reactions]
+
+def test_sparse_result_round_trips_through_sidecar(tmp_path):
+    project = chain_network()
+    result = solve(project, memory_budget=10000)
+    filename = str(tmp_path / 'chain.json')
+    content = json.dumps(project).encode()
+    save_project_sidecar(filename, content, project, result, project['reactions'])
+    cached = sidecar_result(load_project_sidecar(filename, content))
+    assert 'stoichiometric_coefficients' not in load_project_sidecar(filename, content)['arrays']
+    assert np.allclose(coefficient_array(cached), coefficient_array(result))
+
+def test_budget_too_small_fails_with_estimate(project):
+    result = solve(project, memory_budget=10)
+    assert not result['success']
+    assert 'Memory budget' in result['error']
+
+def test_concurrent_tracked_solves_keep_their_peaks():
+    project = chain_network()
+    barrier = threading.Barrier(4)
+    results = []
+
+    def tracked_solves():
+        barrier.wait()
+        for _ in range(3):
+            results.append(solve(project, track_memory=True))
+
+    threads = [threading.Thread(target=tracked_solves) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 12
+    for result in results:
+        peaks = result['memory']['phase_peaks']
+        assert set(peaks) == {'preflight', 'reactions', 'normalisation', 'extents'}
+        assert all(peak > 0 for peak in peaks.values())
+    assert not tracemalloc.is_tracing()
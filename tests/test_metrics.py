@@ -0,0 +1,40 @@
+import threading
+import metrics
+from solver import StoichiometrySolver
+
+def block_network(n_blocks=8):
+    reactants = [{'name': f'A{i}', 'molar_weight': 20.0, 'molar_flow': 1.0 + i} for i in range(n_blocks)]
+    products = [{'name': f'P{i}', 'molar_weight': 40.0, 'molar_flow': 0.5 + i} for i in range(n_blocks)]
+    reactions = [{'name': f'X{i}', 'reactants': [f'A{i}'], 'products': [f'P{i}']} for i in range(n_blocks)]
+    return reactants, products, reactions
+
+def test_thread_stores_are_reclaimed_after_repeated_solves():
+    metrics.reset()
+    solver = StoichiometrySolver(extent_workers=4)
+    for _ in range(20):
+        assert solver.solve_stoichiometry(*block_network())['success']
+
+    counters, _ = metrics.collect()
+    assert len(metrics._thread_metrics) <= 2
+    assert counters[('stoichiometry_solves_total', (('outcome', 'success'),))] == 20
+
+def test_counts_from_finished_threads_are_kept():
+    metrics.reset()
+    threads = [threading.Thread(target=metrics.increment, args=('stoichiometry_budget_limited_total',)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    counters, _ = metrics.collect()
+    assert counters[('stoichiometry_budget_limited_total', ())] == 5
+    assert all(thread_ref() is None or thread_ref().is_alive() for thread_ref, _ in metrics._thread_metrics)
+
+def test_render_prometheus_includes_types():
+    metrics.reset()
+    metrics.increment('stoichiometry_solves_total', outcome='success')
+    metrics.observe('stoichiometry_solve_seconds', 0.002)
+    text = metrics.render_prometheus()
+    assert '# TYPE stoichiometry_solves_total counter' in text
+    assert 'stoichiometry_solves_total{outcome="success"} 1' in text
+    assert 'stoichiometry_solve_seconds_count 1' in text
@@ -0,0 +1,59 @@
+import numpy as np
+
+from batch import solve_batch
+from solver import preflight, solve_stoichiometry
+
+REACTANTS = [{'name': 'A', 'molar_weight': 16.0, 'molar_flow': 1.0},
+             {'name': 'B', 'molar_weight': -1.0, 'molar_flow': 1.0},
+             {'name': 'Z', 'formula': 'Qx2', 'molar_flow': 1.0}]
+PRODUCTS = [{'name': 'P', 'molar_weight': 8.0, 'molar_flow': 2.0},
+            {'name': 'U', 'molar_weight': 10.0, 'molar_flow': 1.0}]
+REACTIONS = [{'name': 'ok', 'reactants': ['A'], 'products': ['P']},
+             {'name': 'bad', 'reactants': ['B'], 'products': ['P']},
+             {'name': 'unknown', 'reactants': ['A', 'X'], 'products': ['Y']},
+             {'name': 'no product', 'reactants': ['A', 'P'], 'products': []}]
+
+
+def test_preflight_reports_every_problem():
+    report = preflight(REACTANTS, PRODUCTS, REACTIONS)
+    assert report['ok']
+    assert report['solvable_reactions'] == [0]
+    assert [(d['name'], d['reason']) for d in report['dropped_reactions']] == [
+        ('bad', 'invalid molar weight for B'),
+        ('unknown', 'fewer than two known participants'),
+        ('no product', 'no known product'),
+    ]
+    assert report['unknown_components'] == {2: ['X', 'Y']}
+    assert report['invalid_molar_weights'] == ['B', 'Z']
+    assert report['invalid_formulas'] == ['Z']
+    assert report['unused_components'] == ['B', 'Z', 'U']
+
+
+def test_solve_skips_dropped_reactions():
+    result = solve_stoichiometry(REACTANTS, PRODUCTS, REACTIONS)
+    assert result['success']
+    assert [d['index'] for d in result['diagnostics']['dropped_reactions']] == [1, 2, 3]
+    assert result['solution_methods'][1:] == [None, None, None]
+    assert result['component_names'] == ['A', 'P']
+    assert np.array(result['stoichiometric_coefficients']).shape == (2, 4)
+
+
+def test_nothing_solvable_fails():
+    result = solve_stoichiometry(REACTANTS, PRODUCTS, REACTIONS[1:])
+    assert not result['success']
+    assert not result['diagnostics']['ok']
+
+
+def test_duplicate_components_reject_the_case():
+    reactants = [{'name': 'A', 'molar_weight': 16.0, 'molar_flow': 1.0}, {'name': 'A', 'molar_weight': 16.0, 'molar_flow': 2.0}]
+    products = [{'name': 'P', 'molar_weight': 8.0, 'molar_flow': 2.0}]
+    reactions = [{'name': 'ok', 'reactants': ['A'], 'products': ['P']}]
+    report = preflight(reactants, products, reactions)
+    assert report['duplicate_components'] == ['A']
+    assert not report['ok']
+
+    result = solve_stoichiometry(reactants, products, reactions)
+    assert not result['success']
+    assert result['error'] == 'Duplicate component names: A'
+    batched = solve_batch([{'reactants': reactants, 'products': products, 'reactions': reactions}], max_workers=1)
+    assert batched[0]['error'] == result['error']
@@ -0,0 +1,54 @@
+import pytest
+
+import solver
+from batch import solve_batch
+from solver import StoichiometrySolver, register_backend, solve_stoichiometry
+
+
+def solve_project(project, **options):
+    return solve_stoichiometry(project['reactants'], project['products'], project['reactions'], **options)
+
+
+def test_cheapest_exact_backend_first(project):
+    result = solve_project(project)
+    assert result['solution_methods'] == ['algebraic', 'algebraic']
+    assert all(route['order'] == ['algebraic', 'optimization'] for route in result['routing'])
+    assert all(set(route['estimated_costs']) == {'algebraic', 'optimization'} for route in result['routing'])
+
+
+def test_exact_preference_reorders_backends(project):
+    result = solve_project(project, solver=StoichiometrySolver(exact_preference=1e-9))
+    assert result['solution_methods'] == ['optimization', 'optimization']
+
+
+def test_overrides(project):
+    result = solve_project(project, backend={'R2': 'optimization'})
+    assert result['solution_methods'] == ['algebraic', 'optimization']
+    assert [route['override'] for route in result['routing']] == [None, 'optimization']
+    with pytest.raises(ValueError, match="Unknown solver backend 'missing'"):
+        solve_project(project, backend='missing')
+
+
+def test_unknown_reaction_backend_is_rejected_by_preflight(project):
+    project['reactions'][0]['backend'] = 'missing'
+    for result in (solve_project(project), solve_batch([project, project], max_workers=1)[0]):
+        assert result['success']
+        assert result['diagnostics']['dropped_reactions'] == [
+            {'index': 0, 'name': 'R1', 'reason': "unknown solver backend 'missing'"}]
+        assert result['solution_methods'][0] is None and result['solution_methods'][1] == 'algebraic'
+        assert not any(row[0] for row in result['stoichiometric_coefficients'])
+
+
+def test_backend_without_answer_falls_back(project, monkeypatch):
+    monkeypatch.setattr(solver, 'SOLVER_BACKENDS', dict(solver.SOLVER_BACKENDS))
+    calls = []
+
+    def decline(solver_instance, problem, budget):
+        calls.append(problem['names'])
+        return None
+
+    register_backend('decline', decline, lambda solver_instance, problem: 0.0, exact=True)
+    result = solve_project(project)
+    assert len(calls) == 2
+    assert result['solution_methods'] == ['algebraic', 'algebraic']
+    assert all(route['order'][0] == 'decline' for route in result['routing'])
@@ -0,0 +1,25 @@
+import json
+import numpy as np
+from sidecar import load_project_sidecar, save_project_sidecar, sidecar_result
+from solver import solve_stoichiometry
+
+def test_sidecar_round_trip_does_not_keep_the_file_mapped(project, tmp_path):
+    filename = str(tmp_path / 'project.json')
+    content = json.dumps(project).encode()
+    result = solve_stoichiometry(project['reactants'], project['products'], project['reactions'])
+    save_project_sidecar(filename, content, project, result, project['reactions'])
+
+    cached = sidecar_result(load_project_sidecar(filename, content))
+    assert np.allclose(cached['stoichiometric_coefficients'], result['stoichiometric_coefficients'])
+    assert cached['solution_methods'] == result['solution_methods']
+    assert not any(isinstance(array, np.memmap) or isinstance(array.base, np.memmap)
+                   for array in load_project_sidecar(filename, content)['arrays'].values())
+
+    save_project_sidecar(filename, content, project, result, project['reactions'])
+    assert np.allclose(cached['reaction_extents'], result['reaction_extents'])
+
+def test_sidecar_is_ignored_when_project_changes(project, tmp_path):
+    filename = str(tmp_path / 'project.json')
+    save_project_sidecar(filename, b'old', project)
+    assert load_project_sidecar(filename, b'new') is None
+    assert sidecar_result(load_project_sidecar(filename, b'old')) is None
@@ -0,0 +1,69 @@
+import io
+
+import numpy as np
+import pytest
+
+from streaming import StreamingReconciler, read_flow_csv, read_flow_jsonl, reconcile_stream
+
+NU_MATRIX = np.array([[-1.0, 0.0],
+                      [-2.0, -1.0],
+                      [1.0, 0.0],
+                      [2.0, 0.0],
+                      [0.0, 1.0]])
+NAMES = ['A', 'B', 'P1', 'P2', 'P3']
+TRUE_EXTENTS = np.array([3.0, 1.0])
+
+
+def make_reconciler(**options):
+    return StreamingReconciler(NU_MATRIX, NAMES, ['A', 'B'], flow_std=0.1, **options)
+
+
+def measured_flows(reconciler):
+    return reconciler.signs * (NU_MATRIX @ TRUE_EXTENTS)
+
+
+def test_consistent_readings_give_true_extents():
+    reconciler = make_reconciler(window=5)
+    flows = measured_flows(reconciler)
+    for output in reconcile_stream(((t, flows) for t in range(8)), reconciler):
+        np.testing.assert_allclose(output['extents'], TRUE_EXTENTS)
+        np.testing.assert_allclose(output['reconciled_flows'], flows)
+        assert output['gross_errors'] == []
+
+
+def test_biased_sensor_is_excluded_after_patience():
+    reconciler = make_reconciler(window=5, patience=3)
+    flows = measured_flows(reconciler)
+    biased = flows.copy()
+    biased[2] += 5.0
+    for t in range(3):
+        reconciler.update(t, flows)
+    outputs = [reconciler.update(t, biased) for t in range(3, 10)]
+    assert outputs[1]['excluded'] == []
+    assert outputs[2]['excluded'] == ['P1']
+    assert outputs[-1]['gross_errors'] == []
+    np.testing.assert_allclose(outputs[-1]['extents'], TRUE_EXTENTS)
+
+
+def test_missing_reading_uses_current_estimate():
+    reconciler = make_reconciler(window=5)
+    flows = measured_flows(reconciler)
+    reconciler.update(0, flows)
+    output = reconciler.update(1, np.where(np.arange(len(NAMES)) == 4, np.nan, flows))
+    np.testing.assert_allclose(output['extents'], TRUE_EXTENTS)
+
+
+def test_read_flow_csv():
+    rows = list(read_flow_csv(io.StringIO("timestamp,P3,A,B,P1,P2\nt0,5,1,2,,4\n\nt1,5,1,2,3,4\n"), NAMES))
+    assert [timestamp for timestamp, _ in rows] == ['t0', 't1']
+    np.testing.assert_array_equal(rows[0][1], [1.0, 2.0, np.nan, 4.0, 5.0])
+    with pytest.raises(ValueError, match='P3'):
+        list(read_flow_csv(io.StringIO("A,B,P1,P2\n1,2,3,4\n"), NAMES))
+
+
+def test_read_flow_jsonl():
+    lines = '{"timestamp": 1, "flows": {"A": 1, "P3": 5}}\n\n{"flows": [1, 2, 3, 4, 5]}\n'
+    rows = list(read_flow_jsonl(io.StringIO(lines), NAMES))
+    assert [timestamp for timestamp, _ in rows] == [1, 3]
+    np.testing.assert_array_equal(rows[0][1], [1.0, np.nan, np.nan, np.nan, 5.0])
+    np.testing.assert_array_equal(rows[1][1], [1.0, 2.0, 3.0, 4.0, 5.0])
@@ -0,0 +1,60 @@
+import numpy as np
+
+import flows
+from flows import run_sweep, solve_structure
+from solver import StoichiometrySolver
+
+
+def solve_project(project, solver=None, cache=None):
+    return solve_structure(project['reactants'], project['products'], project['reactions'], solver=solver, cache=cache)
+
+
+def test_cache_key_includes_solver_settings(project):
+    cache = {}
+    default = solve_project(project, cache=cache)
+    assert solve_project(project, cache=cache) is default
+    narrow = solve_project(project, solver=StoichiometrySolver(max_coeff=2, max_coeff_limit=2), cache=cache)
+    assert narrow is not default
+    assert len(cache) == 2
+    assert solve_project(project, solver=StoichiometrySolver(level_tolerance=0.5), cache=cache) is not default
+
+
+def test_cache_key_includes_reaction_backend(project):
+    cache = {}
+    solve_project(project, cache=cache)
+    for reaction in project['reactions']:
+        reaction['backend'] = 'optimization'
+    solve_project(project, cache=cache)
+    assert len(cache) == 2
+
+
+def test_cache_is_bounded_lru(project, monkeypatch):
+    monkeypatch.setattr(flows, 'COEFFICIENT_CACHE_SIZE', 2)
+    cache = {}
+    first = solve_project(project, solver=StoichiometrySolver(max_coeff=4), cache=cache)
+    solve_project(project, solver=StoichiometrySolver(max_coeff=5), cache=cache)
+    assert solve_project(project, solver=StoichiometrySolver(max_coeff=4), cache=cache) is first
+    solve_project(project, solver=StoichiometrySolver(max_coeff=6), cache=cache)
+    assert len(cache) == 2
+    assert solve_project(project, solver=StoichiometrySolver(max_coeff=4), cache=cache) is first
+
+
+def test_sweep_grid(project):
+    sweep = run_sweep(project['reactants'], project['products'], project['reactions'], np.linspace(1000.0, 2000.0, 3),
+                      cache={})
+    assert sweep['success']
+    assert sweep['extent_residuals'].shape == (3, 1, 1)
+    assert sweep['reaction_extents'].shape == (3, 1, 1, 2)
+    np.testing.assert_allclose(sweep['reactant_mass_flows'].sum(axis=-1)[:, 0, 0], [1000.0, 1500.0, 2000.0])
+
+
+def test_sweep_extents_follow_solver_settings(project):
+    def sweep(solver=None):
+        return run_sweep(project['reactants'], project['products'], project['reactions'], [1000.0, 2000.0],
+                         reactant_fractions=[[0.05, 0.05, 0.9]], product_fractions=[[0.95, 0.05]], solver=solver, cache={})
+
+    default = sweep()
+    assert (default['reaction_extents'] < 0).any()
+    assert (sweep(StoichiometrySolver(nonnegative_extents=True))['reaction_extents'] >= 0).all()
+    iterative = sweep(StoichiometrySolver(memory_budget=300))
+    np.testing.assert_allclose(iterative['reaction_extents'], default['reaction_extents'], rtol=1e-6)
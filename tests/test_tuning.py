@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from conftest import SAMPLE_PROJECT
+import tuning
+from tuning import (DEFAULT_PARAMETERS, list_profiles, load_corpus, load_profile, parameter_grid, profile_solver,
+                    save_profile, select_parameters, tune)
+
+
+def measurement(seconds, mean_error, failures=0, **parameters):
+    return {'parameters': dict(DEFAULT_PARAMETERS, **parameters), 'seconds': seconds, 'mean_error': mean_error,
+            'max_error': mean_error, 'failures': failures}
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    (tmp_path / 'sample.json').write_text(json.dumps(SAMPLE_PROJECT))
+    (tmp_path / 'sample.result.json').write_text('{}')
+    return load_corpus([str(tmp_path)])
+
+
+def test_load_corpus_skips_results(corpus):
+    assert [case['name'] for case in corpus] == ['sample.json']
+    assert all(c['molar_flow'] > 0 for c in corpus[0]['reactants'])
+
+
+def test_parameter_grid_overrides_defaults():
+    grid = parameter_grid({'max_coeff': (4,), 'level_tolerance': (0.01,), 'best_error_limit': (1.0,)})
+    assert len(grid) == 3
+    assert {parameters['mass_balance_tolerance'] for parameters in grid} == {0.01, 0.1, 0.5}
+
+
+def test_select_fastest_within_baseline_error():
+    results = [measurement(2.0, 0.1), measurement(0.5, 0.5, max_coeff=4), measurement(1.0, 0.05, max_coeff=8),
+               measurement(0.1, 0.0, failures=1, max_coeff=10)]
+    chosen, baseline = select_parameters(results)
+    assert baseline is results[0]
+    assert chosen is results[2]
+    assert select_parameters(results, max_error=1.0)[0] is results[1]
+
+
+def test_tune_and_profiles(corpus, tmp_path):
+    grid = {'max_coeff': (4, 6), 'level_tolerance': (0.01,), 'best_error_limit': (1.0,), 'mass_balance_tolerance': (0.1,)}
+    result = tune(corpus, grid=grid, max_workers=1)
+    assert len(result['results']) == 2
+    assert result['corpus'] == ['sample.json']
+    assert result['baseline']['parameters'] == DEFAULT_PARAMETERS
+
+    directory = str(tmp_path / 'profiles')
+    save_profile('plant_a', result, directory)
+    assert list_profiles(directory) == ['plant_a']
+    assert load_profile('plant_a', directory)['parameters'] == result['parameters']
+    solver = profile_solver('plant_a', directory, extent_workers=2)
+    assert solver.max_coeff == result['parameters']['max_coeff']
+    assert solver.extent_workers == 2
+
+
+def test_profile_errors(tmp_path, monkeypatch):
+    monkeypatch.setenv(tuning.PROFILE_DIR_ENV, str(tmp_path))
+    assert list_profiles() == []
+    with pytest.raises(ValueError, match='Unknown tuning profile'):
+        load_profile('missing')
+    for name in ('', '../escape', '.hidden'):
+        with pytest.raises(ValueError, match='Invalid profile name'):
+            save_profile(name, {})
@@ -0,0 +1,32 @@
+import numpy as np
+
+from uncertainty import propagate_uncertainty, rebalance_coefficients
+
+
+def propagate(project, **options):
+    return propagate_uncertainty(project['reactants'], project['products'], project['reactions'], **options)
+
+
+def test_rebalanced_coefficients_close_mass_balance():
+    nu_matrix = np.array([[-1.0, 0.0], [-2.0, -1.0], [1.0, 2.0]])
+    weights = np.array([[16.04, 32.0, 44.01], [16.0, 31.9, 44.2]])
+    samples = rebalance_coefficients(nu_matrix, weights)
+    np.testing.assert_allclose(np.einsum('sc,scr->sr', weights, samples), 0.0, atol=1e-12)
+    assert np.all((samples != 0) == (nu_matrix != 0))
+
+
+def test_no_spread_gives_no_deviation(project):
+    result = propagate(project, n_samples=20, seed=0)
+    assert result['success']
+    np.testing.assert_allclose(result['reaction_extents']['std'], 0.0, atol=1e-9)
+    np.testing.assert_allclose(result['stoichiometric_coefficients']['std'], 0.0, atol=1e-12)
+
+
+def test_seeded_chunked_sampling(project):
+    whole = propagate(project, n_samples=50, relative_weight_std=0.01, relative_flow_std=0.05, seed=3, chunk_size=7)
+    again = propagate(project, n_samples=50, relative_weight_std=0.01, relative_flow_std=0.05, seed=3, chunk_size=7)
+    assert again['reaction_extents'] == whole['reaction_extents']
+    assert whole['reaction_extents']['std'][0] > 0
+    percentiles = whole['mass_balance_errors']['percentiles']
+    assert sorted(percentiles) == [5, 50, 95]
+    assert percentiles[5][0] <= percentiles[50][0] <= percentiles[95][0]
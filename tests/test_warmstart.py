@@ -0,0 +1,45 @@
+import numpy as np
+import warmstart
+from warmstart import WarmStartIndex, rebalance
+
+SIGNS = [-1, -1, 1]
+
+def brute_force_nearest(index, molar_masses):
+    key, point, order = index.canonical_form(SIGNS, molar_masses)
+    group = index.groups[key]
+    distances = np.linalg.norm(np.array(group['points']) - point, axis=1)
+    position = int(np.argmin(distances))
+    coefficients = np.empty(len(SIGNS))
+    coefficients[order] = group['solutions'][position]
+    return rebalance(coefficients, SIGNS, molar_masses)
+
+def test_query_matches_brute_force_with_buffer_and_eviction():
+    rng = np.random.default_rng(0)
+    index = WarmStartIndex(max_distance=None, max_entries=50, rebuild_threshold=8)
+    for _ in range(300):
+        index.add(SIGNS, rng.uniform(10, 100, 3), -rng.uniform(0.5, 2, 3) * SIGNS)
+        molar_masses = rng.uniform(10, 100, 3)
+        assert np.allclose(index.query(SIGNS, molar_masses), brute_force_nearest(index, molar_masses))
+    assert len(index) == 50
+
+def test_adds_do_not_rebuild_tree_on_every_query(monkeypatch):
+    builds = []
+    build_tree = warmstart.cKDTree
+    def counting_tree(points):
+        builds.append(len(points))
+        return build_tree(points)
+    monkeypatch.setattr(warmstart, 'cKDTree', counting_tree)
+
+    rng = np.random.default_rng(1)
+    index = WarmStartIndex(max_distance=None, rebuild_threshold=16)
+    for _ in range(100):
+        index.add(SIGNS, rng.uniform(10, 100, 3), [-1.0, -1.0, 1.0])
+        index.query(SIGNS, rng.uniform(10, 100, 3))
+    assert len(builds) <= 100 // 16 + 1
+
+def test_query_rebalances_onto_mass_balance_plane():
+    index = WarmStartIndex()
+    index.add(SIGNS, [10.0, 20.0, 30.0], [-1.0, -1.0, 1.0])
+    seed = index.query(SIGNS, [10.0, 20.5, 30.0])
+    assert abs(seed @ np.array([10.0, 20.5, 30.0])) < 1e-9
+    assert index.query([1, 1, -1], [10.0, 20.0, 30.0]) is None
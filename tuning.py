@@ -0,0 +1,149 @@
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from flows import prepare_project_flows
+from solver import (StoichiometrySolver, clear_extents_engine_cache, DEFAULT_MAX_COEFF, DEFAULT_LEVEL_TOLERANCE,
+                    DEFAULT_BEST_ERROR_LIMIT, DEFAULT_MASS_BALANCE_TOLERANCE)
+
+DEFAULT_PARAMETERS = {
+    'max_coeff': DEFAULT_MAX_COEFF,
+    'level_tolerance': DEFAULT_LEVEL_TOLERANCE,
+    'best_error_limit': DEFAULT_BEST_ERROR_LIMIT,
+    'mass_balance_tolerance': DEFAULT_MASS_BALANCE_TOLERANCE
+}
+DEFAULT_GRID = {
+    'max_coeff': (4, 6, 8, 10),
+    'level_tolerance': (0.001, 0.01, 0.05),
+    'best_error_limit': (0.1, 1.0, 5.0),
+    'mass_balance_tolerance': (0.01, 0.1, 0.5)
+}
+PROFILE_DIR_ENV = 'STOICHIOMETRY_PROFILE_DIR'
+DEFAULT_PROFILE_DIR = os.path.join(os.path.expanduser('~'), '.stoichiometry', 'profiles')
+
+_worker_cases = None
+
+def load_corpus(paths):
+    cases = []
+    for path in paths:
+        if os.path.isdir(path):
+            filenames = sorted(os.path.join(path, name) for name in os.listdir(path)
+                               if name.endswith('.json') and not name.endswith('.result.json'))
+        else:
+            filenames = [path]
+
+        for filename in filenames:
+            with open(filename) as f:
+                data = json.load(f)
+            prepare_project_flows(data)
+            cases.append({
+                'name': os.path.basename(filename),
+                'reactants': data.get('reactants', []),
+                'products': data.get('products', []),
+                'reactions': data.get('reactions', [])
+            })
+    return cases
+
+def parameter_grid(grid=None):
+    grid = dict(DEFAULT_GRID, **(grid or {}))
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+def evaluate_parameters(cases, parameters, repeats=1):
+    solver = StoichiometrySolver(**parameters)
+    timings = []
+    for _ in range(repeats):
+        clear_extents_engine_cache()
+        errors = []
+        failures = 0
+        start = time.perf_counter()
+        for case in cases:
+            result = solver.solve_stoichiometry(case['reactants'], case['products'], case['reactions'])
+            if result['success']:
+                errors.extend(result['mass_balance_errors'])
+            else:
+                failures += 1
+        timings.append(time.perf_counter() - start)
+
+    errors = np.array(errors)
+    return {
+        'parameters': parameters,
+        'seconds': min(timings),
+        'mean_error': float(errors.mean()) if len(errors) else float('inf'),
+        'max_error': float(errors.max()) if len(errors) else float('inf'),
+        'failures': failures
+    }
+
+def set_worker_cases(cases):
+    global _worker_cases
+    _worker_cases = cases
+
+def evaluate_worker_parameters(parameters, repeats):
+    return evaluate_parameters(_worker_cases, parameters, repeats)
+
+def select_parameters(results, max_error=None):
+    baseline = next((result for result in results if result['parameters'] == DEFAULT_PARAMETERS), None)
+    if max_error is None:
+        max_error = baseline['mean_error'] if baseline is not None else min(result['mean_error'] for result in results)
+
+    fewest_failures = min(result['failures'] for result in results)
+    candidates = [result for result in results if result['failures'] == fewest_failures and result['mean_error'] <= max_error]
+    if not candidates:
+        candidates = [min(results, key=lambda result: (result['failures'], result['mean_error']))]
+    chosen = min(candidates, key=lambda result: (result['seconds'], result['mean_error']))
+    return chosen, baseline
+
+def tune(cases, grid=None, max_workers=None, repeats=1, max_error=None):
+    configurations = parameter_grid(grid)
+    if max_workers == 1:
+        results = [evaluate_parameters(cases, parameters, repeats) for parameters in configurations]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=set_worker_cases, initargs=(cases,)) as executor:
+            results = list(executor.map(evaluate_worker_parameters, configurations, [repeats] * len(configurations)))
+
+    chosen, baseline = select_parameters(results, max_error)
+    return {
+        'parameters': chosen['parameters'],
+        'measurement': chosen,
+        'baseline': baseline,
+        'max_error': max_error,
+        'corpus': [case['name'] for case in cases],
+        'results': sorted(results, key=lambda result: result['seconds'])
+    }
+
+def profile_directory(directory=None):
+    return directory or os.environ.get(PROFILE_DIR_ENV) or DEFAULT_PROFILE_DIR
+
+def profile_path(name, directory=None):
+    if not name or os.path.basename(name) != name or name.startswith('.'):
+        raise ValueError(f"Invalid profile name '{name}'")
+    return os.path.join(profile_directory(directory), name + '.json')
+
+def save_profile(name, tuning, directory=None):
+    filename = profile_path(name, directory)
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    profile = dict(tuning, name=name, created_at=time.strftime('%Y-%m-%dT%H:%M:%S%z'))
+
+    temp_filename = filename + '.tmp'
+    with open(temp_filename, 'w') as f:
+        json.dump(profile, f, indent=4)
+    os.replace(temp_filename, filename)
+    return filename
+
+def load_profile(name, directory=None):
+    try:
+        with open(profile_path(name, directory)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise ValueError(f"Unknown tuning profile '{name}'") from None
+
+def list_profiles(directory=None):
+    directory = profile_directory(directory)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name[:-len('.json')] for name in os.listdir(directory) if name.endswith('.json'))
+
+def profile_solver(name, directory=None, **options):
+    return StoichiometrySolver(**dict(load_profile(name, directory)['parameters'], **options))
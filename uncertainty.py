@@ -0,0 +1,118 @@
+import numpy as np
+from results import coefficient_array
+from solver import StoichiometrySolver, component_molar_weight
+
+DEFAULT_PERCENTILES = (5, 50, 95)
+DEFAULT_CHUNK_BYTES = 64 * 1024 * 1024
+
+def nominal_vectors(reactants, products, component_names, relative_weight_std, relative_flow_std):
+    components = {}
+    for component in reactants:
+        components[component['name']] = (component, -1.0)
+    for component in products:
+        components[component['name']] = (component, 1.0)
+
+    n_components = len(component_names)
+    molar_weights = np.zeros(n_components)
+    molar_flows = np.zeros(n_components)
+    weight_stds = np.zeros(n_components)
+    flow_stds = np.zeros(n_components)
+
+    for index, name in enumerate(component_names):
+        component, flow_sign = components[name]
+        molar_weights[index] = component_molar_weight(component)
+        molar_flows[index] = flow_sign * component['molar_flow']
+        weight_stds[index] = component.get('molar_weight_std', relative_weight_std * abs(molar_weights[index]))
+        flow_stds[index] = component.get('molar_flow_std', relative_flow_std * abs(component['molar_flow']))
+
+    return molar_weights, molar_flows, weight_stds, flow_stds
+
+def rebalance_coefficients(nu_matrix, molar_weights):
+    participant_mask = nu_matrix != 0
+    participant_weights = molar_weights[:, :, None] * participant_mask[None, :, :]
+
+    mass_balance = np.einsum('sc,cr->sr', molar_weights, nu_matrix)
+    weight_norms = np.einsum('scr,scr->sr', participant_weights, participant_weights)
+    weight_norms[weight_norms == 0] = 1.0
+
+    return nu_matrix[None, :, :] - (mass_balance / weight_norms)[:, None, :] * participant_weights
+
+def normalise_coefficients(nu_samples):
+    max_values = np.abs(nu_samples).max(axis=1, keepdims=True)
+    max_values[max_values == 0] = 1.0
+    return nu_samples / max_values
+
+def fit_sample_extents(nu_samples, molar_flows):
+    pseudo_inverses = np.linalg.pinv(nu_samples)
+    return np.einsum('src,sc->sr', pseudo_inverses, molar_flows)
+
+def summarise(samples, percentiles):
+    return {
+        'mean': samples.mean(axis=0),
+        'std': samples.std(axis=0),
+        'percentiles': {p: value for p, value in zip(percentiles, np.percentile(samples, percentiles, axis=0))}
+    }
+
+def summary_as_lists(summary, mask=None):
+    def as_list(values):
+        if mask is None:
+            return values.tolist()
+        full = np.zeros(mask.shape)
+        full[mask] = values
+        return full.tolist()
+
+    return {
+        'mean': as_list(summary['mean']),
+        'std': as_list(summary['std']),
+        'percentiles': {p: as_list(value) for p, value in summary['percentiles'].items()}
+    }
+
+def propagate_uncertainty(reactants, products, reactions, n_samples=1000, relative_weight_std=0.0, relative_flow_std=0.0,
+                          percentiles=DEFAULT_PERCENTILES, chunk_size=None, max_chunk_bytes=DEFAULT_CHUNK_BYTES,
+                          seed=None, solver=None):
+    if solver is None:
+        solver = StoichiometrySolver()
+
+    nominal = solver.solve_stoichiometry(reactants, products, reactions)
+    if not nominal['success']:
+        return nominal
+
+    nu_matrix = coefficient_array(nominal)
+    component_names = nominal['component_names']
+    n_components, n_reactions = nu_matrix.shape
+
+    molar_weights, molar_flows, weight_stds, flow_stds = nominal_vectors(
+        reactants, products, component_names, relative_weight_std, relative_flow_std)
+
+    if chunk_size is None:
+        bytes_per_sample = 8 * (4 * n_components * n_reactions + 4 * n_components + 2 * n_reactions)
+        chunk_size = max(1, min(n_samples, max_chunk_bytes // bytes_per_sample))
+
+    participant_mask = nu_matrix != 0
+    coefficient_samples = np.empty((n_samples, int(participant_mask.sum())))
+    extent_samples = np.empty((n_samples, n_reactions))
+    error_samples = np.empty((n_samples, n_reactions))
+
+    rng = np.random.default_rng(seed)
+    for start in range(0, n_samples, chunk_size):
+        stop = min(start + chunk_size, n_samples)
+        size = stop - start
+
+        sampled_weights = molar_weights + weight_stds * rng.standard_normal((size, n_components))
+        sampled_flows = molar_flows + flow_stds * rng.standard_normal((size, n_components))
+
+        error_samples[start:stop] = np.abs(sampled_weights @ nu_matrix)
+
+        nu_samples = normalise_coefficients(rebalance_coefficients(nu_matrix, sampled_weights))
+        coefficient_samples[start:stop] = nu_samples[:, participant_mask]
+        extent_samples[start:stop] = fit_sample_extents(nu_samples, sampled_flows)
+
+    return {
+        'success': nominal['success'],
+        'n_samples': n_samples,
+        'component_names': component_names,
+        'nominal': nominal,
+        'stoichiometric_coefficients': summary_as_lists(summarise(coefficient_samples, percentiles), participant_mask),
+        'reaction_extents': summary_as_lists(summarise(extent_samples, percentiles)),
+        'mass_balance_errors': summary_as_lists(summarise(error_samples, percentiles))
+    }
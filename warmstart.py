@@ -0,0 +1,105 @@
+import threading
+import numpy as np
+from scipy.spatial import cKDTree
+
+DEFAULT_MAX_DISTANCE = 0.1
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_REBUILD_THRESHOLD = 64
+WARM_START_TOLERANCE = 1e-12
+
+def rebalance(coefficients, signs, molar_masses):
+    direction = np.where(np.asarray(signs) != 0, np.asarray(molar_masses, dtype=float), 0.0)
+    norm = direction @ direction
+    if norm == 0:
+        return coefficients
+    return coefficients - (coefficients @ direction / norm) * direction
+
+class WarmStartIndex:
+    def __init__(self, max_distance=DEFAULT_MAX_DISTANCE, max_entries=DEFAULT_MAX_ENTRIES, rebuild_threshold=DEFAULT_REBUILD_THRESHOLD):
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.rebuild_threshold = rebuild_threshold
+        self.groups = {}
+        self.lock = threading.Lock()
+
+    def canonical_form(self, signs, molar_masses):
+        signs = np.sign(np.asarray(signs, dtype=float))
+        molar_masses = np.asarray(molar_masses, dtype=float)
+        order = np.lexsort((molar_masses, signs))
+        point = molar_masses[order]
+        norm = np.linalg.norm(point)
+        if norm > 0:
+            point = point / norm
+        return tuple(signs[order].astype(int)), point, order
+
+    def add(self, signs, molar_masses, coefficients):
+        key, point, order = self.canonical_form(signs, molar_masses)
+        coefficients = np.asarray(coefficients, dtype=float)[order]
+
+        with self.lock:
+            group = self.groups.setdefault(key, {'points': [], 'solutions': [], 'tree': None, 'tree_size': 0, 'evicted': 0})
+            group['points'].append(point)
+            group['solutions'].append(coefficients)
+            if len(group['points']) > self.max_entries:
+                del group['points'][0]
+                del group['solutions'][0]
+                group['evicted'] += 1
+                if group['evicted'] >= group['tree_size']:
+                    group['tree'], group['tree_size'], group['evicted'] = None, 0, 0
+
+    def nearest(self, group, point):
+        points = group['points']
+        buffered = len(points) - (group['tree_size'] - group['evicted'])
+        if group['tree'] is None or buffered > self.rebuild_threshold or group['evicted'] > self.rebuild_threshold:
+            group['tree'] = cKDTree(np.array(points))
+            group['tree_size'] = len(points)
+            group['evicted'] = 0
+
+        evicted = group['evicted']
+        distances, positions = group['tree'].query(point, k=evicted + 1)
+        best = (np.inf, None)
+        for distance, position in zip(np.atleast_1d(distances), np.atleast_1d(positions)):
+            if evicted <= position < group['tree_size']:
+                best = (distance, position - evicted)
+                break
+
+        start = group['tree_size'] - evicted
+        if start < len(points):
+            buffer_distances = np.linalg.norm(np.array(points[start:]) - point, axis=1)
+            closest = int(np.argmin(buffer_distances))
+            if buffer_distances[closest] < best[0]:
+                best = (buffer_distances[closest], start + closest)
+        return best
+
+    def query(self, signs, molar_masses):
+        key, point, order = self.canonical_form(signs, molar_masses)
+
+        with self.lock:
+            group = self.groups.get(key)
+            if group is None:
+                return None
+            distance, position = self.nearest(group, point)
+            solution = group['solutions'][position]
+
+        if self.max_distance is not None and distance > self.max_distance:
+            return None
+
+        coefficients = np.empty_like(solution)
+        coefficients[order] = solution
+        return rebalance(coefficients, signs, molar_masses)
+
+    def __getstate__(self):
+        with self.lock:
+            state = dict(self.__dict__)
+            state['groups'] = {key: dict(group, points=list(group['points']), solutions=list(group['solutions']))
+                               for key, group in self.groups.items()}
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        with self.lock:
+            return sum(len(group['points']) for group in self.groups.values())